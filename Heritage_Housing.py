@@ -4,12 +4,16 @@
 
 import streamlit as st
 from utils.st_parameters import page_icon
+from utils.st_warmup import start_warmup
 
 
 page_title = "Heritage Housing"
 
 st.set_page_config(page_title=page_title, page_icon=page_icon)
 
+# load the model and the data in the background while the overview is read
+start_warmup()
+
 st.markdown(f"## {page_title}")
 
 
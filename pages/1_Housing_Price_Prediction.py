@@ -5,15 +5,19 @@
 import pandas as pd
 import streamlit as st
 from utils.st_data_utils import (
-    get_correlated_info, get_prediction_data, get_prediction_feature_info
+    get_correlated_info, get_prediction_data, get_predicted_price, get_price_contributions,
+    get_price_intervals, get_renovation_plans, get_sensitivity_image
 )
 from utils.st_parameters import target_column, page_icon
+from utils.st_warmup import rerun_until_ready, show_warmup_status, start_warmup
 
 page_title = "Housing Price Prediction"
 
 st.set_page_config(page_title=page_title, page_icon=page_icon)
 st.markdown(f"# {page_title}")
 
+warmup_state = start_warmup()
+
 feature_configuration, correlated = get_correlated_info()
 prediction_results = get_prediction_data()
 
@@ -85,10 +89,10 @@ for var in correlated.columns:
     except ValueError:
         prediction_results_sorted[var] = prediction_results_sorted[var].apply(str)
 
-if st.button("Predict"):
-    prediction = get_prediction_feature_info(prediction_choices=choices,
-                                             feature_info=correlated)
-    choices[target_column] = prediction.loc[0, target_column]
+is_ready = show_warmup_status(warmup_state)
+
+if st.button("Predict", disabled=not is_ready):
+    choices[target_column] = get_predicted_price(prediction_choices=choices)
     prediction_results_sorted.loc[next_index, :] = choices
 
 for var in correlated.columns:
@@ -97,12 +101,59 @@ for var in correlated.columns:
     except ValueError:
         prediction_results_sorted[var] = prediction_results_sorted[var].apply(str)
 
+price_columns = [target_column]
+if st.toggle("Show price ranges", disabled=not is_ready) and is_ready:
+    st.caption("10th, 50th and 90th percentiles of the prices predicted by a bootstrap ensemble")
+    price_intervals = get_price_intervals(prediction_results_sorted[correlated.columns])
+    price_columns += price_intervals.columns.tolist()
+    prediction_results_sorted = pd.concat([
+        prediction_results_sorted[target_column],
+        price_intervals,
+        prediction_results_sorted.drop(columns=target_column)],
+        axis=1
+    )
+
 st.write(
     prediction_results_sorted.style.set_properties(
         **{"background-color": "blue"},
         subset=[target_column]
-    ).format({target_column: "{:.0f}"})
+    ).format({column: "{:.0f}" for column in price_columns})
 )
 
 if st.button("Reset"):
     st.empty()
+
+with st.expander("Price Explanation"):
+    st.write(
+        f"How much each variable adds to or takes from the predicted {target_column}, "
+        "starting from the bias shared by all houses:"
+    )
+    # only run once switched on, as every new house is explained tree by tree
+    if st.toggle("Show the price explanation", key="show_explanation",
+                 disabled=not is_ready) and is_ready:
+        price_contributions = get_price_contributions(prediction_results_sorted[correlated.columns])
+        st.dataframe(price_contributions.style.format("${:,.0f}"))
+        st.bar_chart(price_contributions.drop(columns="bias").iloc[-1])
+
+with st.expander("Price Sensitivity"):
+    st.write("How the predicted price responds to one variable, the others fixed as chosen:")
+    sensitivity_var = st.selectbox("Variable", correlated.columns)
+    # only run once switched on, as every new house is scored over the range of every variable
+    if st.toggle("Show the price sensitivity", key="show_sensitivity",
+                 disabled=not is_ready) and is_ready:
+        st.image(get_sensitivity_image(choices, sensitivity_var), use_column_width=True)
+
+with st.expander("Renovation Plans"):
+    st.write(
+        "The upgrades of kitchen quality, overall condition, overall quality and remodel "
+        "year with the highest predicted prices for each inherited house:"
+    )
+    if is_ready and st.button("Find Renovations"):
+        for house_idx, renovation_plan in enumerate(get_renovation_plans()):
+            st.markdown(f"##### {index_formatter(house_idx)}")
+            st.dataframe(
+                renovation_plan.style.format({target_column: "${:,.0f}", "gain": "${:,.0f}"}),
+                hide_index=True
+            )
+
+rerun_until_ready(warmup_state)
@@ -4,11 +4,10 @@
 
 import streamlit as st
 from utils.st_data_utils import (
-    get_correlated_variables, get_na_data, get_training_data, get_training_variable_info,
-    view_training_data
+    get_correlated_image, get_correlated_variables, get_data_browser, get_data_description,
+    get_distribution_image, get_missing_values, get_training_data_window
 )
-from utils.st_insight_utils import plot_correlated_features, plot_data_distribution
-from utils.st_parameters import page_icon, plot_columns, separator, target_column
+from utils.st_parameters import page_icon, separator, snapshot_page_sizes, target_column
 
 
 page_title = "Housing Data Analysis"
@@ -18,9 +17,7 @@ st.markdown(f"# {page_title}")
 
 
 # load data
-variable_info = get_training_variable_info()
-na_data = get_na_data()
-training_data = get_training_data()
+data_browser = get_data_browser()
 correlated = get_correlated_variables()
 
 
@@ -35,51 +32,53 @@ with training_data_tab:
     current_page = container.number_input(
         "Column Set",
         min_value=1,
-        max_value=int(len(training_data.columns) / separator),
+        max_value=int(len(data_browser.columns) / separator),
         value="min",
         step=1,
     )
-    display_columns = training_data.columns[
+    display_columns = data_browser.columns[
         (current_page-1) * separator: current_page * separator
     ]
-    display_dataframe = training_data[display_columns]
 
     container.markdown("#### Data Snapshot")
 
+    # only the rows on display are read from the columnar cache
+    col1, col2 = container.columns(2)
+    page_size = col1.selectbox("Rows", snapshot_page_sizes)
+    row_page = col2.number_input(
+        "Row Page",
+        min_value=1,
+        max_value=max(-(-data_browser.num_rows // page_size), 1),
+        value="min",
+        step=1,
+    )
+
     container.dataframe(
-        view_training_data(display_dataframe.head(5)),
-        hide_index=True
+        get_training_data_window(
+            offset=(row_page - 1) * page_size,
+            limit=page_size,
+            columns=display_columns
+        )
     )
 
+    # the heavy sections only run once switched on
     with st.expander("Data Distribution"):
-        st.pyplot(
-            plot_data_distribution(
-                plot_columns=plot_columns,
-                variable_info=variable_info,
-                data=display_dataframe
-            )
-        )
+        if st.toggle("Show the data distribution", key="show_distribution"):
+            st.image(get_distribution_image(tuple(display_columns)), use_column_width=True)
 
     with st.expander("Data Description"):
-        data_description = display_dataframe.dropna().describe()
-        st.dataframe(data_description.style.format("{:.2f}"))
+        if st.toggle("Show the data description", key="show_description"):
+            data_description = get_data_description(display_columns)
+            st.dataframe(data_description.style.format("{:.2f}"))
 
     with st.expander("Missing Values"):
-        na_data_display = na_data[na_data["column"].isin(display_columns)].reset_index()
+        na_data_display = get_missing_values(display_columns)
         st.dataframe(na_data_display[["column", "percentage"]], hide_index=True)
 
 with correlation_tab:
     # load data
     high_correlated_features = correlated["featureName"].tolist() + [target_column]
-    low_correlated_features = training_data.columns.difference(set(high_correlated_features))
-
-    high_correlated_fig = plot_correlated_features(
-        plot_columns=plot_columns,
-        chosen_variables=high_correlated_features,
-        data=training_data,
-        variable_info=variable_info,
-        target_column=target_column
-    )
+    low_correlated_features = sorted(set(data_browser.columns).difference(high_correlated_features))
 
     st.markdown("### Highly Correlated Features")
     col1, col2 = st.columns(2)
@@ -100,14 +99,13 @@ with correlation_tab:
                  "with the sale price")
 
     with st.expander(f"High Correlated Features vs {target_column}"):
-        st.pyplot(high_correlated_fig)
+        if st.toggle("Show the highly correlated features", key="show_high_correlated"):
+            st.image(
+                get_correlated_image(tuple(high_correlated_features)), use_column_width=True
+            )
 
     with st.expander(f"Low Correlated Features vs {target_column}"):
-        low_correlated_fig = plot_correlated_features(
-            plot_columns=plot_columns,
-            chosen_variables=low_correlated_features,
-            data=training_data,
-            variable_info=variable_info,
-            target_column=target_column
-        )
-        st.pyplot(low_correlated_fig)
+        if st.toggle("Show the low correlated features", key="show_low_correlated"):
+            st.image(
+                get_correlated_image(tuple(low_correlated_features)), use_column_width=True
+            )
@@ -7,6 +7,7 @@ import pandas as pd
 import streamlit as st
 from utils.st_data_utils import (
     get_correlated_variables,
+    get_model_fit_stats,
     get_model_parameters,
     get_model_performance,
     get_learning_curve_path,
@@ -70,6 +71,21 @@ with training_tab:
         with col2:
             st.dataframe(get_model_parameters(), hide_index=True)
 
+    with st.expander("Model Fit"):
+        model_fit_stats = get_model_fit_stats()
+        if model_fit_stats is None:
+            st.write("""- The model was fitted in the model training notebook. Fit it with
+                     `python -m utils.model_training` to record its fit statistics.""")
+        else:
+            st.dataframe(model_fit_stats.style.format({
+                "model_bytes": "{:,.0f}",
+                "fit_seconds": "{:.2f}",
+                "predict_1_ms": "{:.2f}",
+                "predict_10000_ms": "{:.2f}",
+            }), hide_index=True)
+            st.write("""- Number of trees, size of the saved model, time taken to fit it, and
+                     time taken to predict a single house and a batch of 10,000 houses.""")
+
     with st.expander("Model Learning Curve"):
         st.image(get_learning_curve_path())
 
@@ -6,4 +6,7 @@ headless = true\n\
 port = $PORT\n\
 enableCORS = false\n\
 \n\
-" > ~/.streamlit/config.toml
\ No newline at end of file
+" > ~/.streamlit/config.toml
+python -m utils.distribution_summary build
+python -m utils.column_statistics build
+python -m utils.artifact_bundle build
@@ -0,0 +1,53 @@
+"""Shared fixtures of the checks against the artifacts under `STREAMLIT_DATA_PATH`."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import os
+import dotenv
+import pandas as pd
+import pytest
+from utils.feature_utils import get_feature_layout
+
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the same variables as the dashboard, without overriding those already set
+for name, value in dotenv.dotenv_values(os.path.join(root_path, ".env_template_unix")).items():
+    os.environ.setdefault(name, value)
+os.environ["STREAMLIT_DATA_PATH"] = os.path.join(root_path, os.environ["STREAMLIT_DATA_PATH"])
+
+
+def get_path(variable):
+    """
+    Get the path of an artifact.
+
+    Parameters
+    ----------
+    variable : str
+        environment variable holding the filename
+
+    Returns
+    -------
+    str
+    """
+    return os.path.join(os.environ["STREAMLIT_DATA_PATH"], os.environ[variable])
+
+
+@pytest.fixture(scope="session")
+def correlated_variables():
+    """Content of `correlated_variables.csv`."""
+    return pd.read_csv(get_path("CORRELATED_VARIABLE_FILES"))
+
+
+@pytest.fixture(scope="session")
+def records():
+    """Content of `house_prices_records.csv`."""
+    return pd.read_csv(get_path("HOUSING_RECORDS_FILENAME"))
+
+
+@pytest.fixture(scope="session")
+def layout(correlated_variables):
+    """Layout of the prediction features."""
+    columns = pd.read_csv(get_path("PREDICTION_FEATURES_FILENAME")).columns
+    return get_feature_layout(columns, correlated_variables)
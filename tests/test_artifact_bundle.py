@@ -0,0 +1,95 @@
+"""Checks that the artifact bundle reads back what the files hold."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import os
+import shutil
+import pandas as pd
+import pytest
+from utils.artifact_bundle import (
+    ArtifactBundle, build_data_path_bundle, collect_artifacts, file_artifacts, table_artifacts
+)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """A copy of the dashboard artifacts, with its bundle."""
+    for variable in table_artifacts + file_artifacts:
+        path = os.path.join(os.environ["STREAMLIT_DATA_PATH"], os.environ[variable])
+        # e.g. the fit statistics, only written by the training pipeline
+        if os.path.exists(path):
+            shutil.copy2(path, tmp_path)
+    build_data_path_bundle(str(tmp_path))
+    return str(tmp_path)
+
+
+def test_round_trip(data_path):
+    """Every table reads back as `read_csv` reads its file, and every file byte for byte."""
+    bundle = ArtifactBundle(os.path.join(data_path, os.environ["ARTIFACT_BUNDLE_FILENAME"]),
+                            data_path)
+
+    for variable in table_artifacts:
+        filename = os.environ[variable]
+        if filename not in bundle:
+            continue
+        pd.testing.assert_frame_equal(bundle.read_table(filename),
+                                      pd.read_csv(os.path.join(data_path, filename)))
+        assert bundle.is_current(filename)
+
+    for variable in file_artifacts:
+        filename = os.environ[variable]
+        if filename not in bundle:
+            continue
+        with open(os.path.join(data_path, filename), "rb") as artifact:
+            assert bundle.read_bytes(filename) == artifact.read()
+
+
+def test_changed_file_is_stale(data_path):
+    """A file written after the bundle was built is no longer served from it."""
+    filename = os.environ["MODEL_PERFORMANCE_FILENAME"]
+    path = os.path.join(data_path, filename)
+    pd.read_csv(path).iloc[:1].to_csv(path, index=False)
+
+    bundle = ArtifactBundle(os.path.join(data_path, os.environ["ARTIFACT_BUNDLE_FILENAME"]),
+                            data_path)
+    assert not bundle.is_current(filename)
+    assert bundle.is_current(os.environ["MODEL_PARAMETERS_FILENAME"])
+
+
+def test_removed_file_is_stale(data_path):
+    """A file removed after the bundle was built is no longer served from it."""
+    filename = os.environ["MODEL_PERFORMANCE_FILENAME"]
+    os.remove(os.path.join(data_path, filename))
+
+    bundle = ArtifactBundle(os.path.join(data_path, os.environ["ARTIFACT_BUNDLE_FILENAME"]),
+                            data_path)
+    assert not bundle.is_current(filename)
+
+
+def test_corrupted_artifact_is_refused(data_path):
+    """An artifact that does not match its checksum is not read, the others are."""
+    path = os.path.join(data_path, os.environ["ARTIFACT_BUNDLE_FILENAME"])
+    bundle = ArtifactBundle(path)
+    filename = os.environ["MODEL_PERFORMANCE_FILENAME"]
+    blob = bundle.manifest["entries"][filename]["columns"][0]["data"]
+    position = bundle.data_start + blob["offset"]
+    with open(path, "r+b") as bundle_file:
+        bundle_file.seek(position)
+        first = bundle_file.read(1)
+        bundle_file.seek(position)
+        bundle_file.write(bytes([first[0] ^ 0xFF]))
+
+    bundle = ArtifactBundle(path)
+    with pytest.raises(ValueError, match="checksum"):
+        bundle.read_table(filename)
+    bundle.read_table(os.environ["MODEL_PARAMETERS_FILENAME"])
+
+
+def test_missing_files_are_left_out(data_path):
+    """Only the artifacts with a file are collected."""
+    os.remove(os.path.join(data_path, os.environ["MODEL_PARAMETERS_FILENAME"]))
+    artifacts, sources = collect_artifacts(data_path)
+
+    assert os.environ["MODEL_PARAMETERS_FILENAME"] not in artifacts
+    assert set(artifacts) == set(sources)
@@ -0,0 +1,41 @@
+"""Checks of the bulk scoring of files split into chunks."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import pandas as pd
+import pytest
+from utils.batch_scoring import score_file
+
+
+@pytest.fixture
+def mixed_path(records, tmp_path):
+    """Houses whose columns change dtype from one chunk of ten to the next."""
+    houses = records.drop(columns="SalePrice").head(40).copy()
+    # integers in the first chunk, floats with missing values in the second
+    houses["BedroomAbvGr"] = houses["BedroomAbvGr"].astype(float)
+    houses.loc[houses.index[10:20], "BedroomAbvGr"] = float("nan")
+    # no text at all in the first chunk
+    houses.loc[houses.index[:10], "BsmtExposure"] = None
+    path = tmp_path / "houses.csv"
+    houses.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_chunks_match_single_chunk(mixed_path, tmp_path, suffix):
+    """Scoring in chunks writes the same file as scoring in one chunk."""
+    chunked_path = str(tmp_path / f"chunked{suffix}")
+    single_path = str(tmp_path / f"single{suffix}")
+    assert score_file(str(mixed_path), chunked_path, chunk_size=10)["rows"] == 40
+    score_file(str(mixed_path), single_path, chunk_size=100)
+
+    if suffix == ".csv":
+        with open(chunked_path, encoding="utf-8") as chunked, \
+                open(single_path, encoding="utf-8") as single:
+            assert chunked.read() == single.read()
+    else:
+        chunked = pd.read_parquet(chunked_path)
+        single = pd.read_parquet(single_path)
+        assert chunked.dtypes.equals(single.dtypes)
+        pd.testing.assert_frame_equal(chunked.fillna(0), single.fillna(0))
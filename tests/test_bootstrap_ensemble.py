@@ -0,0 +1,67 @@
+"""Checks of the price ranges predicted by the bootstrap ensemble."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import numpy as np
+import pytest
+from utils.bootstrap_ensemble import stack_members, train_member, BootstrapEnsemble
+from utils.feature_utils import build_training_features
+from utils.model_training import split_data
+from utils.st_parameters import target_column
+from utils.tree_predictor import flatten_booster
+
+
+params = {"n_estimators": 60, "max_depth": 3, "learning_rate": 0.1}
+
+
+@pytest.fixture(scope="module")
+def split(records, correlated_variables):
+    """Training and testing sets of the pipeline."""
+    return split_data(*build_training_features(records, correlated_variables, target_column))
+
+
+def get_ensemble(features, target, num_members):
+    """An ensemble fitted in this process."""
+    return BootstrapEnsemble(stack_members([
+        train_member(params, features, target, seed) for seed in range(num_members)
+    ]))
+
+
+def get_widths(split, size, num_members=8):
+    """Width of the 10th to 90th percentile range of the test houses."""
+    ensemble = get_ensemble(split["X_train"].iloc[:size], split["y_train"].iloc[:size],
+                            num_members)
+    quantiles = ensemble.predict_quantiles(split["X_test"].to_numpy(), quantiles=(10, 90))
+    return quantiles[:, 1] - quantiles[:, 0]
+
+
+def test_members_match_single_models(split):
+    """Every member predicts as the model it was flattened from."""
+    import xgboost as xgb  # pylint: disable=C0415
+
+    estimator = xgb.XGBRegressor(**params).fit(split["X_train"], split["y_train"])
+    ensemble = BootstrapEnsemble(stack_members([flatten_booster(estimator.get_booster())] * 2))
+    members = ensemble.predict_members(split["X_test"].to_numpy())
+    np.testing.assert_allclose(members[:, 0], estimator.predict(split["X_test"]), rtol=1e-5)
+    np.testing.assert_allclose(members[:, 1], members[:, 0])
+
+
+def test_interval_contains_point_prediction(split):
+    """The range of the members holds the prediction of the model fitted on all of the split."""
+    import xgboost as xgb  # pylint: disable=C0415
+
+    estimator = xgb.XGBRegressor(**params).fit(split["X_train"], split["y_train"])
+    ensemble = get_ensemble(split["X_train"], split["y_train"], num_members=10)
+    members = ensemble.predict_members(split["X_test"].to_numpy())
+    point = estimator.predict(split["X_test"])
+
+    inside = (members.min(axis=1) <= point) & (point <= members.max(axis=1))
+    assert inside.mean() >= 0.9
+    low, median, high = ensemble.predict_quantiles(split["X_test"].to_numpy()).T
+    assert np.all((low <= median) & (median <= high))
+
+
+def test_width_shrinks_with_more_training_houses(split):
+    """The range narrows as the members see more houses, as the bootstrap variance does."""
+    assert np.median(get_widths(split, 1000)) < np.median(get_widths(split, 200))
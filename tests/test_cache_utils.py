@@ -0,0 +1,29 @@
+"""Checks of the figure cache persisted on disk."""
+
+import os
+from utils.cache_utils import FigureCache
+
+
+def test_disk_is_pruned_least_recently_used_first(tmp_path):
+    """The figures beyond the disk limit that were used least recently are deleted."""
+    cache = FigureCache(max_bytes=10, directory=str(tmp_path), max_disk_bytes=300)
+    for idx in range(3):
+        cache.put(("figure", idx, "png"), bytes(100))
+        path = cache.get_file_path(("figure", idx, "png"))
+        os.utime(path, ns=(idx * 10 ** 9, idx * 10 ** 9))
+
+    # read back from disk, as the memory only holds the last one
+    assert cache.get(("figure", 0, "png")) == bytes(100)
+    cache.put(("figure", 3, "png"), bytes(100))
+
+    persisted = [os.path.exists(cache.get_file_path(("figure", idx, "png"))) for idx in range(4)]
+    assert persisted == [True, False, True, True]
+
+
+def test_restart_reads_from_disk(tmp_path):
+    """A new cache over the same directory serves the persisted figures."""
+    FigureCache(max_bytes=1000, directory=str(tmp_path)).put(("figure", "png"), b"image")
+
+    cache = FigureCache(max_bytes=1000, directory=str(tmp_path), max_disk_bytes=1000)
+    assert cache.get(("figure", "png")) == b"image"
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,76 @@
+"""Checks of the column statistics against `Series.describe`."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.column_statistics import StreamingStatistics, describe_columns, get_numeric_columns
+from utils.st_data_utils import get_missing_values
+
+
+def describe(data):
+    """Describe every numeric column on its own non-missing values, with pandas."""
+    return pd.DataFrame({
+        column: data[column].dropna().describe() for column in get_numeric_columns(data)
+    }).T.drop(columns="count")
+
+
+def stream(data, chunk_size, reservoir_size):
+    """Describe the data added in chunks."""
+    statistics = StreamingStatistics(reservoir_size=reservoir_size)
+    for start in range(0, len(data), chunk_size):
+        statistics.update(data.iloc[start:start + chunk_size])
+    return statistics.result()
+
+
+def test_describe_matches_pandas(records):
+    """The vectorized pass describes every column as pandas does."""
+    statistics = describe_columns(records)
+    numeric = get_numeric_columns(records)
+    expected = describe(records)
+
+    pd.testing.assert_frame_equal(statistics.loc[numeric, expected.columns], expected,
+                                  check_names=False, rtol=1e-9)
+    np.testing.assert_array_equal(statistics["na_count"], records.isna().sum())
+    np.testing.assert_array_equal(statistics["count"], records.notna().sum())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 97, 100000])
+def test_streaming_matches_in_memory(records, chunk_size):
+    """Moments merged chunk by chunk, with a reservoir holding every row, are exact."""
+    pd.testing.assert_frame_equal(stream(records, chunk_size, len(records)),
+                                  describe_columns(records), rtol=1e-9)
+
+
+def test_reservoir_quartiles():
+    """Quartiles of a reservoir sample are close to those of the full data."""
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "normal": rng.normal(size=200000),
+        "exponential": rng.exponential(size=200000),
+    })
+    # sorted, so a reservoir that favours any part of the file is off
+    data = data.sort_values("normal", ignore_index=True)
+
+    statistics = stream(data, chunk_size=10000, reservoir_size=20000)
+    expected = describe(data)
+
+    pd.testing.assert_frame_equal(statistics[["mean", "std", "min", "max"]],
+                                  expected[["mean", "std", "min", "max"]],
+                                  check_names=False, rtol=1e-9)
+    np.testing.assert_allclose(statistics[["25%", "50%", "75%"]], expected[["25%", "50%", "75%"]],
+                               atol=0.03)
+
+
+def test_missing_values_keep_every_column(records):
+    """Every column of the set is listed, with those without missing values at 0%."""
+    columns = ["GrLivArea", "LotFrontage", "BsmtExposure", "1stFlrSF"]
+    missing = get_missing_values(columns).set_index("column")["percentage"]
+
+    assert sorted(missing.index) == sorted(columns)
+    assert missing.is_monotonic_decreasing
+    expected = (records[columns].isna().mean() * 100).round(2)
+    pd.testing.assert_series_equal(missing.sort_index(), expected.sort_index(),
+                                   check_names=False, atol=0.01)
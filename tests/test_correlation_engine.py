@@ -0,0 +1,46 @@
+"""Checks of the vectorized correlations against `DataFrame.corr`."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.correlation_engine import compute_target_correlations, get_target_correlations
+from utils.st_parameters import target_column
+
+
+@pytest.fixture(scope="module")
+def data(records):
+    """The training data, with missing values, a constant and an almost empty column."""
+    data = records.copy()
+    data["Constant"] = 1.0
+    data["AlmostEmpty"] = np.nan
+    data.loc[data.index[:1], "AlmostEmpty"] = 1.0
+    return data
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_matches_pandas(data, method):
+    """Every coefficient is the one pandas computes, with missing values excluded pairwise."""
+    assert data.select_dtypes(include="number").isna().any().any()
+
+    expected = data.select_dtypes(include="number").corr(method=method)[target_column]
+    pd.testing.assert_series_equal(compute_target_correlations(data, target_column, method),
+                                   expected, rtol=1e-9)
+
+
+def test_unknown_method(data):
+    """Only Pearson and Spearman are computed."""
+    with pytest.raises(ValueError, match="kendall"):
+        compute_target_correlations(data, target_column, "kendall")
+
+
+def test_cached_on_the_given_fingerprint(data):
+    """With a fingerprint, the correlations are cached on it rather than on the content."""
+    first = get_target_correlations(data, target_column, data_fingerprint="training data")
+    changed = data.assign(**{target_column: -data[target_column]})
+
+    assert get_target_correlations(changed, target_column,
+                                   data_fingerprint="training data") is first
+    assert get_target_correlations(changed, target_column) is not first
@@ -0,0 +1,53 @@
+"""Checks that the data browser pages through the rows it is asked for."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from utils.data_browser import DataBrowser
+
+
+@pytest.fixture(scope="module")
+def data(records):
+    """The training data, as the columnar cache holds it."""
+    return records.astype({"BsmtExposure": "category"})
+
+
+@pytest.fixture(scope="module")
+def browser(data, tmp_path_factory):
+    """A browser over the training data, in row groups of 100 rows."""
+    path = tmp_path_factory.mktemp("browser") / "records.parquet"
+    pq.write_table(pa.Table.from_pandas(data, preserve_index=False), path, row_group_size=100)
+    return DataBrowser(str(path))
+
+
+@pytest.mark.parametrize("offset, limit", [
+    (0, 10), (95, 10), (100, 100), (250, 317), (1450, 50), (0, 10_000),
+])
+def test_window_matches_the_rows(data, browser, offset, limit):
+    """A window, across row groups or past the end, holds the rows it covers."""
+    window = browser.read_window(offset, limit, columns=["GrLivArea", "BsmtExposure"])
+    expected = data.iloc[offset:offset + limit][["GrLivArea", "BsmtExposure"]]
+    assert list(window.index) == list(expected.index)
+    assert window.astype(object).equals(expected.astype(object))
+
+
+def test_pages_cover_every_row_once(data, browser):
+    """Reading page after page returns every row exactly once."""
+    page_size = 128
+    pages = [browser.read_window(offset, page_size)
+             for offset in range(0, browser.num_rows, page_size)]
+
+    assert browser.num_rows == len(data)
+    assert [len(page) for page in pages[:-1]] == [page_size] * (len(pages) - 1)
+    assert sum(len(page) for page in pages) == len(data)
+    assert [row for page in pages for row in page.index] == list(range(len(data)))
+
+
+def test_window_out_of_range_is_empty(browser):
+    """A window starting past the end holds no row."""
+    window = browser.read_window(browser.num_rows + 10, 10)
+    assert window.empty
+    assert list(window.columns) == browser.columns
@@ -0,0 +1,50 @@
+"""Checks that the heavy sections of the data page only run once switched on."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import os
+import pytest
+from streamlit.testing.v1 import AppTest
+from conftest import root_path
+from utils import st_data_utils
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Names of the heavy getters called by the page, in order."""
+    called = []
+    for name in ["get_distribution_image", "get_data_description", "get_correlated_image"]:
+        getter = getattr(st_data_utils, name)
+        monkeypatch.setattr(st_data_utils, name, lambda *args, _name=name, _getter=getter: (
+            called.append(_name) or _getter(*args)
+        ))
+    return called
+
+
+@pytest.fixture
+def page():
+    """The data page, run once."""
+    app = AppTest.from_file(os.path.join(root_path, "pages", "2_Housing_Data.py"),
+                            default_timeout=120)
+    return app.run()
+
+
+def test_sections_are_off_by_default(calls, page):
+    """Opening the page draws no figure and describes no column."""
+    assert not page.exception
+    assert not calls
+    assert all(not toggle.value for toggle in page.toggle)
+
+
+@pytest.mark.parametrize("toggle, getter", [
+    ("show_distribution", "get_distribution_image"),
+    ("show_description", "get_data_description"),
+    ("show_high_correlated", "get_correlated_image"),
+])
+def test_toggle_runs_its_section_only(calls, page, toggle, getter):
+    """Switching a section on runs that section and no other."""
+    assert not calls
+    page.toggle(key=toggle).set_value(True).run()
+    assert not page.exception
+    assert calls == [getter]
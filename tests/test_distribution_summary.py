@@ -0,0 +1,74 @@
+"""Checks of the precomputed distributions of the training data columns."""
+
+# pytest fixtures are passed by name
+# pylint: disable=R0903,W0613,W0621
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import get_path
+from utils.distribution_summary import build_distribution_summaries
+from utils.st_insight_utils import get_data_distribution_image
+
+
+@pytest.fixture(scope="module")
+def variable_info():
+    """Content of `variables.csv`."""
+    return pd.read_csv(get_path("VARIABLE_FILES"))
+
+
+@pytest.fixture(scope="module")
+def summaries(records, variable_info):
+    """Distribution of every training data column."""
+    return build_distribution_summaries(records, variable_info)
+
+
+class KeyRecorder:
+    """Figure cache that records the keys looked up, without rendering."""
+
+    def __init__(self):
+        self.keys = []
+
+    def get_or_render(self, key, render):
+        """Record the key."""
+        self.keys.append(key)
+        return b""
+
+
+def test_numerical_summary_is_the_histogram(records, summaries):
+    """A numerical column is summarized by the histogram of its values."""
+    counts, edges = np.histogram(records["GrLivArea"], bins="auto")
+    assert summaries["GrLivArea"] == {
+        "kind": "numerical", "edges": edges.tolist(), "counts": counts.tolist()
+    }
+    assert sum(summaries["LotFrontage"]["counts"]) == records["LotFrontage"].notna().sum()
+
+
+def test_categorical_summary_counts_every_value(records, summaries):
+    """A categorical column is summarized by the count of each of its values."""
+    summary = summaries["KitchenQual"]
+    assert summary["kind"] == "categorical"
+    assert dict(zip(summary["labels"], summary["counts"])) == (
+        records["KitchenQual"].value_counts().to_dict()
+    )
+
+
+def test_artifact_is_current(summaries):
+    """The summaries shipped with the dashboard are those of the training data."""
+    with open(get_path("DISTRIBUTION_SUMMARIES_FILENAME"), encoding="utf-8") as summary_file:
+        assert json.load(summary_file) == json.loads(json.dumps(summaries))
+
+
+def test_figure_key_follows_the_summaries(records, variable_info, summaries):
+    """The figure key is the same for equal summaries in any order and changes with them."""
+    def get_key(summaries):
+        recorder = KeyRecorder()
+        get_data_distribution_image(recorder, 2, variable_info, records[["GrLivArea"]],
+                                    summaries=summaries)
+        return recorder.keys[0]
+
+    key = get_key(summaries)
+    assert get_key(dict(reversed(json.loads(json.dumps(summaries)).items()))) == key
+    changed = {**summaries, "GrLivArea": {**summaries["GrLivArea"], "counts": [0]}}
+    assert get_key(changed) != key
@@ -0,0 +1,90 @@
+"""Checks of the batch featurizer against the single-house aggregation it replaced."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.feature_utils import build_prediction_features
+
+
+def get_house_features(house, layout, correlated_variables):
+    """
+    Aggregate a single house as the prediction page did before the batch featurizer.
+
+    Parameters
+    ----------
+    house : dict
+    layout : dict
+    correlated_variables : pandas.DataFrame
+
+    Returns
+    -------
+    pandas.DataFrame
+        of one row, in the columns of the layout
+    """
+    feature_types = correlated_variables.set_index("featureName")["featureType"]
+    prediction_features = pd.DataFrame(np.zeros((1, len(layout["columns"]))),
+                                       columns=layout["columns"])
+    house = pd.DataFrame(house, index=[0])
+
+    categorical = feature_types.index[feature_types == "categorical"]
+    aggregate = pd.get_dummies(house[categorical].astype(object))\
+        .groupby(level=0).agg(["sum", "mean"])
+    aggregate.columns = ["_".join(_) for _ in aggregate.columns]
+    for col in aggregate.columns:
+        prediction_features.loc[0, col] = aggregate.loc[0, col]
+
+    numerical = feature_types.index[feature_types == "numerical"]
+    aggregate = house[numerical].astype(float)\
+        .groupby(level=0).agg(["count", "mean", "max", "min", "sum"])
+    aggregate.columns = ["_".join(_) for _ in aggregate.columns]
+    for col in aggregate.columns:
+        prediction_features.loc[0, col] = aggregate.loc[0, col]
+
+    prediction_features["NumYearsSinceBuilt"] = layout["latest_year"] - house["YearBuilt"]
+    prediction_features["NumYearsSinceRemodelled"] = layout["latest_year"] - house["YearRemodAdd"]
+
+    return prediction_features
+
+
+@pytest.fixture(scope="module")
+def houses(records, layout):
+    """A sample of the training houses, with a missing area."""
+    houses = records[layout["feature_names"]].sample(200, random_state=0).reset_index(drop=True)
+    houses.loc[0, "GarageArea"] = np.nan
+    return houses
+
+
+def test_batch_matches_single_house(houses, layout, correlated_variables):
+    """The batch has the features of every house aggregated on its own."""
+    features = build_prediction_features(houses, layout)
+
+    expected = np.vstack([
+        get_house_features(house, layout, correlated_variables).to_numpy()
+        for house in houses.to_dict("records")
+    ])
+    np.testing.assert_array_equal(features, expected)
+
+
+def test_batch_ignores_choice_types(houses, layout):
+    """A rating gets the same features as a number or a string."""
+    as_strings = houses.astype({"OverallCond": str, "OverallQual": float})
+
+    np.testing.assert_array_equal(
+        build_prediction_features(as_strings, layout), build_prediction_features(houses, layout)
+    )
+
+
+@pytest.mark.parametrize("var, label", [("KitchenQual", "Po"), ("OverallCond", 10)])
+def test_unknown_category_is_all_zeros(houses, layout, var, label):
+    """A category never seen in training is encoded as a missing one."""
+    house = houses.iloc[[1]].assign(**{var: label})
+    features = build_prediction_features(house, layout)
+
+    columns = [idx for pair in layout["categorical"][var].values() for idx in pair]
+    assert not features[0, columns].any()
+    np.testing.assert_array_equal(
+        features, build_prediction_features(house.assign(**{var: np.nan}), layout)
+    )
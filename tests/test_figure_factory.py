@@ -0,0 +1,45 @@
+"""Checks that the figure factory releases every figure it hands out."""
+
+import pytest
+from utils.figure_factory import FigureFactory
+
+
+def test_render_releases_the_figure():
+    """A rendered figure is serialized and no longer counted as live."""
+    factory = FigureFactory()
+    fig = factory.create(figsize=(2, 1))
+    fig.add_subplot().plot([0, 1], [1, 0])
+    assert factory.stats()["live_figures"] == 1
+
+    image = factory.render(fig, format="png", dpi=50)
+
+    assert image.startswith(b"\x89PNG")
+    stats = factory.stats()
+    assert (stats["live_figures"], stats["created"], stats["released"]) == (0, 1, 1)
+    assert stats["rendered_bytes"] == len(image)
+
+
+def test_failed_render_releases_the_figure():
+    """A figure that fails to serialize is released all the same."""
+    factory = FigureFactory()
+    with pytest.raises(ValueError):
+        factory.render(factory.create(), format="unknown")
+    assert factory.stats()["live_figures"] == 0
+
+
+def test_figure_block_releases_on_error():
+    """A figure created for a block is released when the block raises."""
+    factory = FigureFactory()
+    with pytest.raises(RuntimeError):
+        with factory.figure(figsize=(2, 1)):
+            raise RuntimeError("drawing failed")
+    assert factory.stats()["live_figures"] == 0
+
+
+def test_release_is_counted_once():
+    """Releasing a figure twice counts one release."""
+    factory = FigureFactory()
+    fig = factory.create()
+    factory.release(fig)
+    factory.release(fig)
+    assert factory.stats()["released"] == 1
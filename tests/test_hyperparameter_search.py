@@ -0,0 +1,66 @@
+"""Checks of the successive halving search over the number of trees."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import itertools
+import pytest
+from utils.feature_utils import build_training_features
+from utils.hyperparameter_search import get_budgets, get_candidates, successive_halving
+from utils.st_parameters import target_column
+
+
+grid = {
+    "n_estimators": [20, 40, 60],
+    "learning_rate": [0.1, 0.3],
+    "max_depth": [2, 3],
+}
+
+
+@pytest.fixture(scope="module")
+def searched(records, correlated_variables):
+    """Result of a search of every candidate of the small grid."""
+    features, target = build_training_features(records, correlated_variables, target_column)
+    return successive_halving(features.iloc[:400], target.iloc[:400], param_distributions=grid,
+                              n_candidates=4, n_splits=2, eta=2, early_stopping_rounds=5,
+                              workers=1)
+
+
+def test_budgets_grow_to_the_largest(searched):
+    """Every round has eta times the budget of the one before, up to the largest."""
+    assert get_budgets(27, 1950, 3) == [216, 650, 1950]
+    assert get_budgets(4, 60, 2) == [30, 60]
+    assert get_budgets(2, 60, 3) == [60]
+    assert searched["stats"]["rounds"] == len(get_budgets(4, 60, 2))
+
+
+def test_candidates_come_from_the_grid():
+    """The candidates are distinct combinations of the grid without the budget."""
+    candidates = get_candidates(grid, 10, random_state=0)
+    combinations = [dict(zip(["learning_rate", "max_depth"], _))
+                    for _ in itertools.product(grid["learning_rate"], grid["max_depth"])]
+    assert len(candidates) == 4
+    assert all(candidate in combinations for candidate in candidates)
+    assert len({tuple(sorted(_.items())) for _ in candidates}) == 4
+
+
+def test_best_is_a_candidate_within_budget(searched):
+    """The best parameters are a combination of the grid with at most the largest budget."""
+    best = dict(searched["best_params"])
+    trees = best.pop("n_estimators")
+
+    assert best["learning_rate"] in grid["learning_rate"]
+    assert best["max_depth"] in grid["max_depth"]
+    assert 1 <= trees <= max(grid["n_estimators"])
+    assert searched["parameters"]["n_estimators"].le(max(grid["n_estimators"])).all()
+    assert searched["parameters"]["rmse"].max() == pytest.approx(
+        searched["parameters"].set_index(["learning_rate", "max_depth"]).loc[
+            (best["learning_rate"], best["max_depth"]), "rmse"
+        ]
+    )
+
+
+def test_halving_fits_fewer_than_every_candidate_at_every_budget(searched):
+    """Only the better half of the candidates is fitted again with the larger budget."""
+    assert searched["stats"]["candidates"] == 4
+    assert searched["stats"]["fits"] <= (4 + 2) * 2
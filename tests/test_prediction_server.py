@@ -0,0 +1,84 @@
+"""Checks that a house the service cannot score fails only its own request."""
+
+# pytest fixtures are passed by name
+# pylint: disable=R0903,W0621
+
+import asyncio
+import joblib
+import pytest
+from conftest import get_path
+from utils.prediction_server import LatencyTracker, MicroBatcher, validate_house
+
+
+house = {
+    "1stFlrSF": 896, "TotalBsmtSF": 882, "GarageArea": 730, "GrLivArea": 896,
+    "KitchenQual": "TA", "OverallCond": 6, "OverallQual": 5, "YearBuilt": 1961,
+    "YearRemodAdd": 1961,
+}
+
+
+@pytest.fixture(scope="module")
+def estimator():
+    """The main estimator."""
+    return joblib.load(get_path("HOUSING_ESTIMATOR_NAME"))
+
+
+@pytest.mark.parametrize("var, value", [
+    ("GrLivArea", "big"), ("GrLivArea", [896]), ("GrLivArea", None), ("GrLivArea", "inf"),
+    ("KitchenQual", ["TA"]),
+])
+def test_validation_rejects_wrong_types(layout, var, value):
+    """A variable that is not of its type is rejected before it is batched."""
+    with pytest.raises(ValueError, match=var):
+        validate_house({**house, var: value}, layout)
+
+
+def test_validation_converts_types(layout):
+    """Numbers sent as strings and ratings sent as numbers are accepted."""
+    validated = validate_house({**house, "GrLivArea": "896", "OverallQual": 5.0}, layout)
+
+    assert validated == validate_house(house, layout)
+    assert validated["OverallQual"] == "5"
+
+
+class FailingEstimator:
+    """Fail on any batch with a house of a given age."""
+
+    def __init__(self, estimator, column, age):
+        self.estimator = estimator
+        self.column = column
+        self.age = age
+
+    def predict(self, features):
+        """Predict, unless a house has the failing age."""
+        if (features[:, self.column] == self.age).any():
+            raise ValueError("cannot score")
+        return self.estimator.predict(features)
+
+
+def test_failed_house_fails_alone(estimator, layout):
+    """A batch with a house that cannot be scored still prices the others."""
+    houses = [
+        validate_house(_, layout)
+        for _ in [house, {**house, "YearBuilt": 1900}, {**house, "OverallCond": 5}]
+    ]
+    failing_estimator = FailingEstimator(
+        estimator, layout["temporal"]["YearBuilt"], layout["latest_year"] - 1900
+    )
+    batcher = MicroBatcher(failing_estimator, layout, LatencyTracker(), max_wait_ms=50)
+
+    async def predict_all():
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                *[batcher.predict(_) for _ in houses], return_exceptions=True
+            )
+        finally:
+            batcher.worker.cancel()
+
+    prices = asyncio.run(predict_all())
+
+    assert isinstance(prices[1], ValueError)
+    assert prices[0] == float(batcher.score([houses[0]])[0])
+    assert prices[2] == float(batcher.score([houses[2]])[0])
+    assert batcher.tracker.batches == 1
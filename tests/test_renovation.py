@@ -0,0 +1,74 @@
+"""Checks of the renovation options and of the plans ranked by price."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import numpy as np
+import pytest
+from utils.renovation import (
+    get_renovation_options, optimize_renovation, score_configurations, search_grid
+)
+from utils.st_data_utils import get_correlated_info, get_estimator, get_prediction_data
+from utils.st_parameters import target_column
+
+
+@pytest.fixture(scope="module")
+def feature_configuration():
+    """Choices of every correlated variable."""
+    return get_correlated_info()[0]
+
+
+@pytest.fixture(scope="module")
+def house():
+    """The first inherited house."""
+    return get_prediction_data().iloc[0].to_dict()
+
+
+def test_options_stay_within_training(house, feature_configuration, layout):
+    """Only the trained categories above the current one and the years up to the latest remodel."""
+    options = get_renovation_options({**house, "OverallCond": 5, "YearRemodAdd": 2000},
+                                     feature_configuration, layout)
+
+    assert options["OverallCond"] == ["5", "6", "7", "8", "9"]
+    assert options["KitchenQual"][0] == house["KitchenQual"]
+    trained = layout["categorical"]["KitchenQual"]
+    assert set(options["KitchenQual"]) <= {house["KitchenQual"], *trained}
+    assert "Po" not in options["KitchenQual"]
+    latest_remodel = int(feature_configuration["YearRemodAdd"][1])
+    assert options["YearRemodAdd"] == list(range(2000, latest_remodel + 1))
+
+
+def test_best_house_stays_as_is(house, feature_configuration, layout):
+    """A house with the best ratings remodelled last year has nothing to upgrade."""
+    best = {**house, "KitchenQual": "Ex", "OverallCond": 9, "OverallQual": 10,
+            "YearRemodAdd": 2010}
+    options = get_renovation_options(best, feature_configuration, layout)
+    assert options == {"KitchenQual": ["Ex"], "OverallCond": ["9"], "OverallQual": ["10"],
+                       "YearRemodAdd": [2010]}
+
+
+def test_plans_are_the_best_of_the_grid(house, feature_configuration, layout):
+    """The plans are the top configurations of the grid, best first, with their gain."""
+    estimator = get_estimator()
+    plans = optimize_renovation(estimator, layout, house, feature_configuration,
+                                method="grid", top_k=5)
+
+    options = get_renovation_options(house, feature_configuration, layout)
+    grid = search_grid(estimator, layout, house, options)
+    expected = np.sort(grid[target_column].to_numpy())[::-1][:5]
+    np.testing.assert_allclose(plans[target_column], expected)
+
+    as_is = grid.iloc[[0]][list(options)]
+    current_price = score_configurations(estimator, layout, house, as_is)[0]
+    np.testing.assert_allclose(plans["gain"], plans[target_column] - current_price)
+
+
+def test_ascent_never_beats_the_grid(house, feature_configuration, layout):
+    """Coordinate ascent scores configurations of the grid, so its best is at most the grid's."""
+    estimator = get_estimator()
+    grid = optimize_renovation(estimator, layout, house, feature_configuration,
+                               method="grid", top_k=1)
+    ascent = optimize_renovation(estimator, layout, house, feature_configuration,
+                                 method="ascent", top_k=1)
+    assert ascent[target_column].iloc[0] <= grid[target_column].iloc[0] + 1e-6
+    assert ascent["gain"].iloc[0] >= 0
@@ -0,0 +1,72 @@
+"""Checks of the aggregated scatter plots of large data and of their figure keys."""
+
+# pytest fixtures are passed by name
+# pylint: disable=R0903,W0613,W0621
+
+import numpy as np
+import pytest
+from utils import st_insight_utils
+from utils.st_insight_utils import (
+    get_correlated_features_image, get_density_grid, get_stratified_sample
+)
+from utils.st_parameters import target_column
+
+
+class KeyRecorder:
+    """Figure cache that records the keys looked up, without rendering."""
+
+    def __init__(self):
+        self.keys = []
+
+    def get_or_render(self, key, render):
+        """Record the key."""
+        self.keys.append(key)
+        return b""
+
+
+def get_key(records, correlated_variables):
+    """Key of the correlated features figure of two variables."""
+    recorder = KeyRecorder()
+    get_correlated_features_image(
+        figure_cache=recorder, plot_columns=2, chosen_variables=["GrLivArea", "OverallQual"],
+        data=records, variable_info=correlated_variables, target_column=target_column
+    )
+    return recorder.keys[0]
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("scatter_mode", "sample"),
+    ("scatter_row_threshold", 10),
+    ("scatter_bins", 20),
+    ("scatter_sample_size", 100),
+])
+def test_key_changes_with_scatter_settings(records, correlated_variables, monkeypatch,
+                                           setting, value):
+    """A figure drawn with other scatter settings is not served from the cache."""
+    key = get_key(records, correlated_variables)
+    assert get_key(records, correlated_variables) == key
+
+    monkeypatch.setattr(st_insight_utils, setting, value)
+    assert get_key(records, correlated_variables) != key
+
+
+def test_density_grid_skips_missing_values():
+    """Every pair with both values is counted once, the others not at all."""
+    x = np.array([0.0, 1.0, np.nan, 2.0, 3.0])
+    y = np.array([1.0, np.nan, 1.0, 2.0, 3.0])
+    counts, _, _ = get_density_grid(x, y, bins=4)
+    assert counts.sum() == 3
+
+
+def test_stratified_sample_keeps_the_distribution():
+    """The sample has the requested size and spreads over the quantiles of x."""
+    x = np.random.default_rng(0).exponential(size=100_000)
+    x[::1000] = np.nan
+    sample = get_stratified_sample(x, sample_size=1000)
+
+    assert abs(len(sample) - 1000) <= 10
+    assert np.isfinite(x[sample]).all()
+    assert np.all(np.diff(sample) > 0)
+    deciles = np.quantile(x[np.isfinite(x)], np.linspace(0, 1, 11)[1:-1])
+    per_decile = np.bincount(np.searchsorted(deciles, x[sample]), minlength=10)
+    assert per_decile.min() >= 95
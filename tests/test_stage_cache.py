@@ -0,0 +1,66 @@
+"""Checks that a pipeline stage is read from the cache only when its inputs are the same."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import pytest
+from utils.cache_utils import StageCache
+from utils.model_training import TrainingPipeline
+
+
+@pytest.fixture
+def calls():
+    """Arguments a stage was run with."""
+    return []
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """A pipeline caching its stages in a temporary directory."""
+    return TrainingPipeline(str(tmp_path), cache=StageCache(str(tmp_path / "cache")))
+
+
+def test_same_inputs_hit(pipeline, calls):
+    """A stage run again on the same inputs is read back, not run."""
+    first_key, first = pipeline.run_stage("split", ("features", 42), calls.append, 1)
+    key, value = pipeline.run_stage("split", ("features", 42), calls.append, 1)
+
+    assert calls == [1]
+    assert (key, value) == (first_key, first)
+    assert [timing["cached"] for timing in pipeline.timings] == [False, True]
+
+
+@pytest.mark.parametrize("parts", [("features", 7), ("other features", 42)])
+def test_other_inputs_miss(pipeline, calls, parts):
+    """A stage run on other inputs, e.g. another seed or upstream key, is run again."""
+    pipeline.run_stage("split", ("features", 42), calls.append, 1)
+    pipeline.run_stage("split", parts, calls.append, 2)
+    assert calls == [1, 2]
+
+
+def test_same_inputs_of_another_stage_miss(pipeline, calls):
+    """The key of a stage holds its name."""
+    pipeline.run_stage("split", ("features", 42), calls.append, 1)
+    pipeline.run_stage("tune", ("features", 42), calls.append, 2)
+    assert calls == [1, 2]
+
+
+def test_forced_and_uncached_stages_run(tmp_path, calls):
+    """A forced stage and a stage without inputs are run every time."""
+    pipeline = TrainingPipeline(str(tmp_path), cache=StageCache(str(tmp_path / "cache")),
+                                force=["split"])
+    for _ in range(2):
+        pipeline.run_stage("split", ("features", 42), calls.append, 1)
+        pipeline.run_stage("export", None, calls.append, 2)
+    assert calls == [1, 2, 1, 2]
+
+
+def test_cache_survives_restart(tmp_path):
+    """A new cache over the same directory serves the outputs persisted before."""
+    StageCache(str(tmp_path)).put("fit", StageCache.get_key("fit", "split key"), {"trees": 3})
+
+    cached, value = StageCache(str(tmp_path)).get("fit", StageCache.get_key("fit", "split key"))
+    assert (cached, value) == (True, {"trees": 3})
+    assert StageCache(str(tmp_path)).get("fit", StageCache.get_key("fit", "tune key")) == (
+        False, None
+    )
@@ -0,0 +1,50 @@
+"""Checks of the columnar cache of the training data."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import os
+import shutil
+import pandas as pd
+import pytest
+from conftest import get_path
+from utils.training_data_cache import (
+    build_cache, is_cache_valid, load_training_data, read_cache_metadata
+)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """A copy of the training data."""
+    return shutil.copy(get_path("HOUSING_RECORDS_FILENAME"), tmp_path / "records.csv")
+
+
+def test_cache_holds_the_csv(csv_path, tmp_path):
+    """The cache reads back the values of the csv file, and is the only file written."""
+    cache_path = str(tmp_path / "records.parquet")
+    build_cache(csv_path, cache_path)
+
+    data, _ = load_training_data(csv_path, cache_path)
+    pd.testing.assert_frame_equal(data.astype(object), pd.read_csv(csv_path).astype(object))
+    assert sorted(os.listdir(tmp_path)) == ["records.csv", "records.parquet"]
+
+
+def test_touched_csv_refreshes_metadata(csv_path, tmp_path):
+    """A csv file touched without a change keeps the cache and updates its metadata."""
+    cache_path = str(tmp_path / "records.parquet")
+    _, metadata = build_cache(csv_path, cache_path)
+    os.utime(csv_path, ns=(0, 0))
+
+    assert is_cache_valid(csv_path, read_cache_metadata(cache_path), cache_path)
+    refreshed = read_cache_metadata(cache_path)
+    assert refreshed["mtime_ns"] == 0
+    assert refreshed["checksum"] == metadata["checksum"]
+
+
+def test_changed_csv_invalidates_cache(csv_path, tmp_path):
+    """A csv file with another content invalidates the cache."""
+    cache_path = str(tmp_path / "records.parquet")
+    build_cache(csv_path, cache_path)
+    pd.read_csv(csv_path).iloc[:10].to_csv(csv_path, index=False)
+
+    assert not is_cache_valid(csv_path, read_cache_metadata(cache_path), cache_path)
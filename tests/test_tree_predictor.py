@@ -0,0 +1,78 @@
+"""Checks of the NumPy tree walk against the xgboost runtime."""
+
+# pytest fixtures are passed by name
+# pylint: disable=W0621
+
+import joblib
+import numpy as np
+import pytest
+import xgboost as xgb
+from conftest import get_path
+from utils.feature_utils import build_training_features
+from utils.st_parameters import target_column
+from utils.tree_predictor import CompiledTreeEnsemble, flatten_booster, pad_trees
+
+
+@pytest.fixture(scope="module")
+def estimator():
+    """The main estimator."""
+    return joblib.load(get_path("HOUSING_ESTIMATOR_NAME"))
+
+
+@pytest.fixture(scope="module")
+def features(records, correlated_variables):
+    """Training features, with a tenth of the values missing in the second half."""
+    features, _ = build_training_features(records, correlated_variables, target_column)
+    features = features.to_numpy(dtype=np.float32)
+    rng = np.random.default_rng(0)
+    missing = rng.random(features.shape) < 0.1
+    missing[:len(features) // 2] = False
+    features[missing] = np.nan
+    return features
+
+
+@pytest.fixture(scope="module")
+def sparse_estimator():
+    """An estimator trained on data with missing values, so splits default either way."""
+    rng = np.random.default_rng(1)
+    features = rng.normal(size=(500, 6)).astype(np.float32)
+    target = features[:, 0] * 3 + np.where(np.isnan(features[:, 1]), 5, features[:, 1])
+    features[rng.random(features.shape) < 0.3] = np.nan
+    estimator = xgb.XGBRegressor(n_estimators=40, max_depth=4, random_state=0)
+    return estimator.fit(features, target), features
+
+
+def test_compiled_matches_xgboost(estimator, features):
+    """The flattened trees predict what xgboost predicts, with and without missing values."""
+    compiled = CompiledTreeEnsemble(flatten_booster(estimator.get_booster()))
+
+    np.testing.assert_allclose(compiled.predict(features), estimator.predict(features),
+                               rtol=1e-6)
+
+
+def test_exported_matches_xgboost(estimator, features):
+    """The compiled artifact of the dashboard is that of the main estimator."""
+    compiled = CompiledTreeEnsemble.load(get_path("COMPILED_ESTIMATOR_NAME"))
+
+    np.testing.assert_allclose(compiled.predict(features), estimator.predict(features),
+                               rtol=1e-6)
+
+
+def test_default_directions(sparse_estimator):
+    """Missing values follow the default direction learned for every split."""
+    estimator, features = sparse_estimator
+    arrays = flatten_booster(estimator.get_booster())
+    assert not arrays["default_left"].all()
+
+    np.testing.assert_allclose(CompiledTreeEnsemble(arrays).predict(features),
+                               estimator.predict(features), rtol=1e-6, atol=1e-6)
+
+
+def test_padding_keeps_predictions(sparse_estimator):
+    """Trees laid out deeper predict the same."""
+    estimator, features = sparse_estimator
+    arrays = flatten_booster(estimator.get_booster())
+    padded = pad_trees(arrays, int(arrays["max_depth"]) + 2)
+
+    np.testing.assert_array_equal(CompiledTreeEnsemble(padded).predict(features),
+                                  CompiledTreeEnsemble(arrays).predict(features))
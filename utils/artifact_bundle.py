@@ -0,0 +1,397 @@
+"""Pack the dashboard artifacts into one memory-mapped bundle file.
+
+Usage:
+
+    python -m utils.artifact_bundle build
+
+The bundle is a small header, a JSON manifest and the artifacts, each aligned
+to 64 bytes. Tables are stored column by column as raw NumPy arrays, and the
+other files, such as images and the estimator, as raw bytes. The manifest
+keeps the checksum of every artifact, checked the first time it is read, and
+the size and modification time of its source file, so an artifact whose file
+has changed since the bundle was built is read from the file.
+"""
+
+# pylint: disable=C0103,R0914
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import dotenv
+import numpy as np
+import pandas as pd
+
+
+magic = b"HHBUNDLE"
+bundle_version = 3
+alignment = 64
+header_format = "<8sIQ"  # magic, bundle version, manifest length
+
+# environment variables naming the artifacts read by the dashboard
+table_artifacts = [
+    "CORRELATED_VARIABLE_FILES",
+    "COLUMN_STATISTICS_FILENAME",
+    "VARIABLE_FILES",
+    "PREDICTION_SUBSET_FILENAME",
+    "PREDICTION_FEATURES_FILENAME",
+    "OPTIMISATION_PERFORMANCE_FILENAME",
+    "OPTIMISATION_FEATURES_IMPORTANCE_FILENAME",
+    "OPT_PARAMETERS_FILENAME",
+    "MODEL_PERFORMANCE_FILENAME",
+    "MODEL_FEATURES_IMPORTANCE_FILENAME",
+    "MODEL_PARAMETERS_FILENAME",
+    "MODEL_FIT_STATS_FILENAME",
+]
+file_artifacts = [
+    "LEARNING_CURVE_FILENAME",
+    "PREDICTION_CORRELATION_FILENAME",
+    "HOUSING_ESTIMATOR_NAME",
+    "COMPILED_ESTIMATOR_NAME",
+    "ENSEMBLE_ESTIMATOR_NAME",
+    "DISTRIBUTION_SUMMARIES_FILENAME",
+]
+
+
+def encode_column(values):
+    """
+    Encode a column as a raw NumPy array and an optional null mask.
+
+    Parameters
+    ----------
+    values : pandas.Series
+
+    Returns
+    -------
+    numpy.ndarray, numpy.ndarray or None
+    """
+    if values.dtype != object:
+        return np.ascontiguousarray(values.to_numpy()), None
+
+    nulls = values.isna().to_numpy()
+    strings = np.asarray(values.where(~nulls, "").astype(str).to_numpy(), dtype=str)
+    return strings, nulls if nulls.any() else None
+
+
+def get_source_stat(path):
+    """
+    Get the size and modification time of a source file.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    dict
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_blobs(entry):
+    """
+    Get the blobs of a manifest entry in the order they are written.
+
+    Parameters
+    ----------
+    entry : dict
+
+    Returns
+    -------
+    list
+        of dict with the offset and length of every blob
+    """
+    if entry["kind"] != "table":
+        return [entry["data"]]
+    blobs = []
+    for column in entry["columns"]:
+        blobs += [column["data"]] + ([] if column["nulls"] is None else [column["nulls"]])
+    return blobs
+
+
+def build_bundle(artifacts, path, sources=None):
+    """
+    Write the artifacts into one bundle file.
+
+    Parameters
+    ----------
+    artifacts : dict
+        name to pandas.DataFrame for tables, or to bytes for other files
+    path : str
+    sources : dict
+        name to the output of `get_source_stat` of the file of an artifact
+
+    Returns
+    -------
+    dict
+        manifest of the bundle
+    """
+    blobs = []
+    offset = 0
+
+    def add_blob(data):
+        nonlocal offset
+        data = data.tobytes() if isinstance(data, np.ndarray) else bytes(data)
+        start = offset
+        blobs.append((start, data))
+        offset += len(data) + (-len(data) % alignment)
+        return {"offset": start, "length": len(data)}
+
+    entries = {}
+    for name, artifact in artifacts.items():
+        first_blob = len(blobs)
+        if isinstance(artifact, pd.DataFrame):
+            columns = []
+            for column in artifact.columns:
+                values, nulls = encode_column(artifact[column])
+                columns.append({
+                    "name": column,
+                    "dtype": values.dtype.str,
+                    "data": add_blob(values),
+                    "nulls": None if nulls is None else add_blob(nulls),
+                })
+            entries[name] = {"kind": "table", "rows": len(artifact), "columns": columns}
+        else:
+            entries[name] = {"kind": "file", "data": add_blob(artifact)}
+        digest = hashlib.sha256()
+        for _, data in blobs[first_blob:]:
+            digest.update(data)
+        entries[name]["checksum"] = digest.hexdigest()
+        entries[name]["source"] = (sources or {}).get(name)
+
+    manifest = json.dumps({"version": bundle_version, "entries": entries}).encode()
+    data_start = struct.calcsize(header_format) + len(manifest)
+    data_start += -data_start % alignment
+
+    with open(path, "wb") as bundle:
+        bundle.write(struct.pack(header_format, magic, bundle_version, len(manifest)))
+        bundle.write(manifest)
+        for start, data in blobs:
+            bundle.seek(data_start + start)
+            bundle.write(data)
+
+    return json.loads(manifest)
+
+
+class ArtifactBundle:
+    """
+    Read artifacts from a bundle file, opened and memory-mapped once.
+
+    The source files of the artifacts are compared with the manifest once,
+    when the bundle is opened, and the checksum of an artifact is checked
+    the first time it is read, so opening the bundle does not read through
+    the whole memory map.
+
+    Parameters
+    ----------
+    path : str
+    data_path : str
+        directory of the source files of the artifacts, every artifact is
+        taken as current when not given
+    """
+
+    def __init__(self, path, data_path=None):
+        with open(path, "rb") as bundle:
+            self.buffer = mmap.mmap(bundle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_size = struct.calcsize(header_format)
+        file_magic, version, manifest_length = struct.unpack_from(header_format, self.buffer)
+        if file_magic != magic or version != bundle_version:
+            raise ValueError(f"{path} is not a version {bundle_version} artifact bundle")
+
+        self.manifest = json.loads(self.buffer[header_size:header_size + manifest_length])
+        self.data_start = header_size + manifest_length
+        self.data_start += -self.data_start % alignment
+
+        self.path = path
+        self.verified = set()
+        self.stale = set() if data_path is None else {
+            name for name, entry in self.manifest["entries"].items()
+            if not os.path.exists(os.path.join(data_path, name))
+            or entry["source"] != get_source_stat(os.path.join(data_path, name))
+        }
+
+    def __contains__(self, name):
+        return name in self.manifest["entries"]
+
+    def is_current(self, name):
+        """
+        Check that the file of an artifact had not changed since the bundle
+        was built when the bundle was opened.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        bool
+            False when the file had been removed, or had another size or
+            modification time than when the bundle was built
+        """
+        return name not in self.stale
+
+    def verify(self, name):
+        """
+        Check the checksum of an artifact, once.
+
+        Parameters
+        ----------
+        name : str
+
+        Raises
+        ------
+        ValueError
+            when the artifact does not match its checksum
+        """
+        if name in self.verified:
+            return
+        digest = hashlib.sha256()
+        for blob in get_blobs(self.manifest["entries"][name]):
+            start = self.data_start + blob["offset"]
+            digest.update(self.buffer[start:start + blob["length"]])
+        if digest.hexdigest() != self.manifest["entries"][name]["checksum"]:
+            raise ValueError(f"{name} in {self.path} does not match its checksum")
+        self.verified.add(name)
+
+    def read_array(self, blob, dtype):
+        """
+        Get a read-only array backed by the memory map, without copying.
+
+        Parameters
+        ----------
+        blob : dict
+            offset and length of the array in the manifest
+        dtype : str
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        dtype = np.dtype(dtype)
+        return np.frombuffer(
+            self.buffer, dtype=dtype, count=blob["length"] // dtype.itemsize,
+            offset=self.data_start + blob["offset"]
+        )
+
+    def read_table(self, name):
+        """
+        Read a table.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        self.verify(name)
+        columns = {}
+        for column in self.manifest["entries"][name]["columns"]:
+            values = self.read_array(column["data"], column["dtype"])
+            if values.dtype.kind == "U":
+                values = values.astype(object)
+                if column["nulls"] is not None:
+                    values[self.read_array(column["nulls"], "|b1")] = np.nan
+            columns[column["name"]] = values
+        return pd.DataFrame(columns)
+
+    def read_bytes(self, name):
+        """
+        Read a file.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        bytes
+        """
+        self.verify(name)
+        blob = self.manifest["entries"][name]["data"]
+        start = self.data_start + blob["offset"]
+        return self.buffer[start:start + blob["length"]]
+
+
+def collect_artifacts(data_path):
+    """
+    Collect the dashboard artifacts named by the environment variables.
+
+    Artifacts without a file in the data path are left out.
+
+    Parameters
+    ----------
+    data_path : str
+
+    Returns
+    -------
+    dict, dict
+        the artifacts and the output of `get_source_stat` of their files
+    """
+    artifacts = {}
+    sources = {}
+    for variable in table_artifacts + file_artifacts:
+        filename = os.getenv(variable)
+        path = os.path.join(data_path, filename)
+        if not os.path.exists(path):
+            continue
+        # the stat is taken first, so a file changed while it is read looks stale
+        sources[filename] = get_source_stat(path)
+        if variable in table_artifacts:
+            artifacts[filename] = pd.read_csv(path)
+        else:
+            with open(path, "rb") as artifact:
+                artifacts[filename] = artifact.read()
+    return artifacts, sources
+
+
+def build_data_path_bundle(data_path, output=None):
+    """
+    Pack the dashboard artifacts of a data path into its bundle file.
+
+    Parameters
+    ----------
+    data_path : str
+    output : str
+        ARTIFACT_BUNDLE_FILENAME in the data path when not given
+
+    Returns
+    -------
+    str, dict
+        path and manifest of the bundle
+    """
+    output = output or os.path.join(data_path, os.getenv("ARTIFACT_BUNDLE_FILENAME"))
+    artifacts, sources = collect_artifacts(data_path)
+    return output, build_bundle(artifacts, output, sources)
+
+
+def main(argv=None):
+    """
+    Run the build command.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    dotenv.load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Pack the dashboard artifacts into one file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="build the bundle")
+    build_parser.add_argument("--data-path", default=os.getenv("STREAMLIT_DATA_PATH"))
+    build_parser.add_argument("--output", default=None,
+                              help="defaults to ARTIFACT_BUNDLE_FILENAME in the data path")
+    args = parser.parse_args(argv)
+
+    output, manifest = build_data_path_bundle(args.data_path, args.output)
+    print(f"Packed {len(manifest['entries'])} artifacts into {output} "
+          f"({os.path.getsize(output):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
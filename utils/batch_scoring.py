@@ -0,0 +1,195 @@
+"""Score files of houses in bulk.
+
+Usage:
+
+    python -m utils.batch_scoring <input.csv|input.parquet> <output.csv|output.parquet>
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter
+import pandas as pd
+from utils.feature_utils import build_prediction_features
+from utils.st_data_utils import (
+    get_compiled_estimator, get_estimator, get_prediction_feature_layout
+)
+from utils.st_parameters import scoring_chunk_size, target_column
+
+
+def is_parquet(path):
+    """
+    Check if a file is a parquet file.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    bool
+    """
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def read_chunks(path, chunk_size):
+    """
+    Read a file of houses in chunks.
+
+    Parameters
+    ----------
+    path : str
+    chunk_size : int
+
+    Yields
+    ------
+    pandas.DataFrame
+    """
+    if is_parquet(path):
+        import pyarrow.parquet as pq  # pylint: disable=C0415
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def get_uniform_chunk(chunk):
+    """
+    Get a chunk with every numeric column as float.
+
+    Each chunk infers its own dtypes, so a column is read as integers in a
+    chunk without missing values and as floats in one with, which would
+    change the schema of the parquet output and the formatting of the csv
+    output from one chunk to the next.
+
+    Parameters
+    ----------
+    chunk : pandas.DataFrame
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    numeric = chunk.select_dtypes(include=["number", "bool"]).columns
+    return chunk.astype({col: "float64" for col in numeric})
+
+
+class PriceWriter:
+    """Append scored chunks to a csv or parquet file."""
+
+    def __init__(self, path, numeric_columns=()):
+        self.path = path
+        self.numeric_columns = set(numeric_columns)
+        self.writer = None
+        self.started = False
+
+    def write(self, chunk):
+        """
+        Append a scored chunk.
+
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+        """
+        chunk = get_uniform_chunk(chunk)
+        if is_parquet(self.path):
+            import pyarrow as pa  # pylint: disable=C0415
+            import pyarrow.parquet as pq  # pylint: disable=C0415
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.writer is None:
+                # a column without any value in the first chunk is taken as text,
+                # unless it is one of the numeric features
+                schema = pa.schema(
+                    [_.with_type(pa.float64() if _.name in self.numeric_columns else pa.string())
+                     if 0 < table.num_rows == table.column(_.name).null_count else _
+                     for _ in table.schema],
+                    metadata=table.schema.metadata
+                )
+                self.writer = pq.ParquetWriter(self.path, schema)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            chunk.to_csv(self.path, mode="a" if self.started else "w",
+                         header=not self.started, index=False)
+        self.started = True
+
+    def close(self):
+        """Close the file."""
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score_file(input_path, output_path, chunk_size=scoring_chunk_size, compiled=False):
+    """
+    Score the houses of a file chunk by chunk and write their prices.
+
+    Only one chunk is held in memory at a time, so the memory stays bounded
+    by the chunk size rather than the file size.
+
+    Parameters
+    ----------
+    input_path : str
+        csv or parquet file with the columns of `inherited_houses.csv`.
+    output_path : str
+        csv or parquet file to which the houses are written with their prices.
+    chunk_size : int
+    compiled : bool
+        predict with the compiled trees instead of xgboost.
+
+    Returns
+    -------
+    dict
+        number of rows, elapsed seconds and rows per second
+    """
+    estimator = get_compiled_estimator() if compiled else get_estimator()
+    layout = get_prediction_feature_layout()
+    writer = PriceWriter(output_path, [*layout["numerical"], *layout["temporal"]])
+    num_rows = 0
+    start = perf_counter()
+
+    try:
+        for chunk in read_chunks(input_path, chunk_size):
+            chunk[target_column] = estimator.predict(build_prediction_features(chunk, layout))
+            writer.write(chunk)
+            num_rows += len(chunk)
+    finally:
+        writer.close()
+
+    elapsed = perf_counter() - start
+
+    return {
+        "rows": num_rows,
+        "seconds": elapsed,
+        "rows_per_second": num_rows / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(argv=None):
+    """
+    Run the bulk scoring command.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    parser = argparse.ArgumentParser(description="Score a file of houses in bulk.")
+    parser.add_argument("input_path", help="csv or parquet file of houses")
+    parser.add_argument("output_path", help="csv or parquet file to write the prices to")
+    parser.add_argument("--chunk-size", type=int, default=scoring_chunk_size,
+                        help="number of houses scored at a time")
+    parser.add_argument("--compiled", action="store_true",
+                        help="predict with the compiled trees instead of xgboost")
+    args = parser.parse_args(argv)
+
+    stats = score_file(args.input_path, args.output_path, chunk_size=args.chunk_size,
+                       compiled=args.compiled)
+    print(
+        f"Scored {stats['rows']:,} houses in {stats['seconds']:.2f} seconds "
+        f"({stats['rows_per_second']:,.0f} rows/sec)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
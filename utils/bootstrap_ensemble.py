@@ -0,0 +1,318 @@
+"""Price ranges from an ensemble of models trained on bootstrap samples.
+
+Usage:
+
+    python -m utils.bootstrap_ensemble train [--members 10] [--workers N]
+    python -m utils.bootstrap_ensemble benchmark [--batch-sizes 1 4 10000]
+
+Every member is fitted with the parameters of the main estimator on a
+resample, with replacement, of the training split of the features, the
+houses the main estimator is fitted on. The members are
+flattened into one set of trees of a common depth and saved as a single npz
+file, so all of them are scored in one pass over the trees.
+"""
+
+# pylint: disable=R0913,R0914,R0917
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import multiprocessing
+import os
+from time import perf_counter
+import dotenv
+import numpy as np
+import pandas as pd
+from utils.feature_utils import (
+    build_prediction_features, build_training_features, get_feature_layout
+)
+from utils.st_parameters import ensemble_members, interval_quantiles, target_column
+from utils.tree_predictor import (
+    CompiledTreeEnsemble, flatten_booster, pad_trees, time_predict
+)
+
+
+interval_columns = [f"p{quantile}" for quantile in interval_quantiles]
+
+
+def train_member(params, features, target, seed):
+    """
+    Fit one member on a bootstrap sample of the training features.
+
+    Parameters
+    ----------
+    params : dict
+        of `xgboost.XGBRegressor`
+    features : pandas.DataFrame
+    target : pandas.Series
+    seed : int
+
+    Returns
+    -------
+    dict
+        Output of `utils.tree_predictor.flatten_booster`.
+    """
+    # only the training processes need xgboost
+    # pylint: disable=C0415
+    import xgboost as xgb
+
+    rows = np.random.default_rng(seed).integers(0, len(features), len(features))
+    estimator = xgb.XGBRegressor(**{**params, "random_state": int(seed), "n_jobs": 1})
+    estimator.fit(features.iloc[rows], target.iloc[rows])
+    return flatten_booster(estimator.get_booster())
+
+
+def stack_members(members):
+    """
+    Stack the trees of the members, laid out at their largest depth.
+
+    Parameters
+    ----------
+    members : list
+        of dict, from `flatten_booster`
+
+    Returns
+    -------
+    dict
+        of numpy.ndarray, with the first tree and the base score of every member
+    """
+    max_depth = max(int(member["max_depth"]) for member in members)
+    members = [pad_trees(member, max_depth) for member in members]
+    num_trees = [len(member["feature"]) for member in members]
+
+    return {
+        **{
+            name: np.concatenate([member[name] for member in members])
+            for name in ["feature", "threshold", "default_left", "value"]
+        },
+        "max_depth": np.asarray(max_depth),
+        "base_score": np.asarray([float(member["base_score"]) for member in members]),
+        "member_starts": np.concatenate([[0], np.cumsum(num_trees)[:-1]]),
+        "feature_names": members[0]["feature_names"],
+    }
+
+
+def train_ensemble(params, features, target, num_members=ensemble_members, workers=None,
+                   seed=0):
+    """
+    Fit the members in parallel processes.
+
+    Parameters
+    ----------
+    params : dict
+    features : pandas.DataFrame
+    target : pandas.Series
+    num_members : int
+    workers : int or None
+        one per member, up to the number of CPUs, when not given
+    seed : int
+
+    Returns
+    -------
+    BootstrapEnsemble
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(num_members).tolist()
+    workers = workers or min(num_members, os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        members = list(executor.map(
+            train_member, repeat(params), repeat(features), repeat(target), seeds
+        ))
+
+    return BootstrapEnsemble(stack_members(members))
+
+
+class BootstrapEnsemble:
+    """
+    Score all members of an ensemble in one pass over their trees.
+
+    Parameters
+    ----------
+    arrays : dict
+        Output of `stack_members`.
+    chunk_size : int
+        rows walked through the trees at a time
+    """
+
+    def __init__(self, arrays, chunk_size=128):
+        self.arrays = arrays
+        self.trees = CompiledTreeEnsemble(
+            {**arrays, "base_score": np.asarray(0.0)}, chunk_size=chunk_size
+        )
+        self.base_score = np.asarray(arrays["base_score"], dtype=np.float64)
+        self.member_starts = np.asarray(arrays["member_starts"], dtype=np.intp)
+        self.num_members = len(self.member_starts)
+        self.feature_names = self.trees.feature_names
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an ensemble saved by `save`.
+
+        Parameters
+        ----------
+        path : str or file-like
+
+        Returns
+        -------
+        BootstrapEnsemble
+        """
+        with np.load(path) as arrays:
+            return cls(dict(arrays))
+
+    def save(self, path):
+        """
+        Save the ensemble to a compressed npz file.
+
+        Parameters
+        ----------
+        path : str
+        """
+        np.savez_compressed(path, **self.arrays)
+
+    def predict_members(self, features):
+        """
+        Predict the target of a batch with every member.
+
+        Parameters
+        ----------
+        features : numpy.ndarray or pandas.DataFrame
+            of shape (N, number of features)
+
+        Returns
+        -------
+        numpy.ndarray
+            of shape (N, number of members)
+        """
+        features = np.asarray(features, dtype=np.float32)
+        predictions = np.empty((features.shape[0], self.num_members))
+        chunk_size = self.trees.chunk_size
+
+        for start in range(0, features.shape[0], chunk_size):
+            leaf_values = self.trees.value[
+                self.trees.predict_leaves(features[start:start + chunk_size])
+            ]
+            predictions[start:start + chunk_size] = np.add.reduceat(
+                leaf_values, self.member_starts, axis=1, dtype=np.float64
+            ) + self.base_score
+
+        return predictions
+
+    def predict_quantiles(self, features, quantiles=tuple(interval_quantiles)):
+        """
+        Predict percentiles of the target of a batch across the members.
+
+        Parameters
+        ----------
+        features : numpy.ndarray or pandas.DataFrame
+        quantiles : tuple
+            percentages
+
+        Returns
+        -------
+        numpy.ndarray
+            of shape (N, number of quantiles)
+        """
+        return np.percentile(self.predict_members(features), quantiles, axis=1).T
+
+
+def benchmark(estimator, ensemble, features, batch_sizes=(1, 10000), repeats=20):
+    """
+    Compare the latency of the price ranges to the single model prediction.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    ensemble : BootstrapEnsemble
+    features : numpy.ndarray
+        rows that are resampled to build each batch
+    batch_sizes : tuple
+    repeats : int
+
+    Returns
+    -------
+    list
+        of dict, one per batch size
+    """
+    rng = np.random.default_rng(0)
+    results = []
+
+    for batch_size in batch_sizes:
+        batch = features[rng.integers(0, len(features), batch_size)]
+        xgboost_ms = time_predict(estimator.predict, batch, repeats) * 1000
+        ensemble_ms = time_predict(ensemble.predict_quantiles, batch, repeats) * 1000
+        results.append({
+            "batch_size": batch_size,
+            "xgboost_ms": xgboost_ms,
+            "ensemble_ms": ensemble_ms,
+            "ratio": ensemble_ms / xgboost_ms,
+        })
+
+    return results
+
+
+def main(argv=None):
+    """
+    Run the train or benchmark command.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    dotenv.load_dotenv()
+    data_path = os.getenv("STREAMLIT_DATA_PATH")
+
+    def get_path(variable):
+        return os.path.join(data_path, os.getenv(variable))
+
+    parser = argparse.ArgumentParser(description="Train or time the bootstrap ensemble.")
+    parser.add_argument("--estimator", default=get_path("HOUSING_ESTIMATOR_NAME"))
+    parser.add_argument("--ensemble", default=get_path("ENSEMBLE_ESTIMATOR_NAME"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="fit the members and save the ensemble")
+    train_parser.add_argument("--members", type=int, default=ensemble_members)
+    train_parser.add_argument("--workers", type=int, default=None)
+    train_parser.add_argument("--seed", type=int, default=0)
+
+    benchmark_parser = commands.add_parser("benchmark", help="compare against xgboost")
+    benchmark_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 10000])
+
+    args = parser.parse_args(argv)
+
+    # pylint: disable=C0415
+    import joblib
+
+    estimator = joblib.load(args.estimator)
+    correlated_variables = pd.read_csv(get_path("CORRELATED_VARIABLE_FILES"))
+
+    if args.command == "train":
+        # the pipeline imports this module
+        from utils.model_training import split_data  # pylint: disable=R0401
+
+        split = split_data(*build_training_features(
+            pd.read_csv(get_path("HOUSING_RECORDS_FILENAME")), correlated_variables, target_column
+        ))
+        params = {key: val for key, val in estimator.get_params().items() if val is not None}
+
+        start = perf_counter()
+        ensemble = train_ensemble(params, split["X_train"], split["y_train"],
+                                  num_members=args.members, workers=args.workers,
+                                  seed=args.seed)
+        elapsed = perf_counter() - start
+        ensemble.save(args.ensemble)
+        print(f"Trained {ensemble.num_members} members with {ensemble.trees.num_trees} trees "
+              f"in {elapsed:.1f} seconds to {args.ensemble}")
+    else:
+        ensemble = BootstrapEnsemble.load(args.ensemble)
+        layout = get_feature_layout(ensemble.feature_names, correlated_variables)
+        features = build_prediction_features(
+            pd.read_csv(get_path("HOUSING_RECORDS_FILENAME")), layout
+        )
+        print(pd.DataFrame(benchmark(estimator, ensemble, features, args.batch_sizes))
+              .to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
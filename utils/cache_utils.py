@@ -0,0 +1,367 @@
+"""Caches shared across streamlit sessions."""
+
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+import joblib
+import pandas as pd
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with hit and miss counters.
+
+    Parameters
+    ----------
+    max_size : int
+        Number of entries kept before the least recently used one is evicted.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Parameters
+        ----------
+        key : hashable
+        default : object
+            returned when the key is not cached
+
+        Returns
+        -------
+        object
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Cache a value.
+
+        Parameters
+        ----------
+        key : hashable
+        value : object
+        """
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns
+        -------
+        dict
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class FigureCache:
+    """
+    Thread-safe cache of rendered figures, evicting the least recently used
+    ones once their total size exceeds `max_bytes`.
+
+    With a directory, every rendered figure is also written to disk, so that
+    a restarted app reads it back rather than rendering it again. The files
+    read or written least recently are deleted once they exceed
+    `max_disk_bytes`.
+
+    Parameters
+    ----------
+    max_bytes : int
+    directory : str or None
+    max_disk_bytes : int or None
+        no limit when not given
+    """
+
+    def __init__(self, max_bytes, directory=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        # where the figures are persisted and how many bytes of them are kept
+        self.disk = None if directory is None else {
+            "directory": directory, "max_bytes": max_disk_bytes
+        }
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.prune()
+
+    def get_file_path(self, key):
+        """
+        Get the path of the file persisting a figure.
+
+        Parameters
+        ----------
+        key : tuple
+            whose last element is the image format
+
+        Returns
+        -------
+        str
+        """
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.disk["directory"], f"{name}.{key[-1]}")
+
+    def add(self, key, image):
+        """
+        Add an entry and evict the least recently used ones, with the lock held.
+
+        Parameters
+        ----------
+        key : tuple
+        image : bytes
+        """
+        if key in self.entries:
+            self.total_bytes -= len(self.entries.pop(key))
+        self.entries[key] = image
+        self.total_bytes += len(image)
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+    def get(self, key):
+        """
+        Get a rendered figure, from memory or else from disk.
+
+        Parameters
+        ----------
+        key : tuple
+
+        Returns
+        -------
+        bytes or None
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+            if self.disk is not None and os.path.exists(self.get_file_path(key)):
+                with open(self.get_file_path(key), "rb") as persisted:
+                    image = persisted.read()
+                # keep the files in use from being pruned
+                os.utime(self.get_file_path(key))
+                self.add(key, image)
+                self.hits += 1
+                return image
+
+            self.misses += 1
+            return None
+
+    def put(self, key, image):
+        """
+        Cache a rendered figure.
+
+        Parameters
+        ----------
+        key : tuple
+        image : bytes
+        """
+        with self.lock:
+            self.add(key, image)
+
+        if self.disk is not None:
+            path = self.get_file_path(key)
+            handle, temporary_path = tempfile.mkstemp(dir=self.disk["directory"], suffix=".tmp")
+            with os.fdopen(handle, "wb") as persisted:
+                persisted.write(image)
+            os.replace(temporary_path, path)
+            self.prune()
+
+    def prune(self):
+        """Delete the least recently used files beyond `max_disk_bytes`."""
+        if self.disk is None or self.disk["max_bytes"] is None:
+            return
+
+        with self.lock:
+            files = []
+            for entry in os.scandir(self.disk["directory"]):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+            disk_bytes = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if disk_bytes <= self.disk["max_bytes"]:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                disk_bytes -= size
+
+    def get_or_render(self, key, render):
+        """
+        Get a rendered figure, rendering it on a miss.
+
+        Parameters
+        ----------
+        key : tuple
+        render : callable
+            returns the figure as bytes
+
+        Returns
+        -------
+        bytes
+        """
+        image = self.get(key)
+        if image is None:
+            image = render()
+            self.put(key, image)
+        return image
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns
+        -------
+        dict
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class StageCache:
+    """
+    Keep the outputs of pipeline stages on disk, keyed on the stage name and
+    everything its output depends on.
+
+    Parameters
+    ----------
+    directory : str
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(name, *parts):
+        """
+        Get the key of a stage output.
+
+        Parameters
+        ----------
+        name : str
+        *parts
+            with a stable `repr`, e.g. parameters, file checksums and the keys
+            of the upstream stages
+
+        Returns
+        -------
+        str
+        """
+        return hashlib.sha1(repr((name, parts)).encode()).hexdigest()
+
+    def get_file_path(self, name, key):
+        """
+        Get the path of the file persisting a stage output.
+
+        Parameters
+        ----------
+        name : str
+        key : str
+
+        Returns
+        -------
+        str
+        """
+        return os.path.join(self.directory, f"{name}-{key}.joblib")
+
+    def get(self, name, key):
+        """
+        Get a stage output.
+
+        Parameters
+        ----------
+        name : str
+        key : str
+
+        Returns
+        -------
+        bool, object
+            whether the output was cached, and the output
+        """
+        path = self.get_file_path(name, key)
+        if not os.path.exists(path):
+            return False, None
+        return True, joblib.load(path)
+
+    def put(self, name, key, value):
+        """
+        Cache a stage output.
+
+        Parameters
+        ----------
+        name : str
+        key : str
+        value : object
+        """
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(handle, "wb") as persisted:
+            joblib.dump(value, persisted)
+        os.replace(temporary_path, self.get_file_path(name, key))
+
+
+def get_data_fingerprint(data):
+    """
+    Get a fingerprint of the content of a data frame.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((list(data.columns), [str(dtype) for dtype in data.dtypes])).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
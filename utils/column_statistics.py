@@ -0,0 +1,275 @@
+"""Describe-style statistics and missing values of every training data column.
+
+Usage:
+
+    python -m utils.column_statistics build [--streaming]
+
+Every column is described on its own non-missing values, rather than on the
+rows complete across a column set as `dropna().describe()` does. With
+`--streaming`, the file is read in chunks: counts, means and variances are
+merged with Welford's method and the quartiles come from a reservoir sample
+of the rows, so files larger than memory can be described.
+"""
+
+# pylint: disable=R0902
+
+import argparse
+import os
+import dotenv
+import numpy as np
+import pandas as pd
+from utils.batch_scoring import read_chunks
+from utils.st_parameters import scoring_chunk_size, statistics_reservoir_size
+
+
+statistics_columns = [
+    "count", "mean", "std", "min", "25%", "50%", "75%", "max", "na_count", "percentage"
+]
+quantiles = [0.25, 0.5, 0.75]
+
+
+def get_numeric_columns(data):
+    """
+    Get the columns holding numbers.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+
+    Returns
+    -------
+    list
+    """
+    return [
+        column for column in data.columns
+        if pd.api.types.is_numeric_dtype(data[column])
+        and not pd.api.types.is_bool_dtype(data[column])
+    ]
+
+
+def describe_columns(data):
+    """
+    Describe every column in one vectorized pass over the numeric block.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+
+    Returns
+    -------
+    pandas.DataFrame
+        indexed by column, with `statistics_columns`
+    """
+    statistics = pd.DataFrame(np.nan, index=pd.Index(data.columns, name="column"),
+                              columns=statistics_columns)
+    na_count = data.isna().sum().to_numpy()
+    statistics["na_count"] = na_count
+    statistics["count"] = len(data) - na_count
+    statistics["percentage"] = np.round(na_count / max(len(data), 1) * 100, 2)
+
+    numeric = get_numeric_columns(data)
+    if numeric:
+        values = data[numeric].to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            statistics.loc[numeric, ["mean", "std", "min", "max"]] = np.column_stack([
+                np.nanmean(values, axis=0),
+                np.nanstd(values, axis=0, ddof=1),
+                np.nanmin(values, axis=0),
+                np.nanmax(values, axis=0),
+            ])
+            statistics.loc[numeric, ["25%", "50%", "75%"]] = np.nanquantile(
+                values, quantiles, axis=0
+            ).T
+
+    return statistics
+
+
+class StreamingStatistics:
+    """
+    Describe columns chunk by chunk, in memory bounded by the reservoir size.
+
+    Parameters
+    ----------
+    reservoir_size : int
+        Number of rows sampled to estimate the quartiles, which are exact
+        when the data has no more rows.
+    seed : int
+    """
+
+    def __init__(self, reservoir_size=statistics_reservoir_size, seed=0):
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        self.columns = None
+        self.numeric = None
+        self.rows = 0
+        self.na_count = None
+        self.count = None
+        self.mean = None
+        self.m2 = None
+        self.minimum = None
+        self.maximum = None
+        self.reservoir = None
+
+    def start(self, chunk):
+        """
+        Set up the counters from the columns of the first chunk.
+
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+        """
+        self.columns = list(chunk.columns)
+        self.numeric = get_numeric_columns(chunk)
+        self.na_count = np.zeros(len(self.columns), dtype=np.int64)
+        self.count = np.zeros(len(self.numeric), dtype=np.int64)
+        self.mean = np.zeros(len(self.numeric))
+        self.m2 = np.zeros(len(self.numeric))
+        self.minimum = np.full(len(self.numeric), np.inf)
+        self.maximum = np.full(len(self.numeric), -np.inf)
+        self.reservoir = np.empty((0, len(self.numeric)))
+
+    def update(self, chunk):
+        """
+        Add a chunk of rows.
+
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+        """
+        if self.columns is None:
+            self.start(chunk)
+
+        self.na_count += chunk[self.columns].isna().sum().to_numpy()
+        values = chunk[self.numeric].to_numpy(dtype=np.float64)
+
+        # merge the chunk moments into the running ones (Chan et al.)
+        present = ~np.isnan(values)
+        count = present.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+            m2 = np.nansum((values - mean) ** 2, axis=0)
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = np.where(
+                total > 0, self.m2 + m2 + delta ** 2 * self.count * count / total, 0.0
+            )
+        self.count = total
+        self.minimum = np.fmin(self.minimum, np.nanmin(values, axis=0, initial=np.inf))
+        self.maximum = np.fmax(self.maximum, np.nanmax(values, axis=0, initial=-np.inf))
+
+        self.sample(values)
+        self.rows += len(chunk)
+
+    def sample(self, values):
+        """
+        Keep every row with the same probability in the reservoir (algorithm R).
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            numeric block of a chunk
+        """
+        free = max(self.reservoir_size - len(self.reservoir), 0)
+        self.reservoir = np.vstack([self.reservoir, values[:free]])
+
+        positions = self.rows + free + np.arange(len(values) - free)
+        slots = self.rng.integers(0, positions + 1)
+        kept = slots < self.reservoir_size
+        # later rows overwrite earlier ones, as when drawn one at a time
+        self.reservoir[slots[kept]] = values[free:][kept]
+
+    def result(self):
+        """
+        Get the statistics of the rows added so far.
+
+        Returns
+        -------
+        pandas.DataFrame
+            indexed by column, with `statistics_columns`
+        """
+        statistics = pd.DataFrame(np.nan, index=pd.Index(self.columns, name="column"),
+                                  columns=statistics_columns)
+        statistics["na_count"] = self.na_count
+        statistics["count"] = self.rows - self.na_count
+        statistics["percentage"] = np.round(self.na_count / max(self.rows, 1) * 100, 2)
+
+        if self.numeric:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                statistics.loc[self.numeric, "mean"] = np.where(
+                    self.count > 0, self.mean, np.nan
+                )
+                statistics.loc[self.numeric, "std"] = np.where(
+                    self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan
+                )
+                statistics.loc[self.numeric, "min"] = np.where(
+                    self.count > 0, self.minimum, np.nan
+                )
+                statistics.loc[self.numeric, "max"] = np.where(
+                    self.count > 0, self.maximum, np.nan
+                )
+                statistics.loc[self.numeric, ["25%", "50%", "75%"]] = np.nanquantile(
+                    self.reservoir, quantiles, axis=0
+                ).T
+
+        return statistics
+
+
+def stream_statistics(path, chunk_size=scoring_chunk_size,
+                      reservoir_size=statistics_reservoir_size):
+    """
+    Describe the columns of a csv or parquet file read in chunks.
+
+    Parameters
+    ----------
+    path : str
+    chunk_size : int
+    reservoir_size : int
+
+    Returns
+    -------
+    pandas.DataFrame
+        indexed by column, with `statistics_columns`
+    """
+    statistics = StreamingStatistics(reservoir_size=reservoir_size)
+    for chunk in read_chunks(path, chunk_size):
+        statistics.update(chunk)
+    return statistics.result()
+
+
+def main(argv=None):
+    """
+    Run the build command.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    dotenv.load_dotenv()
+    data_path = os.getenv("STREAMLIT_DATA_PATH")
+
+    parser = argparse.ArgumentParser(description="Describe every training data column.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="write the statistics")
+    build_parser.add_argument("--input", default=os.path.join(
+        data_path, os.getenv("HOUSING_RECORDS_FILENAME")
+    ))
+    build_parser.add_argument("--output", default=os.path.join(
+        data_path, os.getenv("COLUMN_STATISTICS_FILENAME")
+    ))
+    build_parser.add_argument("--streaming", action="store_true",
+                              help="read the input in chunks")
+    build_parser.add_argument("--chunk-size", type=int, default=scoring_chunk_size)
+    args = parser.parse_args(argv)
+
+    if args.streaming:
+        statistics = stream_statistics(args.input, args.chunk_size)
+    else:
+        statistics = describe_columns(pd.read_csv(args.input))
+
+    statistics.reset_index().to_csv(args.output, index=False)
+    print(f"Described {len(statistics)} columns in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Per-prediction contributions of the correlated variables.
+
+The booster splits every prediction into SHAP contributions of its
+engineered columns plus a bias (`pred_contribs`). The contributions of the
+columns built from the same correlated variable, e.g. `KitchenQual_Gd_sum`
+and `KitchenQual_Gd_mean`, or the five aggregations of `GrLivArea`, are
+added back together.
+"""
+
+# pylint: disable=C0103
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+
+bias_column = "bias"
+
+
+def get_feature_groups(layout):
+    """
+    Get the engineered columns built from each correlated variable.
+
+    Parameters
+    ----------
+    layout : dict
+        from `utils.feature_utils.get_feature_layout`
+
+    Returns
+    -------
+    dict
+        variable to column indices
+    """
+    groups = {}
+    for var in layout["feature_names"]:
+        if var in layout["categorical"]:
+            groups[var] = [idx for pair in layout["categorical"][var].values() for idx in pair]
+        elif var in layout["numerical"]:
+            groups[var] = list(layout["numerical"][var])
+        else:
+            groups[var] = [layout["temporal"][var]]
+    return groups
+
+
+def aggregate_contributions(contributions, layout):
+    """
+    Add up the contributions of the columns of each correlated variable.
+
+    Parameters
+    ----------
+    contributions : numpy.ndarray
+        of shape (N, number of columns + 1), the bias last
+    layout : dict
+
+    Returns
+    -------
+    pandas.DataFrame
+        one column per correlated variable, and the bias
+    """
+    groups = get_feature_groups(layout)
+    # one-hot matrix summing the columns of every variable in one product
+    membership = np.zeros((contributions.shape[1], len(groups) + 1))
+    for position, indices in enumerate(groups.values()):
+        membership[indices, position] = 1.0
+    membership[-1, -1] = 1.0
+
+    return pd.DataFrame(
+        contributions.astype(np.float64) @ membership,
+        columns=[*groups, bias_column]
+    )
+
+
+def explain_batch(estimator, features, layout):
+    """
+    Get the contributions of the correlated variables to a batch of predictions.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    features : numpy.ndarray
+        prediction features of shape (N, number of columns)
+    layout : dict
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per prediction, adding up to it
+    """
+    booster = estimator.get_booster()
+    contributions = booster.predict(
+        xgb.DMatrix(features, feature_names=booster.feature_names), pred_contribs=True
+    )
+    return aggregate_contributions(contributions, layout)
@@ -0,0 +1,141 @@
+"""Vectorized correlations of every feature to the target."""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+from utils.cache_utils import LRUCache, get_data_fingerprint
+from utils.st_parameters import correlation_cache_size
+
+
+correlation_cache = LRUCache(max_size=correlation_cache_size)
+
+
+def pearson_to_target(features, target):
+    """
+    Get the Pearson coefficient of every column to the target in one pass.
+
+    Missing values are excluded pairwise, i.e. each coefficient uses the rows
+    where both the column and the target are present.
+
+    Parameters
+    ----------
+    features : numpy.ndarray
+        of shape (N, K)
+    target : numpy.ndarray
+        of shape (N,)
+
+    Returns
+    -------
+    numpy.ndarray
+        of shape (K,)
+    """
+    mask = ~np.isnan(features) & ~np.isnan(target)[:, np.newaxis]
+    count = mask.sum(axis=0)
+
+    # center first, as the coefficient does not depend on the shift
+    x = np.where(mask, features - np.nanmean(features, axis=0), 0.0)
+    y = np.where(mask, (target - np.nanmean(target))[:, np.newaxis], 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = x.sum(axis=0) / count
+        mean_y = y.sum(axis=0) / count
+        x = np.where(mask, x - mean_x, 0.0)
+        y = np.where(mask, y - mean_y, 0.0)
+        corr = (x * y).sum(axis=0) / np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+
+    corr[count < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def spearman_to_target(features, target):
+    """
+    Get the Spearman coefficient of every column to the target.
+
+    Parameters
+    ----------
+    features : numpy.ndarray
+        of shape (N, K)
+    target : numpy.ndarray
+        of shape (N,)
+
+    Returns
+    -------
+    numpy.ndarray
+        of shape (K,)
+    """
+    mask = ~np.isnan(features) & ~np.isnan(target)[:, np.newaxis]
+    complete = mask.all(axis=0)
+    corr = np.full(features.shape[1], np.nan)
+
+    # columns without missing pairs share the ranks of the target
+    if complete.any():
+        corr[complete] = pearson_to_target(
+            rankdata(features[:, complete], axis=0), rankdata(target)
+        )
+
+    # the others are ranked over their own pairs
+    for idx in np.flatnonzero(~complete):
+        rows = mask[:, idx]
+        corr[idx] = pearson_to_target(
+            rankdata(features[rows, idx])[:, np.newaxis], rankdata(target[rows])
+        )[0]
+
+    return corr
+
+
+def compute_target_correlations(data, target_column, method="pearson"):
+    """
+    Get the correlation of every numeric column to the target.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+    target_column : str
+    method : str
+        "pearson" or "spearman"
+
+    Returns
+    -------
+    pandas.Series
+        indexed by column
+    """
+    numeric = data.select_dtypes(include="number")
+    features = numeric.to_numpy(dtype=np.float64)
+    target = data[target_column].to_numpy(dtype=np.float64)
+
+    if method == "pearson":
+        corr = pearson_to_target(features, target)
+    elif method == "spearman":
+        corr = spearman_to_target(features, target)
+    else:
+        raise ValueError(f"unknown correlation method: {method}")
+
+    return pd.Series(corr, index=numeric.columns, name=target_column)
+
+
+def get_target_correlations(data, target_column, method="pearson", data_fingerprint=None):
+    """
+    Get the correlation of every numeric column to the target, cached per dataset.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+    target_column : str
+    method : str
+        "pearson" or "spearman"
+    data_fingerprint : str
+        identifies the content of the data, e.g. the checksum of the file it
+        was loaded from, so a cache hit does not hash the data again. Computed
+        from the data when not given.
+
+    Returns
+    -------
+    pandas.Series
+        indexed by column
+    """
+    key = (data_fingerprint or get_data_fingerprint(data), target_column, method)
+    correlations = correlation_cache.get(key)
+    if correlations is None:
+        correlations = compute_target_correlations(data, target_column, method)
+        correlation_cache.put(key, correlations)
+    return correlations
@@ -0,0 +1,62 @@
+"""Windows of rows and columns read from the columnar training data cache."""
+
+# pylint: disable=R0903
+
+from threading import Lock
+import numpy as np
+import pyarrow.parquet as pq
+
+
+class DataBrowser:
+    """
+    Read row windows of a parquet file, touching only the row groups they span.
+
+    Parameters
+    ----------
+    path : str
+    """
+
+    def __init__(self, path):
+        self.parquet_file = pq.ParquetFile(path)
+        self.lock = Lock()
+        metadata = self.parquet_file.metadata
+        self.num_rows = metadata.num_rows
+        self.columns = list(self.parquet_file.schema_arrow.names)
+        # first row of every row group, and the end of the file
+        self.row_group_starts = np.concatenate([[0], np.cumsum([
+            metadata.row_group(idx).num_rows for idx in range(metadata.num_row_groups)
+        ])])
+
+    def read_window(self, offset, limit, columns=None):
+        """
+        Read a window of rows.
+
+        Parameters
+        ----------
+        offset : int
+            first row of the window
+        limit : int
+            maximum number of rows
+        columns : list or None
+            all columns when not given
+
+        Returns
+        -------
+        pandas.DataFrame
+            indexed by row number
+        """
+        offset = min(max(offset, 0), self.num_rows)
+        end = min(offset + max(limit, 0), self.num_rows)
+        columns = self.columns if columns is None else list(columns)
+
+        row_groups = np.flatnonzero(
+            (self.row_group_starts[:-1] < end) & (self.row_group_starts[1:] > offset)
+        ).tolist()
+
+        with self.lock:
+            table = self.parquet_file.read_row_groups(row_groups, columns=columns)
+
+        start = int(self.row_group_starts[row_groups[0]]) if row_groups else 0
+        window = table.slice(offset - start, end - offset).to_pandas()
+        window.index = range(offset, offset + len(window))
+        return window
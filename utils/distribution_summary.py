@@ -0,0 +1,131 @@
+"""Precomputed distributions of the training data columns.
+
+Usage:
+
+    python -m utils.distribution_summary build
+
+Numerical columns are summarized by histogram bin edges and counts, and
+categorical ones by the count of each value, so the distribution plots are
+drawn without going over the rows again.
+"""
+
+import argparse
+import json
+import os
+import dotenv
+import numpy as np
+import pandas as pd
+from utils.feature_utils import get_category_label
+
+
+def is_numeric_column(values):
+    """
+    Check if a column holds numbers.
+
+    Parameters
+    ----------
+    values : pandas.Series
+
+    Returns
+    -------
+    bool
+    """
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+
+def summarize_column(values, categorical):
+    """
+    Summarize the distribution of a column.
+
+    Parameters
+    ----------
+    values : pandas.Series
+    categorical : bool
+
+    Returns
+    -------
+    dict
+    """
+    values = values.dropna()
+
+    if categorical:
+        counts = values.value_counts(sort=False)
+        if is_numeric_column(values):
+            counts = counts.sort_index()
+        elif not isinstance(values.dtype, pd.CategoricalDtype):
+            # in order of appearance, as countplot draws text values
+            counts = counts.reindex(pd.unique(values))
+        return {
+            "kind": "categorical",
+            "labels": [get_category_label(label) for label in counts.index],
+            "counts": counts.astype(int).tolist(),
+        }
+
+    counts, edges = np.histogram(values.to_numpy(dtype=np.float64), bins="auto")
+    return {
+        "kind": "numerical",
+        "edges": edges.tolist(),
+        "counts": counts.tolist(),
+    }
+
+
+def build_distribution_summaries(data, variable_info):
+    """
+    Summarize the distribution of every column.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+    variable_info : pandas.DataFrame
+
+    Returns
+    -------
+    dict
+        column to summary
+    """
+    categorical_variables = set(variable_info[
+        variable_info["featureType"] == "categorical"
+    ]["featureName"])
+
+    return {
+        column: summarize_column(
+            data[column],
+            categorical=column in categorical_variables or not is_numeric_column(data[column])
+        )
+        for column in data.columns
+    }
+
+
+def main(argv=None):
+    """
+    Run the build command.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    dotenv.load_dotenv()
+    data_path = os.getenv("STREAMLIT_DATA_PATH")
+
+    parser = argparse.ArgumentParser(description="Summarize the training data distributions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="write the summaries")
+    build_parser.add_argument("--data-path", default=data_path)
+    build_parser.add_argument("--output", default=None,
+                              help="defaults to DISTRIBUTION_SUMMARIES_FILENAME in the data path")
+    args = parser.parse_args(argv)
+
+    data = pd.read_csv(os.path.join(args.data_path, os.getenv("HOUSING_RECORDS_FILENAME")))
+    variable_info = pd.read_csv(os.path.join(args.data_path, os.getenv("VARIABLE_FILES")))
+    output = args.output or os.path.join(
+        args.data_path, os.getenv("DISTRIBUTION_SUMMARIES_FILENAME")
+    )
+
+    summaries = build_distribution_summaries(data, variable_info)
+    with open(output, "w", encoding="utf-8") as summary_file:
+        json.dump(summaries, summary_file)
+    print(f"Summarized {len(summaries)} columns in {output}")
+
+
+if __name__ == "__main__":
+    main()
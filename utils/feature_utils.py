@@ -0,0 +1,229 @@
+"""Vectorized feature engineering for batches of houses."""
+
+# pylint: disable=R0914
+
+import numpy as np
+import pandas as pd
+
+
+numerical_aggregations = ["count", "mean", "max", "min", "sum"]
+categorical_aggregations = ["sum", "mean"]
+
+
+def get_category_label(value):
+    """
+    Get the label of a categorical value as used in the dummy column names.
+
+    Parameters
+    ----------
+    value : object
+
+    Returns
+    -------
+    str
+    """
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def get_feature_layout(feature_columns, correlated_variables):
+    """
+    Precompute the column index maps of the prediction feature layout.
+
+    Parameters
+    ----------
+    feature_columns : list
+        Columns of the prediction features, e.g. those of `prediction_features.csv`.
+    correlated_variables : pandas.DataFrame
+        Content of `correlated_variables.csv`.
+
+    Returns
+    -------
+    dict
+    """
+    columns = list(feature_columns)
+    column_index = {col: idx for idx, col in enumerate(columns)}
+    feature_types = correlated_variables.set_index("featureName")["featureType"]
+
+    categorical = {}
+    for var in feature_types.index[feature_types == "categorical"]:
+        prefix = f"{var}_"
+        categorical[var] = {
+            col[len(prefix):-len("_sum")]: (column_index[col], column_index[f"{col[:-4]}_mean"])
+            for col in columns
+            if col.startswith(prefix) and col.endswith("_sum")
+        }
+
+    numerical = {
+        var: [column_index[f"{var}_{agg}"] for agg in numerical_aggregations]
+        for var in feature_types.index[feature_types == "numerical"]
+    }
+
+    year_built_values = correlated_variables.set_index("featureName").loc[
+        "YearBuilt", "featureValues"
+    ]
+
+    return {
+        "columns": columns,
+        "feature_names": feature_types.index.tolist(),
+        "categorical": categorical,
+        "numerical": numerical,
+        "temporal": {
+            "YearBuilt": column_index["NumYearsSinceBuilt"],
+            "YearRemodAdd": column_index["NumYearsSinceRemodelled"],
+        },
+        "latest_year": int(year_built_values.split("-")[-1]),
+    }
+
+
+def get_house_key(house, layout):
+    """
+    Get a canonical key of a house over the correlated variables.
+
+    Choices that describe the same house, e.g. `6`, `6.0` and `"6"` for a
+    rating or `896` and `896.0` for an area, map to the same key, and any
+    other entry such as a previous `SalePrice` is ignored.
+
+    Parameters
+    ----------
+    house : dict
+    layout : dict
+        Output of `get_feature_layout`.
+
+    Returns
+    -------
+    tuple
+    """
+    key = []
+    for var in layout["feature_names"]:
+        value = house[var]
+        if var in layout["categorical"]:
+            key.append(get_category_label(value))
+        else:
+            value = float(value)
+            key.append(int(value) if value.is_integer() else value)
+    return tuple(key)
+
+
+def build_prediction_features(houses, layout):
+    """
+    Build the prediction features of a batch of houses.
+
+    Each row gets the same values as the single-row aggregation in the model
+    training notebook, written straight into one preallocated matrix.
+
+    A category without columns in the layout, i.e. one never seen in the
+    training data such as KitchenQual "Po" or OverallCond "10", is encoded
+    as all zeros, the same as a missing category. The model then predicts
+    as if the variable was unknown, which keeps the full range of choices of
+    the dashboard, the sensitivity sweep and the renovation search usable.
+
+    Parameters
+    ----------
+    houses : pandas.DataFrame
+        N rows holding the correlated variables.
+    layout : dict
+        Output of `get_feature_layout`.
+
+    Returns
+    -------
+    numpy.ndarray
+        of shape (N, number of feature columns)
+    """
+    num_rows = len(houses)
+    features = np.zeros((num_rows, len(layout["columns"])), dtype=np.float64)
+    rows = np.arange(num_rows)
+
+    # categorical features: one-hot sum and mean of a single observation
+    for var, label_index in layout["categorical"].items():
+        labels = houses[var].to_numpy(dtype=object)
+        codes = pd.Series(labels).map(
+            lambda _: np.nan if pd.isna(_) else get_category_label(_)
+        ).map({label: pos for pos, label in enumerate(label_index)})
+        known = codes.notna().to_numpy()
+        column_pairs = np.array(list(label_index.values()), dtype=np.intp).reshape(-1, 2)
+        selected = column_pairs[codes[known].astype(np.intp).to_numpy()]
+        features[rows[known], selected[:, 0]] = 1.0
+        features[rows[known], selected[:, 1]] = 1.0
+
+    # numerical features: count, mean, max, min and sum of a single observation
+    for var, (count_idx, mean_idx, max_idx, min_idx, sum_idx) in layout["numerical"].items():
+        values = houses[var].to_numpy(dtype=np.float64)
+        observed = ~np.isnan(values)
+        features[:, count_idx] = observed
+        features[:, mean_idx] = values
+        features[:, max_idx] = values
+        features[:, min_idx] = values
+        features[:, sum_idx] = np.where(observed, values, 0.0)
+
+    # temporal features
+    for var, idx in layout["temporal"].items():
+        features[:, idx] = layout["latest_year"] - houses[var].to_numpy(dtype=np.float64)
+
+    return features
+
+
+def get_target_bins(target):
+    """
+    Get the histogram bin of every target value, labelled by its lower edge.
+
+    Parameters
+    ----------
+    target : pandas.Series
+
+    Returns
+    -------
+    pandas.Series
+        named after the target with a `Bin` suffix
+    """
+    edges = np.histogram_bin_edges(target, bins="auto")
+    positions = np.clip(np.searchsorted(edges, target, side="right") - 1, 0, len(edges) - 1)
+    return pd.Series(np.round(edges[positions]), index=target.index, name=f"{target.name}Bin")
+
+
+def build_training_features(records, correlated_variables, target_column):
+    """
+    Build the training features as in the model training notebook.
+
+    The houses are binned on the histogram of the target. Every house gets
+    the one-hot sum and mean of the categorical variables and the count,
+    mean, max, min and sum of the numerical variables over its bin, along
+    with its age and the years since it was remodelled.
+
+    Parameters
+    ----------
+    records : pandas.DataFrame
+        Content of `house_prices_records.csv`.
+    correlated_variables : pandas.DataFrame
+        Content of `correlated_variables.csv`.
+    target_column : str
+
+    Returns
+    -------
+    pandas.DataFrame, pandas.Series
+        the features, in the columns of the prediction features, and the target
+    """
+    feature_types = correlated_variables.set_index("featureName")["featureType"]
+    categorical = feature_types.index[feature_types == "categorical"].tolist()
+    numerical = feature_types.index[feature_types == "numerical"].tolist()
+
+    target = records[target_column]
+    bins = get_target_bins(target)
+
+    aggregates = []
+    for dummies, aggregations in [
+        (pd.get_dummies(records[categorical].astype(object)), categorical_aggregations),
+        (records[numerical].astype(float), numerical_aggregations),
+    ]:
+        aggregate = pd.concat([dummies, bins], axis=1).groupby(bins.name).agg(aggregations)
+        aggregate.columns = ["_".join(_) for _ in aggregate.columns]
+        aggregates.append(aggregate)
+
+    features = pd.concat(aggregates, axis=1).reindex(bins.to_numpy())
+    features.index = records.index
+    latest_year = records["YearBuilt"].max()
+    features["NumYearsSinceBuilt"] = latest_year - records["YearBuilt"]
+    features["NumYearsSinceRemodelled"] = latest_year - records["YearRemodAdd"]
+
+    return features.astype(np.float64), target
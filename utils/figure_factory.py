@@ -0,0 +1,184 @@
+"""Figures created and released without pyplot.
+
+Usage:
+
+    python -m utils.figure_factory --renders 10000
+
+Figures made with `matplotlib.figure.Figure` are not registered with the
+global figure manager of pyplot, so they are freed as soon as they are
+released. The factory counts the figures it has handed out and not yet
+released, which stays at zero between renders when nothing leaks.
+"""
+
+import argparse
+import io
+import os
+import resource
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+import dotenv
+import pandas as pd
+from matplotlib.figure import Figure
+
+
+class FigureFactory:
+    """Create figures and release them after serialization, counting both."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.live = {}
+        self.created = 0
+        self.released = 0
+        self.rendered_bytes = 0
+
+    def create(self, **kwargs):
+        """
+        Create a figure.
+
+        Parameters
+        ----------
+        **kwargs
+            passed to `matplotlib.figure.Figure`
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+        """
+        fig = Figure(**kwargs)
+        width, height = fig.get_size_inches() * fig.dpi
+        with self.lock:
+            # the RGBA buffer the figure needs once drawn
+            self.live[id(fig)] = int(width * height * 4)
+            self.created += 1
+        return fig
+
+    def release(self, fig):
+        """
+        Release a figure, clearing its artists so nothing keeps them alive.
+
+        Parameters
+        ----------
+        fig : matplotlib.figure.Figure
+        """
+        fig.clear()
+        with self.lock:
+            if self.live.pop(id(fig), None) is not None:
+                self.released += 1
+
+    @contextmanager
+    def figure(self, **kwargs):
+        """
+        Create a figure that is released when the block exits.
+
+        Parameters
+        ----------
+        **kwargs
+            passed to `matplotlib.figure.Figure`
+
+        Yields
+        ------
+        matplotlib.figure.Figure
+        """
+        fig = self.create(**kwargs)
+        try:
+            yield fig
+        finally:
+            self.release(fig)
+
+    def render(self, fig, **kwargs):
+        """
+        Serialize a figure and release it.
+
+        Parameters
+        ----------
+        fig : matplotlib.figure.Figure
+        **kwargs
+            passed to `matplotlib.figure.Figure.savefig`
+
+        Returns
+        -------
+        bytes
+        """
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, **kwargs)
+            image = buffer.getvalue()
+        finally:
+            self.release(fig)
+        with self.lock:
+            self.rendered_bytes += len(image)
+        return image
+
+    def stats(self):
+        """
+        Get the figure counters.
+
+        Returns
+        -------
+        dict
+        """
+        with self.lock:
+            return {
+                "live_figures": len(self.live),
+                "live_figure_bytes": sum(self.live.values()),
+                "created": self.created,
+                "released": self.released,
+                "rendered_bytes": self.rendered_bytes,
+            }
+
+
+figure_factory = FigureFactory()
+
+
+def get_peak_memory():
+    """
+    Get the peak resident memory of the process.
+
+    Returns
+    -------
+    int
+        bytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main(argv=None):
+    """
+    Render the data distribution plot repeatedly and report the memory in use.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    parser = argparse.ArgumentParser(description="Check that rendering figures does not leak.")
+    parser.add_argument("--renders", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=4,
+                        help="number of training data columns in each plot")
+    parser.add_argument("--report-every", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    # the insight utilities create their figures with this module
+    # pylint: disable=C0415,R0401
+    from utils.st_insight_utils import plot_data_distribution, render_figure
+    from utils.st_parameters import plot_columns
+
+    dotenv.load_dotenv()
+    data_path = os.getenv("STREAMLIT_DATA_PATH")
+    data = pd.read_csv(os.path.join(data_path, os.getenv("HOUSING_RECORDS_FILENAME")))
+    variable_info = pd.read_csv(os.path.join(data_path, os.getenv("VARIABLE_FILES")))
+    data = data[data.columns[:args.columns]]
+
+    start = perf_counter()
+    for idx in range(1, args.renders + 1):
+        render_figure(plot_data_distribution(plot_columns, variable_info, data))
+        if idx % args.report_every == 0 or idx == args.renders:
+            stats = figure_factory.stats()
+            print(f"{idx:>7,} renders {perf_counter() - start:8.1f}s "
+                  f"live figures {stats['live_figures']} "
+                  f"({stats['live_figure_bytes']:,} bytes) "
+                  f"peak memory {get_peak_memory():,} bytes")
+
+
+if __name__ == "__main__":
+    main()
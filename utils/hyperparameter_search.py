@@ -0,0 +1,229 @@
+"""Successive halving over the number of trees, in parallel processes.
+
+Every candidate is a combination of the hyperparameters other than
+`n_estimators`, which is the budget instead. All candidates are fitted on
+every cross-validation fold with the smallest budget, and the best
+`1 / eta` of them move on to a budget `eta` times larger, until the largest
+`n_estimators` is reached. Every fit stops early once its fold stops
+improving, and a fit that stopped before its budget is reused rather than
+repeated with a larger one. The fits of a round run across all cores.
+"""
+
+# pylint: disable=C0103,R0913,R0914,R0917
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+from time import perf_counter
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import ParameterSampler, ShuffleSplit
+from utils.st_parameters import (
+    search_candidates, search_early_stopping_rounds, search_eta, search_parameters,
+    search_splits, training_random_state
+)
+
+
+resource_parameter = "n_estimators"
+search_data = {}
+
+
+def set_search_data(features, target, folds):
+    """
+    Keep the tuning set and its folds in a worker process.
+
+    Parameters
+    ----------
+    features : numpy.ndarray
+    target : numpy.ndarray
+    folds : list
+        of (training rows, validation rows)
+    """
+    search_data.update(features=features, target=target, folds=folds)
+
+
+def fit_fold(params, fold, budget, early_stopping_rounds):
+    """
+    Fit a candidate on a fold, stopping early on its validation rows.
+
+    Parameters
+    ----------
+    params : dict
+    fold : int
+    budget : int
+        most trees fitted
+    early_stopping_rounds : int
+
+    Returns
+    -------
+    dict
+        the number of trees with the lowest validation error, that error as
+        a mean squared error, and the number of trees fitted
+    """
+    # only the search processes need xgboost
+    # pylint: disable=C0415
+    import xgboost as xgb
+
+    features, target = search_data["features"], search_data["target"]
+    train_rows, valid_rows = search_data["folds"][fold]
+    estimator = xgb.XGBRegressor(
+        **params, n_estimators=budget, early_stopping_rounds=early_stopping_rounds,
+        eval_metric="rmse", n_jobs=1
+    )
+    estimator.fit(features[train_rows], target[train_rows],
+                  eval_set=[(features[valid_rows], target[valid_rows])], verbose=False)
+
+    rmse = estimator.evals_result()["validation_0"]["rmse"]
+    best_iteration = int(np.argmin(rmse))
+    return {
+        "trees": best_iteration + 1,
+        "mse": float(rmse[best_iteration]) ** 2,
+        "fitted": len(rmse),
+    }
+
+
+def get_candidates(param_distributions, n_candidates, random_state):
+    """
+    Sample the combinations of the hyperparameters other than the budget.
+
+    Parameters
+    ----------
+    param_distributions : dict
+    n_candidates : int
+        at most; all combinations when there are fewer
+    random_state : int
+
+    Returns
+    -------
+    list
+        of dict
+    """
+    distributions = {
+        key: val for key, val in param_distributions.items() if key != resource_parameter
+    }
+    num_combinations = int(np.prod([len(val) for val in distributions.values()]))
+    return list(ParameterSampler(
+        distributions, n_iter=min(n_candidates, num_combinations), random_state=random_state
+    ))
+
+
+def get_budgets(num_candidates, max_budget, eta):
+    """
+    Get the budget of every round, the last one being `max_budget`.
+
+    Parameters
+    ----------
+    num_candidates : int
+    max_budget : int
+    eta : int
+
+    Returns
+    -------
+    list
+        of int
+    """
+    num_rounds = 1
+    while num_candidates // eta ** num_rounds >= eta:
+        num_rounds += 1
+    return [max(1, max_budget // eta ** (num_rounds - 1 - idx)) for idx in range(num_rounds)]
+
+
+def successive_halving(features, target, param_distributions=None,
+                       n_candidates=search_candidates, n_splits=search_splits, eta=search_eta,
+                       early_stopping_rounds=search_early_stopping_rounds, workers=None,
+                       random_state=training_random_state):
+    """
+    Search the hyperparameters with successive halving over the number of trees.
+
+    Parameters
+    ----------
+    features : pandas.DataFrame
+    target : pandas.Series
+    param_distributions : dict
+        `search_parameters` when not given, the largest `n_estimators` of
+        which is the largest budget
+    n_candidates : int
+    n_splits : int
+    eta : int
+        share of the candidates dropped after every round is `1 - 1 / eta`
+    early_stopping_rounds : int
+    workers : int or None
+        all CPUs when not given
+    random_state : int
+
+    Returns
+    -------
+    dict
+        the best parameters, the score of every candidate in the columns of
+        `optimisation_parameters.csv`, with `n_estimators` the mean number
+        of trees kept across the folds of its last round, and the search
+        statistics
+    """
+    param_distributions = param_distributions or search_parameters
+    candidates = get_candidates(param_distributions, n_candidates, random_state)
+    budgets = get_budgets(len(candidates), max(param_distributions[resource_parameter]), eta)
+    folds = list(ShuffleSplit(n_splits=n_splits, random_state=random_state).split(features))
+    workers = workers or os.cpu_count() or 1
+
+    results = {}
+    scores = {}
+    survivors = list(range(len(candidates)))
+    num_fits = 0
+    previous_budget = 0
+    start = perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=set_search_data,
+        initargs=(features.to_numpy(), target.to_numpy(), folds)
+    ) as executor:
+        for round_idx, budget in enumerate(budgets):
+            jobs = {}
+            for candidate in survivors:
+                for fold in range(n_splits):
+                    previous = results.get((candidate, fold))
+                    # a fit that stopped early would stop at the same tree again
+                    if previous is None or previous["fitted"] >= previous_budget:
+                        jobs[candidate, fold] = executor.submit(
+                            fit_fold, {**candidates[candidate], "random_state": random_state},
+                            fold, budget, early_stopping_rounds
+                        )
+            for job, future in jobs.items():
+                results[job] = future.result()
+            num_fits += len(jobs)
+
+            for candidate in survivors:
+                fold_results = [results[candidate, fold] for fold in range(n_splits)]
+                scores[candidate] = {
+                    resource_parameter: int(round(np.mean([_["trees"] for _ in fold_results]))),
+                    "rmse": -float(np.mean([_["mse"] for _ in fold_results])),
+                }
+
+            if round_idx < len(budgets) - 1:
+                survivors = sorted(
+                    survivors, key=lambda _: scores[_]["rmse"], reverse=True
+                )[:max(1, len(survivors) // eta)]
+            previous_budget = budget
+
+    seconds = perf_counter() - start
+    best = max(survivors, key=lambda _: scores[_]["rmse"])
+    # in the column order of the random search
+    parameters = pd.DataFrame([
+        {resource_parameter: scores[idx][resource_parameter], **candidate,
+         "rmse": scores[idx]["rmse"]}
+        for idx, candidate in enumerate(candidates)
+    ])[sorted(param_distributions, reverse=True) + ["rmse"]]
+
+    return {
+        "best_params": {**candidates[best], resource_parameter: scores[best][resource_parameter]},
+        "parameters": parameters,
+        "stats": {
+            "method": "halving",
+            "candidates": len(candidates),
+            "rounds": len(budgets),
+            "fits": num_fits,
+            "workers": workers,
+            "seconds": seconds,
+            "candidates_per_minute": len(candidates) / seconds * 60,
+        },
+    }
@@ -0,0 +1,779 @@
+"""Train, tune and validate the price model outside the notebook.
+
+Usage:
+
+    python -m utils.model_training [--output-path DIR] [--no-cache] [--force STAGE ...]
+
+The steps of the model training notebook run as stages: featurize, split,
+tune, fit, evaluate, compile, ensemble and export. Every stage is timed, and
+the output of all but the export is cached on disk under a key of its
+parameters, the checksums of the input files and the keys of the stages it
+depends on, so a rerun only repeats what changed. The export writes every
+artifact the dashboard reads and rebuilds the artifact bundle, by default in
+the TRAINING_OUTPUT_DIRNAME folder of the data path, so a run does not
+replace the artifacts the dashboard serves until they are copied over.
+
+The hyperparameters are tuned with the randomized search of the notebook,
+or with successive halving over the number of trees with
+`--search-method halving`.
+"""
+
+# pylint: disable=C0103,R0902,R0913,R0914,R0917
+
+import argparse
+import io
+import os
+from time import perf_counter
+import dotenv
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import RandomizedSearchCV, ShuffleSplit, train_test_split
+from utils.artifact_bundle import build_data_path_bundle
+from utils.bootstrap_ensemble import train_ensemble
+from utils.cache_utils import StageCache
+from utils.feature_utils import (
+    build_prediction_features, build_training_features, get_feature_layout
+)
+from utils.figure_factory import figure_factory
+from utils.hyperparameter_search import successive_halving
+from utils.st_parameters import (
+    ensemble_members, fit_early_stopping_rounds, fit_latency_batch_sizes, fit_max_bin,
+    fit_n_jobs, fit_tree_method, fit_validation_size, search_candidates,
+    search_early_stopping_rounds, search_eta, search_iterations, search_method,
+    search_parameters, search_splits, target_column, training_cv_size, training_random_state,
+    training_test_size
+)
+from utils.training_data_cache import get_file_checksum
+from utils.tree_predictor import flatten_booster, time_predict
+
+
+input_variables = [
+    "HOUSING_RECORDS_FILENAME", "INHERITED_HOUSES_FILENAME", "CORRELATED_VARIABLE_FILES"
+]
+stage_names = ["featurize", "split", "tune", "fit", "evaluate", "compile", "ensemble", "export"]
+
+
+def featurize(records, inherited_houses, correlated_variables):
+    """
+    Build the training features and the prediction features of the inherited houses.
+
+    Parameters
+    ----------
+    records : pandas.DataFrame
+    inherited_houses : pandas.DataFrame
+    correlated_variables : pandas.DataFrame
+
+    Returns
+    -------
+    dict
+    """
+    necessary_columns = correlated_variables["featureName"].tolist()
+    features, target = build_training_features(records, correlated_variables, target_column)
+    layout = get_feature_layout(features.columns, correlated_variables)
+    prediction_subset = inherited_houses[necessary_columns]
+
+    return {
+        "records": records[necessary_columns + [target_column]],
+        "features": features,
+        "target": target,
+        "prediction_subset": prediction_subset,
+        "prediction_features": pd.DataFrame(
+            build_prediction_features(prediction_subset, layout),
+            index=prediction_subset.index,
+            columns=features.columns
+        ),
+    }
+
+
+def split_data(features, target, random_state=training_random_state,
+               test_size=training_test_size, cv_size=training_cv_size):
+    """
+    Split the training features into training and testing sets, and part of
+    the training set used to tune the hyperparameters.
+
+    Parameters
+    ----------
+    features : pandas.DataFrame
+    target : pandas.Series
+    random_state : int
+    test_size : float
+    cv_size : float
+        share of the training set used for tuning
+
+    Returns
+    -------
+    dict
+        of `X_*` features and `y_*` targets for `train`, `test` and `cv`
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        features, target, test_size=test_size, random_state=random_state
+    )
+    X_cv, _, y_cv, _ = train_test_split(
+        X_train, y_train, train_size=cv_size, random_state=random_state
+    )
+    return {
+        "X_train": X_train, "y_train": y_train,
+        "X_test": X_test, "y_test": y_test,
+        "X_cv": X_cv, "y_cv": y_cv,
+    }
+
+
+def random_search(X_cv, y_cv, param_distributions=None, n_iter=search_iterations,
+                  n_splits=search_splits, random_state=training_random_state):
+    """
+    Search the hyperparameters with cross-validation, as in the notebook.
+
+    Parameters
+    ----------
+    X_cv : pandas.DataFrame
+    y_cv : pandas.Series
+    param_distributions : dict
+        `search_parameters` when not given
+    n_iter : int
+    n_splits : int
+    random_state : int
+
+    Returns
+    -------
+    dict
+        the best estimator refitted on the tuning set, the score of every
+        candidate, in the columns of `optimisation_parameters.csv`, and the
+        search statistics
+    """
+    search = RandomizedSearchCV(
+        estimator=xgb.XGBRegressor(random_state=random_state),
+        param_distributions=param_distributions or search_parameters,
+        n_iter=n_iter,
+        scoring="neg_mean_squared_error",
+        cv=ShuffleSplit(n_splits=n_splits, random_state=random_state),
+        random_state=random_state
+    )
+    start = perf_counter()
+    search.fit(X_cv, y_cv)
+    seconds = perf_counter() - start
+
+    parameters = pd.DataFrame(search.cv_results_["params"])
+    parameters["rmse"] = search.cv_results_["mean_test_score"].astype(float)
+    return {
+        "estimator": search.best_estimator_,
+        "parameters": parameters,
+        "stats": {
+            "method": "random",
+            "candidates": n_iter,
+            "rounds": 1,
+            "fits": n_iter * n_splits + 1,
+            "workers": 1,
+            "seconds": seconds,
+            "candidates_per_minute": n_iter / seconds * 60,
+        },
+    }
+
+
+def tune(X_cv, y_cv, method=search_method, n_iter=search_iterations,
+         random_state=training_random_state, workers=None):
+    """
+    Search the hyperparameters, with successive halving or a random search.
+
+    Parameters
+    ----------
+    X_cv : pandas.DataFrame
+    y_cv : pandas.Series
+    method : str
+        "halving" or "random"
+    n_iter : int
+        candidates of the random search
+    random_state : int
+    workers : int or None
+        processes of the successive halving, all CPUs when not given
+
+    Returns
+    -------
+    dict
+        the best estimator refitted on the tuning set, the score of every
+        candidate, and the search statistics
+    """
+    if method == "random":
+        return random_search(X_cv, y_cv, n_iter=n_iter, random_state=random_state)
+    if method != "halving":
+        raise ValueError(f"unknown search method: {method}")
+
+    searched = successive_halving(X_cv, y_cv, workers=workers, random_state=random_state)
+    estimator = xgb.XGBRegressor(**searched["best_params"], random_state=random_state)
+    estimator.fit(X_cv, y_cv)
+    return {
+        "estimator": estimator,
+        "parameters": searched["parameters"],
+        "stats": searched["stats"],
+    }
+
+
+def fit(params, X_train, y_train, X_test, y_test, tree_method=fit_tree_method,
+        max_bin=fit_max_bin, n_jobs=fit_n_jobs, early_stopping_rounds=fit_early_stopping_rounds,
+        validation_size=fit_validation_size, random_state=training_random_state):
+    """
+    Fit the main estimator with the tuned hyperparameters, evaluating the
+    training and testing sets after every round.
+
+    By default, the estimator is fitted as in the notebook. With early
+    stopping, part of the training set is held out, `n_estimators` becomes
+    the largest number of trees searched, and the booster is cut back to the
+    round with the lowest error on the held-out rows.
+
+    Parameters
+    ----------
+    params : dict
+    X_train : pandas.DataFrame
+    y_train : pandas.Series
+    X_test : pandas.DataFrame
+    y_test : pandas.Series
+    tree_method : str or None
+        that of xgboost when not given
+    max_bin : int
+        of the histograms of the "hist" and "approx" tree methods
+    n_jobs : int or None
+        threads building the trees, all CPUs when not given
+    early_stopping_rounds : int or None
+        no early stopping when not given, keeping the tuned `n_estimators`
+    validation_size : float
+        share of the training set held out for early stopping
+    random_state : int
+
+    Returns
+    -------
+    dict
+        the estimator and the seconds taken to fit it
+    """
+    params = dict(params)
+    if tree_method is not None:
+        params["tree_method"] = tree_method
+        if tree_method in ["hist", "approx"]:
+            params["max_bin"] = max_bin
+    if n_jobs is not None:
+        params["n_jobs"] = n_jobs
+    eval_set = [(X_train, y_train), (X_test, y_test)]
+
+    if early_stopping_rounds:
+        X_train, X_valid, y_train, y_valid = train_test_split(
+            X_train, y_train, test_size=validation_size, random_state=random_state
+        )
+        params["n_estimators"] = max(search_parameters["n_estimators"])
+        params["callbacks"] = [
+            xgb.callback.EarlyStopping(rounds=early_stopping_rounds, save_best=True)
+        ]
+        # xgboost stops on the last evaluation set
+        eval_set = [(X_train, y_train), (X_test, y_test), (X_valid, y_valid)]
+
+    estimator = xgb.XGBRegressor(**params)
+    start = perf_counter()
+    estimator.fit(X_train, y_train, eval_set=eval_set, verbose=False)
+    seconds = perf_counter() - start
+
+    if early_stopping_rounds:
+        # the parameters refit the trees kept, e.g. for the bootstrap ensemble
+        estimator.set_params(n_estimators=estimator.get_booster().num_boosted_rounds(),
+                             callbacks=None)
+    return {"estimator": estimator, "seconds": seconds}
+
+
+def get_feature_importance(estimator, feature_columns):
+    """
+    Get the feature importance of an estimator, most important first.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    feature_columns : list
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    return pd.DataFrame({
+        "Feature": list(feature_columns),
+        "importance_coefficient": estimator.feature_importances_,
+    }).sort_values(by="importance_coefficient", ascending=False).reset_index(drop=True)
+
+
+def get_model_performance(estimator, split):
+    """
+    Get the r2 and mean squared error on the training and testing sets.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    split : dict
+        Output of `split_data`.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    return pd.DataFrame([
+        [
+            dataset,
+            round(estimator.score(split[f"X_{name}"], split[f"y_{name}"]), 2),
+            round(mean_squared_error(
+                split[f"y_{name}"], estimator.predict(split[f"X_{name}"])
+            ), 2),
+        ]
+        for dataset, name in [("training", "train"), ("testing", "test")]
+    ], columns=["dataset", "r2", "mse"])
+
+
+def get_model_parameters(estimator):
+    """
+    Get the parameters of an estimator that are set.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    return pd.DataFrame(
+        [(key, val) for key, val in estimator.get_xgb_params().items() if val is not None],
+        columns=["parameters", "value"]
+    )
+
+
+def plot_learning_curve(estimator):
+    """
+    Plot the rmse of the training and testing sets after every round.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+
+    Returns
+    -------
+    bytes
+        png image
+    """
+    results = estimator.evals_result()
+    fig = figure_factory.create()
+    ax = fig.add_subplot()
+    ax.plot(results["validation_0"]["rmse"], label="train")
+    ax.plot(results["validation_1"]["rmse"], label="test")
+    ax.set_xlabel("#iteration")
+    ax.set_ylabel("rmse")
+    ax.legend()
+    return figure_factory.render(fig, format="png")
+
+
+def plot_prediction_correlation(estimator, records, split, correlated_variables):
+    """
+    Plot the actual and predicted prices of the testing set against every
+    correlated variable, with their correlations.
+
+    Kitchen quality is plotted through numeric proxy values.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    records : pandas.DataFrame
+    split : dict
+    correlated_variables : pandas.DataFrame
+
+    Returns
+    -------
+    bytes
+        png image
+    """
+    predicted_column = f"{target_column}Predicted"
+    column_to_proxy = "KitchenQual"
+    column_proxy_label = f"{column_to_proxy}Proxy"
+    column_proxy_value = {"Ex": 5, "Gd": 4, "TA": 3, "Fa": 2, "Po": 1}
+
+    test_dataset = records.loc[split["y_test"].index].reset_index(drop=True)
+    test_dataset[predicted_column] = estimator.predict(split["X_test"])
+    test_dataset[column_proxy_label] = test_dataset[column_to_proxy].map(column_proxy_value)
+
+    titles = correlated_variables.set_index("featureName")["featureDescription"]
+    corr_columns = [target_column, predicted_column]
+    correlations = test_dataset.drop(column_to_proxy, axis=1).corr()[corr_columns]
+
+    plot_columns = [var for var in test_dataset.columns
+                    if var not in [target_column, column_to_proxy]]
+    plot_column_num = 2
+    plot_row_num = int(np.ceil(len(plot_columns) / plot_column_num))
+    fig = figure_factory.create(figsize=(12, 2.5 * plot_row_num))
+    axs = fig.subplots(plot_row_num, plot_column_num, squeeze=False)
+
+    for idx, independent_var in enumerate(plot_columns):
+        ax = axs[idx // plot_column_num][idx % plot_column_num]
+        for dependent_var, color in zip(corr_columns, ["blue", "red"]):
+            corr = correlations.loc[independent_var, dependent_var]
+            ax.scatter(test_dataset[dependent_var], test_dataset[independent_var],
+                       color=color, label=f"{dependent_var}: Corr. {corr:.3f}")
+        if independent_var == column_proxy_label:
+            ax.set_title(f"{titles.loc[column_to_proxy]}\n Proxy Values: {column_proxy_value}")
+            ax.set_ylabel(column_to_proxy)
+        else:
+            ax.set_title(titles.get(independent_var, independent_var))
+            ax.set_ylabel(independent_var)
+        ax.legend()
+    fig.tight_layout()
+
+    return figure_factory.render(fig, format="png")
+
+
+def get_model_fit_stats(estimator, fit_seconds, features,
+                        batch_sizes=tuple(fit_latency_batch_sizes), repeats=20):
+    """
+    Get the size, fit time and prediction latency of an estimator.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    fit_seconds : float
+    features : pandas.DataFrame
+        rows that are resampled to build the batches timed
+    batch_sizes : tuple
+    repeats : int
+
+    Returns
+    -------
+    pandas.DataFrame
+        of one row
+    """
+    buffer = io.BytesIO()
+    joblib.dump(estimator, buffer)
+    params = estimator.get_params()
+    stats = {
+        "tree_method": params["tree_method"],
+        "max_bin": params["max_bin"],
+        "n_jobs": params["n_jobs"],
+        "trees": estimator.get_booster().num_boosted_rounds(),
+        "model_bytes": len(buffer.getvalue()),
+        "fit_seconds": fit_seconds,
+    }
+
+    rng = np.random.default_rng(0)
+    for batch_size in batch_sizes:
+        batch = features.to_numpy()[rng.integers(0, len(features), batch_size)]
+        stats[f"predict_{batch_size}_ms"] = time_predict(estimator.predict, batch, repeats) * 1000
+
+    return pd.DataFrame([stats])
+
+
+def evaluate(optimised, fitted, split, records, correlated_variables):
+    """
+    Get the performance, feature importance and plots of the tuned and main
+    estimators, and the fit statistics of the main one.
+
+    Parameters
+    ----------
+    optimised : xgboost.XGBRegressor
+        best estimator of the hyperparameter search
+    fitted : dict
+        Output of `fit`, for the main estimator.
+    split : dict
+    records : pandas.DataFrame
+    correlated_variables : pandas.DataFrame
+
+    Returns
+    -------
+    dict
+        keyed on the environment variables of the artifact files
+    """
+    estimator = fitted["estimator"]
+    feature_columns = split["X_train"].columns
+    return {
+        "OPTIMISATION_PERFORMANCE_FILENAME": get_model_performance(optimised, split),
+        "OPTIMISATION_FEATURES_IMPORTANCE_FILENAME": get_feature_importance(
+            optimised, feature_columns
+        ),
+        "MODEL_PERFORMANCE_FILENAME": get_model_performance(estimator, split),
+        "MODEL_FEATURES_IMPORTANCE_FILENAME": get_feature_importance(estimator, feature_columns),
+        "MODEL_PARAMETERS_FILENAME": get_model_parameters(optimised),
+        "MODEL_FIT_STATS_FILENAME": get_model_fit_stats(
+            estimator, fitted["seconds"], split["X_test"]
+        ),
+        "LEARNING_CURVE_FILENAME": plot_learning_curve(estimator),
+        "PREDICTION_CORRELATION_FILENAME": plot_prediction_correlation(
+            estimator, records, split, correlated_variables
+        ),
+    }
+
+
+class TrainingPipeline:
+    """
+    Run the training stages, timing them and caching their outputs.
+
+    Parameters
+    ----------
+    data_path : str
+        directory of the input files
+    cache : utils.cache_utils.StageCache or None
+        no caching without one
+    force : list
+        stages run even when their output is cached
+    random_state : int
+    method : str
+        of the hyperparameter search, "halving" or "random"
+    n_iter : int
+        candidates of the random search
+    workers : int or None
+        processes of the successive halving
+    num_members : int
+        of the bootstrap ensemble
+    fit_options : dict
+        passed to `fit`, e.g. `tree_method` or `early_stopping_rounds`
+    """
+
+    def __init__(self, data_path, cache=None, force=(), random_state=training_random_state,
+                 method=search_method, n_iter=search_iterations, workers=None,
+                 num_members=ensemble_members, fit_options=None):
+        self.data_path = data_path
+        self.cache = cache
+        self.force = set(force)
+        self.random_state = random_state
+        self.method = method
+        self.n_iter = n_iter
+        self.workers = workers
+        self.num_members = num_members
+        self.fit_options = fit_options or {}
+        self.timings = []
+
+    def get_path(self, variable):
+        """
+        Get the path of an input file.
+
+        Parameters
+        ----------
+        variable : str
+            Environment variable holding the file name.
+
+        Returns
+        -------
+        str
+        """
+        return os.path.join(self.data_path, os.getenv(variable))
+
+    def run_stage(self, name, parts, function, *args, **kwargs):
+        """
+        Run a stage, or read its output from the cache.
+
+        Parameters
+        ----------
+        name : str
+        parts : tuple or None
+            everything the output depends on, or None for a stage that is
+            never cached
+        function : callable
+        *args, **kwargs
+            passed to `function`
+
+        Returns
+        -------
+        str, object
+            the key and the output of the stage
+        """
+        key = None if parts is None else StageCache.get_key(name, *parts)
+        cacheable = self.cache is not None and key is not None
+        start = perf_counter()
+
+        cached, value = False, None
+        if cacheable and name not in self.force:
+            cached, value = self.cache.get(name, key)
+        if not cached:
+            value = function(*args, **kwargs)
+            if cacheable:
+                self.cache.put(name, key, value)
+
+        self.timings.append({
+            "stage": name, "seconds": perf_counter() - start, "cached": cached
+        })
+        return key, value
+
+    def run(self, output_path):
+        """
+        Run all stages and write the artifacts.
+
+        Parameters
+        ----------
+        output_path : str
+            directory the artifacts are written to
+
+        Returns
+        -------
+        pandas.DataFrame
+            the time taken by every stage, and whether it was cached
+        """
+        self.timings = []
+        checksums = tuple(get_file_checksum(self.get_path(var)) for var in input_variables)
+        correlated_variables = pd.read_csv(self.get_path("CORRELATED_VARIABLE_FILES"))
+
+        featurize_key, featurized = self.run_stage(
+            "featurize", checksums, lambda: featurize(
+                pd.read_csv(self.get_path("HOUSING_RECORDS_FILENAME")),
+                pd.read_csv(self.get_path("INHERITED_HOUSES_FILENAME")),
+                correlated_variables
+            )
+        )
+        split_key, split = self.run_stage(
+            "split", (featurize_key, self.random_state, training_test_size, training_cv_size),
+            split_data, featurized["features"], featurized["target"],
+            random_state=self.random_state
+        )
+        search_settings = (
+            (self.n_iter,) if self.method == "random"
+            else (search_candidates, search_eta, search_early_stopping_rounds)
+        )
+        tune_key, tuned = self.run_stage(
+            "tune", (split_key, search_parameters, search_splits, self.random_state, self.method,
+                     *search_settings),
+            tune, split["X_cv"], split["y_cv"], method=self.method, n_iter=self.n_iter,
+            random_state=self.random_state, workers=self.workers
+        )
+        # every argument the fit depends on, so changing a default fits again
+        fit_settings = {
+            "tree_method": fit_tree_method,
+            "max_bin": fit_max_bin,
+            "n_jobs": fit_n_jobs,
+            "early_stopping_rounds": fit_early_stopping_rounds,
+            "validation_size": fit_validation_size,
+            **self.fit_options,
+            "random_state": self.random_state,
+        }
+        fit_key, fitted = self.run_stage(
+            "fit", (split_key, tune_key, *sorted(fit_settings.items())),
+            fit, tuned["estimator"].get_params(), split["X_train"], split["y_train"],
+            split["X_test"], split["y_test"], **fit_settings
+        )
+        estimator = fitted["estimator"]
+        _, evaluated = self.run_stage(
+            "evaluate", (featurize_key, split_key, tune_key, fit_key),
+            evaluate, tuned["estimator"], fitted, split, featurized["records"],
+            correlated_variables
+        )
+        _, compiled = self.run_stage(
+            "compile", (fit_key,), lambda: flatten_booster(estimator.get_booster())
+        )
+        _, ensemble = self.run_stage(
+            "ensemble", (split_key, fit_key, self.num_members, self.random_state),
+            train_ensemble,
+            {key: val for key, val in estimator.get_params().items() if val is not None},
+            split["X_train"], split["y_train"], num_members=self.num_members,
+            seed=self.random_state
+        )
+        self.run_stage(
+            "export", None, self.export, output_path, featurized, tuned, estimator, evaluated,
+            compiled, ensemble
+        )
+
+        return pd.DataFrame(self.timings)
+
+    def export(self, output_path, featurized, tuned, estimator, evaluated, compiled, ensemble):
+        """
+        Write the artifacts the dashboard reads, and pack them into its bundle.
+
+        Parameters
+        ----------
+        output_path : str
+        featurized : dict
+        tuned : dict
+        estimator : xgboost.XGBRegressor
+        evaluated : dict
+        compiled : dict
+        ensemble : utils.bootstrap_ensemble.BootstrapEnsemble
+        """
+        os.makedirs(output_path, exist_ok=True)
+
+        def get_output_path(variable):
+            return os.path.join(output_path, os.getenv(variable))
+
+        joblib.dump(estimator, get_output_path("HOUSING_ESTIMATOR_NAME"))
+        np.savez_compressed(get_output_path("COMPILED_ESTIMATOR_NAME"), **compiled)
+        ensemble.save(get_output_path("ENSEMBLE_ESTIMATOR_NAME"))
+
+        prediction_subset = featurized["prediction_subset"].copy()
+        prediction_subset[target_column] = estimator.predict(featurized["prediction_features"])
+        prediction_subset.to_csv(get_output_path("PREDICTION_SUBSET_FILENAME"), index=False)
+        featurized["prediction_features"].to_csv(
+            get_output_path("PREDICTION_FEATURES_FILENAME"), index=False
+        )
+        tuned["parameters"].to_csv(get_output_path("OPT_PARAMETERS_FILENAME"), index=False)
+        pd.DataFrame([tuned["stats"]]).to_csv(
+            get_output_path("OPTIMISATION_SEARCH_STATS_FILENAME"), index=False
+        )
+
+        for variable, artifact in evaluated.items():
+            if isinstance(artifact, bytes):
+                with open(get_output_path(variable), "wb") as image:
+                    image.write(artifact)
+            else:
+                artifact.to_csv(get_output_path(variable), index=False)
+
+        # the dashboard reads the bundle over the files it was built from
+        build_data_path_bundle(output_path)
+
+
+def main(argv=None):
+    """
+    Run the training pipeline and report the time taken by every stage.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    dotenv.load_dotenv()
+    data_path = os.getenv("STREAMLIT_DATA_PATH")
+
+    parser = argparse.ArgumentParser(description="Train the price model and write its artifacts.")
+    parser.add_argument("--data-path", default=data_path, help="directory of the input files")
+    parser.add_argument("--output-path", default=os.path.join(
+        data_path, os.getenv("TRAINING_OUTPUT_DIRNAME")
+    ), help="directory the artifacts are written to, apart from those the dashboard serves")
+    parser.add_argument("--cache-dir", default=os.path.join(
+        data_path, os.getenv("TRAINING_CACHE_DIRNAME")
+    ))
+    parser.add_argument("--no-cache", action="store_true", help="run every stage")
+    parser.add_argument("--force", nargs="+", default=[], choices=stage_names,
+                        help="stages run even when cached")
+    parser.add_argument("--search-method", default=search_method, choices=["halving", "random"])
+    parser.add_argument("--search-iterations", type=int, default=search_iterations,
+                        help="candidates of the random search")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes of the successive halving, all CPUs by default")
+    parser.add_argument("--ensemble-members", type=int, default=ensemble_members)
+    parser.add_argument("--tree-method", default=fit_tree_method,
+                        choices=["hist", "approx", "exact"],
+                        help="that of xgboost by default")
+    parser.add_argument("--max-bin", type=int, default=fit_max_bin)
+    parser.add_argument("--n-jobs", type=int, default=fit_n_jobs,
+                        help="threads building the trees, all CPUs by default")
+    parser.add_argument("--early-stopping-rounds", type=int, default=fit_early_stopping_rounds,
+                        help="rounds without improvement before the fit stops; every tuned "
+                             "tree is fitted by default")
+    parser.add_argument("--random-state", type=int, default=training_random_state)
+    args = parser.parse_args(argv)
+
+    pipeline = TrainingPipeline(
+        data_path=args.data_path,
+        cache=None if args.no_cache else StageCache(args.cache_dir),
+        force=args.force,
+        random_state=args.random_state,
+        method=args.search_method,
+        n_iter=args.search_iterations,
+        workers=args.workers,
+        num_members=args.ensemble_members,
+        fit_options={
+            "tree_method": args.tree_method,
+            "max_bin": args.max_bin,
+            "n_jobs": args.n_jobs,
+            "early_stopping_rounds": args.early_stopping_rounds,
+        }
+    )
+    timings = pipeline.run(args.output_path)
+    print(timings.to_string(index=False, float_format="{:.2f}".format))
+    print(f"Wrote the artifacts to {args.output_path} in {timings['seconds'].sum():.1f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""HTTP prediction service with micro-batching.
+
+Usage:
+
+    python -m utils.prediction_server --port 8080
+
+Endpoints:
+
+- `POST /predict`: a JSON house (or list of houses) with the correlated variables,
+  answered with the predicted `SalePrice` (or a list of them)
+- `GET /metrics`: request, batch and latency counters
+- `GET /health`: liveness check
+"""
+
+# pylint: disable=R0902
+
+import argparse
+import asyncio
+import json
+from collections import deque
+from http import HTTPStatus
+from time import perf_counter
+import numpy as np
+import pandas as pd
+from utils.feature_utils import build_prediction_features, get_category_label
+from utils.st_data_utils import get_estimator, get_prediction_feature_layout
+from utils.st_parameters import (
+    server_latency_window, server_max_batch_size, server_max_wait_ms, target_column
+)
+
+
+class LatencyTracker:
+    """Keep the latencies of the most recent requests."""
+
+    def __init__(self, window=server_latency_window):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.batched_rows = 0
+
+    def add_batch(self, size):
+        """
+        Count a flushed batch.
+
+        Parameters
+        ----------
+        size : int
+        """
+        self.batches += 1
+        self.batched_rows += size
+
+    def add_request(self, seconds):
+        """
+        Count a served request.
+
+        Parameters
+        ----------
+        seconds : float
+        """
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def summary(self):
+        """
+        Get the counters.
+
+        Returns
+        -------
+        dict
+        """
+        p50, p99 = (
+            np.percentile(self.latencies, [50, 99]) * 1000 if self.latencies else (0.0, 0.0)
+        )
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_rows / self.batches if self.batches else 0.0,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+        }
+
+
+class MicroBatcher:
+    """
+    Collect concurrent houses into batches scored by one `predict` call.
+
+    A batch is flushed as soon as it holds `max_batch_size` houses, or
+    `max_wait_ms` after its first house arrived.
+    """
+
+    def __init__(self, estimator, layout, tracker,
+                 max_batch_size=server_max_batch_size, max_wait_ms=server_max_wait_ms):
+        self.estimator = estimator
+        self.layout = layout
+        self.tracker = tracker
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.worker = None
+
+    def start(self):
+        """Start the batching loop."""
+        self.worker = asyncio.create_task(self.run())
+
+    async def predict(self, house):
+        """
+        Predict the price of a house.
+
+        Parameters
+        ----------
+        house : dict
+
+        Returns
+        -------
+        float
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((house, future))
+        return await future
+
+    async def collect(self):
+        """
+        Wait for the next batch.
+
+        Returns
+        -------
+        list
+            of (house, future) pairs
+        """
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def score(self, houses):
+        """
+        Score a batch of houses.
+
+        Parameters
+        ----------
+        houses : list
+            of dict
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        houses = pd.DataFrame(houses, columns=self.layout["feature_names"])
+        return self.estimator.predict(build_prediction_features(houses, self.layout))
+
+    def score_rows(self, houses):
+        """
+        Score the houses of a failed batch one at a time.
+
+        Parameters
+        ----------
+        houses : list
+            of dict
+
+        Returns
+        -------
+        list
+            of the price, or the error raised, of every house
+        """
+        results = []
+        for house in houses:
+            try:
+                results.append(float(self.score([house])[0]))
+            except Exception as error:  # pylint: disable=W0718
+                results.append(error)
+        return results
+
+    async def run(self):
+        """Score batches until cancelled."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self.collect()
+            houses = [house for house, _ in batch]
+            self.tracker.add_batch(len(batch))
+
+            try:
+                results = [float(_) for _ in await loop.run_in_executor(None, self.score, houses)]
+            except Exception:  # pylint: disable=W0718
+                # only the houses that cannot be scored on their own fail
+                results = await loop.run_in_executor(None, self.score_rows, houses)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def validate_house(house, layout):
+    """
+    Validate a house sent to the service.
+
+    Parameters
+    ----------
+    house : dict
+    layout : dict
+        from `utils.feature_utils.get_feature_layout`
+
+    Returns
+    -------
+    dict
+        the correlated variables of the house, the categories as labels and
+        the other variables as numbers
+    """
+    if not isinstance(house, dict):
+        raise ValueError("a house must be a JSON object")
+
+    missing = [var for var in layout["feature_names"] if var not in house]
+    if missing:
+        raise ValueError(f"missing variables: {', '.join(missing)}")
+
+    validated = {}
+    for var in layout["feature_names"]:
+        value = house[var]
+        if var in layout["categorical"]:
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise ValueError(f"{var} must be a string or a number")
+            validated[var] = get_category_label(value)
+        else:
+            try:
+                validated[var] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{var} must be a number") from None
+            if np.isinf(validated[var]):
+                raise ValueError(f"{var} must be finite")
+
+    return validated
+
+
+async def read_request(reader):
+    """
+    Read an HTTP request.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+
+    Returns
+    -------
+    str, str, bytes
+        method, path and body
+    """
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ConnectionError("connection closed")
+    method, path, _ = request_line.split(" ", 2)
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, value = line.split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+    return method, path.split("?", 1)[0], body
+
+
+def write_response(writer, status, payload):
+    """
+    Write a JSON response.
+
+    Parameters
+    ----------
+    writer : asyncio.StreamWriter
+    status : http.HTTPStatus
+    payload : object
+    """
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class PredictionServer:
+    """Serve predictions over HTTP."""
+
+    def __init__(self, max_batch_size=server_max_batch_size, max_wait_ms=server_max_wait_ms):
+        # load the estimator and the feature layout once, before serving
+        self.layout = get_prediction_feature_layout()
+        self.tracker = LatencyTracker()
+        self.batcher = MicroBatcher(
+            estimator=get_estimator(),
+            layout=self.layout,
+            tracker=self.tracker,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+
+    async def predict(self, body):
+        """
+        Answer a predict request.
+
+        Parameters
+        ----------
+        body : bytes
+
+        Returns
+        -------
+        http.HTTPStatus, object
+        """
+        try:
+            payload = json.loads(body)
+            houses = payload if isinstance(payload, list) else [payload]
+            houses = [validate_house(house, self.layout) for house in houses]
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+        try:
+            prices = await asyncio.gather(*[self.batcher.predict(house) for house in houses])
+        except Exception as error:  # pylint: disable=W0718
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+        results = [{target_column: price} for price in prices]
+
+        return HTTPStatus.OK, results if isinstance(payload, list) else results[0]
+
+    async def respond(self, method, path, body):
+        """
+        Answer a request.
+
+        Parameters
+        ----------
+        method : str
+        path : str
+        body : bytes
+
+        Returns
+        -------
+        http.HTTPStatus, object
+        """
+        if method == "POST" and path == "/predict":
+            start = perf_counter()
+            status, payload = await self.predict(body)
+            self.tracker.add_request(perf_counter() - start)
+            return status, payload
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.tracker.summary()
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        return HTTPStatus.NOT_FOUND, {"error": f"{method} {path}"}
+
+    async def handle(self, reader, writer):
+        """
+        Handle a client connection.
+
+        Every request that could be read is answered, with a 500 status if
+        answering it failed. A request that cannot be parsed is answered with
+        a 400 status before the connection is closed.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+        writer : asyncio.StreamWriter
+        """
+        try:
+            while True:
+                try:
+                    method, path, body = await read_request(reader)
+                except ValueError:
+                    write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request"})
+                    await writer.drain()
+                    break
+
+                try:
+                    status, payload = await self.respond(method, path, body)
+                except Exception as error:  # pylint: disable=W0718
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+
+                write_response(writer, status, payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        """
+        Serve until cancelled.
+
+        Parameters
+        ----------
+        host : str
+        port : int
+        """
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """
+    Run the prediction service.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    parser = argparse.ArgumentParser(description="Serve house price predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=server_max_batch_size,
+                        help="number of houses after which a batch is scored")
+    parser.add_argument("--max-wait-ms", type=float, default=server_max_wait_ms,
+                        help="milliseconds after which a partial batch is scored")
+    args = parser.parse_args(argv)
+
+    server = PredictionServer(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Search for the renovations that maximize the predicted price of a house.
+
+Usage:
+
+    python -m utils.renovation [--method grid|ascent] [--top-k 5]
+
+Only upgrades are allowed: a rating or quality can be raised, and the house
+can be remodelled in any year from its last remodel up to the latest remodel
+of the training data. A rating or quality is only raised to the categories
+the model was trained on, as any other one is encoded as missing.
+"""
+
+# pylint: disable=R0913,R0914,R0917
+
+import argparse
+import itertools
+from time import perf_counter
+import numpy as np
+import pandas as pd
+from utils.feature_utils import build_prediction_features, get_category_label
+from utils.sensitivity import get_feature_values
+from utils.st_parameters import (
+    renovation_features, renovation_grid_limit, renovation_top_k, target_column
+)
+
+
+def get_renovation_options(house, feature_configuration, layout,
+                           features=tuple(renovation_features)):
+    """
+    Get the values each renovated variable can be changed to.
+
+    Parameters
+    ----------
+    house : dict
+    feature_configuration : dict
+        from `utils.st_data_utils.get_correlated_info`
+    layout : dict
+        Output of `utils.feature_utils.get_feature_layout`.
+    features : list
+
+    Returns
+    -------
+    dict
+        variable to its allowed values, the current one first: the better
+        categories seen in training, or the later values up to the largest
+        one of the training data
+    """
+    options = {}
+    for var in features:
+        if ":" in feature_configuration[var][0]:
+            values = get_feature_values(feature_configuration, var)
+            current = get_category_label(house[var])
+            upgrades = values[values.index(current) + 1:] if current in values else []
+            options[var] = [current] + [_ for _ in upgrades if _ in layout["categorical"][var]]
+        else:
+            highest = int(feature_configuration[var][1])
+            options[var] = list(range(int(house[var]), max(int(house[var]), highest) + 1))
+    return options
+
+
+def score_configurations(estimator, layout, house, configurations):
+    """
+    Score a house under many renovations in one batched prediction.
+
+    Parameters
+    ----------
+    estimator : object
+        with a `predict` method taking the prediction features
+    layout : dict
+    house : dict
+    configurations : pandas.DataFrame
+        one column per renovated variable
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    houses = pd.DataFrame(
+        {var: [house[var]] * len(configurations) for var in layout["feature_names"]}
+    )
+    for var in configurations.columns:
+        houses[var] = configurations[var].to_numpy()
+    return np.asarray(estimator.predict(build_prediction_features(houses, layout)), dtype=float)
+
+
+def search_grid(estimator, layout, house, options):
+    """
+    Score every combination of the allowed values.
+
+    Parameters
+    ----------
+    estimator : object
+    layout : dict
+    house : dict
+    options : dict
+
+    Returns
+    -------
+    pandas.DataFrame
+        the configurations and their prices
+    """
+    configurations = pd.DataFrame(list(itertools.product(*options.values())), columns=list(options))
+    configurations[target_column] = score_configurations(estimator, layout, house, configurations)
+    return configurations
+
+
+def search_coordinate_ascent(estimator, layout, house, options, max_rounds=10):
+    """
+    Improve one variable at a time, scoring all its allowed values in a batch,
+    until no single change raises the price.
+
+    Parameters
+    ----------
+    estimator : object
+    layout : dict
+    house : dict
+    options : dict
+    max_rounds : int
+
+    Returns
+    -------
+    pandas.DataFrame
+        the configurations scored along the way and their prices
+    """
+    current = {var: values[0] for var, values in options.items()}
+    scored = []
+    best_price = -np.inf
+
+    for _ in range(max_rounds):
+        improved = False
+        for var, values in options.items():
+            configurations = pd.DataFrame([{**current, var: value} for value in values])
+            configurations[target_column] = score_configurations(
+                estimator, layout, house, configurations[list(options)]
+            )
+            scored.append(configurations)
+
+            best = int(configurations[target_column].to_numpy().argmax())
+            price = configurations[target_column].iloc[best]
+            if values[best] != current[var] and price > best_price:
+                current[var] = values[best]
+                improved = True
+            best_price = max(best_price, price)
+        if not improved:
+            break
+
+    return pd.concat(scored, ignore_index=True).drop_duplicates(subset=list(options))
+
+
+def optimize_renovation(estimator, layout, house, feature_configuration, method="auto",
+                        top_k=renovation_top_k, grid_limit=renovation_grid_limit):
+    """
+    Get the renovations of a house with the highest predicted prices.
+
+    Parameters
+    ----------
+    estimator : object
+    layout : dict
+    house : dict
+    feature_configuration : dict
+    method : str
+        "grid", "ascent", or "auto" for the grid when it holds at most
+        `grid_limit` configurations
+    top_k : int
+    grid_limit : int
+
+    Returns
+    -------
+    pandas.DataFrame
+        the best configurations, with their price and the gain over the
+        house as it is
+    """
+    options = get_renovation_options(house, feature_configuration, layout)
+    grid_size = int(np.prod([len(values) for values in options.values()]))
+    if method == "auto":
+        method = "grid" if grid_size <= grid_limit else "ascent"
+
+    if method == "grid":
+        configurations = search_grid(estimator, layout, house, options)
+    elif method == "ascent":
+        configurations = search_coordinate_ascent(estimator, layout, house, options)
+    else:
+        raise ValueError(f"unknown search method: {method}")
+
+    as_is = pd.DataFrame([{var: values[0] for var, values in options.items()}])
+    current_price = score_configurations(estimator, layout, house, as_is)[0]
+
+    best = configurations.nlargest(top_k, target_column).reset_index(drop=True)
+    best["gain"] = best[target_column] - current_price
+    return best
+
+
+def main(argv=None):
+    """
+    Optimize the renovations of the inherited houses and report the time taken.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    parser = argparse.ArgumentParser(description="Find the renovations with the best prices.")
+    parser.add_argument("--method", default="auto", choices=["auto", "grid", "ascent"])
+    parser.add_argument("--top-k", type=int, default=renovation_top_k)
+    args = parser.parse_args(argv)
+
+    # the dashboard loaders import this module
+    # pylint: disable=C0415,R0401
+    from utils.st_data_utils import (
+        get_correlated_info, get_estimator, get_prediction_data, get_prediction_feature_layout
+    )
+
+    estimator = get_estimator()
+    layout = get_prediction_feature_layout()
+    feature_configuration, _ = get_correlated_info()
+
+    for idx, house in get_prediction_data().iterrows():
+        start = perf_counter()
+        best = optimize_renovation(
+            estimator, layout, house.to_dict(), feature_configuration,
+            method=args.method, top_k=args.top_k
+        )
+        print(f"House {idx + 1} ({perf_counter() - start:.2f}s)")
+        print(best.to_string(index=False, float_format="{:,.0f}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Price response of a house to each of its correlated variables."""
+
+import numpy as np
+import pandas as pd
+from utils.feature_utils import build_prediction_features
+from utils.st_parameters import sensitivity_points
+
+
+def get_feature_values(feature_configuration, var, num_points=sensitivity_points):
+    """
+    Get the values a variable is swept over.
+
+    Parameters
+    ----------
+    feature_configuration : dict
+        from `utils.st_data_utils.get_correlated_info`
+    var : str
+    num_points : int
+        most values swept over for a numerical variable
+
+    Returns
+    -------
+    list
+        categories from worst to best, or increasing numbers
+    """
+    configuration = feature_configuration[var]
+    if ":" in configuration[0]:
+        # the options are listed from best to worst
+        return [option.split(":")[0].strip() for option in reversed(configuration)]
+
+    low, high = int(configuration[0]), int(configuration[1])
+    if high - low + 1 <= num_points:
+        return list(range(low, high + 1))
+    return np.unique(np.linspace(low, high, num_points).round().astype(int)).tolist()
+
+
+def sweep_features(estimator, layout, house, feature_values):
+    """
+    Score a house with each variable swept over its values, the others fixed,
+    in one batched prediction.
+
+    Parameters
+    ----------
+    estimator : object
+        with a `predict` method taking the prediction features
+    layout : dict
+        from `utils.feature_utils.get_feature_layout`
+    house : dict
+        the correlated variables of the base house
+    feature_values : dict
+        variable to the values it is swept over
+
+    Returns
+    -------
+    dict
+        variable to (values, prices)
+    """
+    base = {var: house[var] for var in layout["feature_names"]}
+    houses = pd.DataFrame([
+        {**base, var: value} for var, values in feature_values.items() for value in values
+    ], columns=layout["feature_names"])
+    prices = np.asarray(estimator.predict(build_prediction_features(houses, layout)))
+
+    sweeps = {}
+    start = 0
+    for var, values in feature_values.items():
+        sweeps[var] = (list(values), prices[start:start + len(values)].astype(float))
+        start += len(values)
+    return sweeps
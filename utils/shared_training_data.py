@@ -0,0 +1,167 @@
+"""Training data shared by the streamlit processes of a host through a memory map.
+
+The file is a small header, a JSON schema and two column-major blocks: the
+numeric columns as float64 and the category codes as int16. Every process
+maps the file read-only, so the pages of the numeric block are held once by
+the operating system rather than once per process.
+"""
+
+# pylint: disable=C0103,R0914
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+magic = b"HHSHARED"
+header_format = "<8sQ"  # magic, schema length
+alignment = 64
+
+
+def write_shared_data(data, path, source_checksum):
+    """
+    Write the training data to a file that processes can map.
+
+    The file is written next to its final path and renamed into place, so
+    a process never maps a partially written file.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+    path : str
+    source_checksum : str
+        checksum of the csv file the data comes from
+
+    Returns
+    -------
+    dict
+        schema of the file
+    """
+    categorical = [col for col in data.columns if isinstance(data[col].dtype, pd.CategoricalDtype)]
+    numeric = [col for col in data.columns if col not in categorical]
+
+    numeric_block = np.ascontiguousarray(data[numeric].to_numpy(dtype=np.float64).T)
+    codes_block = np.ascontiguousarray(
+        np.vstack([data[col].cat.codes.to_numpy(dtype=np.int16) for col in categorical])
+        if categorical else np.empty((0, len(data)), dtype=np.int16)
+    )
+
+    schema = json.dumps({
+        "source_checksum": source_checksum,
+        "rows": len(data),
+        "columns": list(data.columns),
+        "numeric": numeric,
+        "categorical": {
+            col: data[col].cat.categories.tolist() for col in categorical
+        },
+    }).encode()
+    numeric_start = struct.calcsize(header_format) + len(schema)
+    numeric_start += -numeric_start % alignment
+    codes_start = numeric_start + numeric_block.nbytes
+    codes_start += -codes_start % alignment
+
+    handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    with os.fdopen(handle, "wb") as shared:
+        shared.write(struct.pack(header_format, magic, len(schema)))
+        shared.write(schema)
+        shared.seek(numeric_start)
+        shared.write(numeric_block.tobytes())
+        shared.seek(codes_start)
+        shared.write(codes_block.tobytes())
+    os.replace(temporary_path, path)
+
+    return json.loads(schema)
+
+
+def read_shared_schema(path):
+    """
+    Read the schema of a shared data file.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    dict or None
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as shared:
+        file_magic, schema_length = struct.unpack(
+            header_format, shared.read(struct.calcsize(header_format))
+        )
+        if file_magic != magic:
+            return None
+        return json.loads(shared.read(schema_length))
+
+
+def attach_shared_data(path):
+    """
+    Attach to a shared data file read-only, without copying the numeric columns.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    pandas.DataFrame
+        numeric columns backed by the memory map, category columns rebuilt
+        from their codes
+    """
+    with open(path, "rb") as shared:
+        buffer = mmap.mmap(shared.fileno(), 0, access=mmap.ACCESS_READ)
+
+    _, schema_length = struct.unpack_from(header_format, buffer)
+    schema_start = struct.calcsize(header_format)
+    schema = json.loads(buffer[schema_start:schema_start + schema_length])
+    rows = schema["rows"]
+    numeric, categorical = schema["numeric"], schema["categorical"]
+
+    numeric_start = schema_start + schema_length
+    numeric_start += -numeric_start % alignment
+    numeric_block = np.frombuffer(
+        buffer, dtype=np.float64, count=len(numeric) * rows, offset=numeric_start
+    ).reshape(len(numeric), rows)
+    codes_start = numeric_start + numeric_block.nbytes
+    codes_start += -codes_start % alignment
+    codes_block = np.frombuffer(
+        buffer, dtype=np.int16, count=len(categorical) * rows, offset=codes_start
+    ).reshape(len(categorical), rows)
+
+    # a single 2-D block keeps the numeric columns as a view of the memory map
+    data = pd.DataFrame(numeric_block.T, columns=numeric, copy=False)
+    for codes, (col, categories) in zip(codes_block, categorical.items()):
+        data.insert(
+            schema["columns"].index(col), col,
+            pd.Categorical.from_codes(codes, categories=categories)
+        )
+
+    return data
+
+
+def get_shared_training_data(path, data, source_checksum):
+    """
+    Attach to the shared training data, writing it first if missing or stale.
+
+    Parameters
+    ----------
+    path : str
+    data : callable
+        returns the training data when the file has to be written
+    source_checksum : str
+        checksum of the csv file the training data comes from
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    schema = read_shared_schema(path)
+    if schema is None or schema["source_checksum"] != source_checksum:
+        write_shared_data(data(), path, source_checksum)
+    return attach_shared_data(path)
@@ -2,12 +2,37 @@
 
 # pylint: disable=R0914
 
+import hashlib
+import io
+import json
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 import dotenv
 import joblib
-import numpy as np
 import pandas as pd
 import streamlit as st
+from utils.artifact_bundle import ArtifactBundle
+from utils.cache_utils import FigureCache, LRUCache
+from utils.bootstrap_ensemble import BootstrapEnsemble, interval_columns
+from utils.contributions import explain_batch
+from utils.data_browser import DataBrowser
+from utils.feature_utils import build_prediction_features, get_feature_layout, get_house_key
+from utils.renovation import optimize_renovation
+from utils.sensitivity import get_feature_values, sweep_features
+from utils.shared_training_data import get_shared_training_data
+from utils.st_insight_utils import (
+    get_correlated_features_image, get_data_distribution_image, get_price_sensitivity_image
+)
+from utils.st_parameters import (
+    figure_cache_max_bytes, figure_cache_max_disk_bytes, parallel_rendering, plot_columns,
+    prediction_cache_size, render_workers, sensitivity_cache_size, shared_training_data,
+    target_column
+)
+from utils.training_data_cache import (
+    build_cache, get_file_checksum, is_cache_valid, load_training_data, read_cache_metadata
+)
+from utils.tree_predictor import CompiledTreeEnsemble
 
 
 # Load environment variables
@@ -30,28 +55,88 @@ def get_path(filename):
     return os.path.join(os.getenv("STREAMLIT_DATA_PATH"), filename)
 
 
-@st.cache_data
-def get_correlated_variables():
+@st.cache_resource
+def get_artifact_bundle():
     """
-    Get the correlated variables.
+    Get the artifact bundle, if one has been built.
+
+    The source files are compared with the bundle here, once per load of
+    the bundle rather than on every read.
+
+    Returns
+    -------
+    utils.artifact_bundle.ArtifactBundle or None
+    """
+    filename = os.getenv("ARTIFACT_BUNDLE_FILENAME")
+    if filename is None or not os.path.exists(get_path(filename)):
+        return None
+    try:
+        return ArtifactBundle(get_path(filename), os.getenv("STREAMLIT_DATA_PATH"))
+    except ValueError:
+        # of an older version: read the files until it is rebuilt
+        return None
+
+
+def read_table_artifact(variable):
+    """
+    Read a table artifact from the bundle, or from its csv file without one,
+    when the file has changed since the bundle was built or when the
+    artifact does not match its checksum.
+
+    Parameters
+    ----------
+    variable : str
+        Environment variable holding the file name.
 
     Returns
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("CORRELATED_VARIABLE_FILES")))
+    filename = os.getenv(variable)
+    bundle = get_artifact_bundle()
+    if bundle is not None and filename in bundle and bundle.is_current(filename):
+        try:
+            return bundle.read_table(filename)
+        except ValueError:
+            pass
+    return pd.read_csv(get_path(filename))
+
+
+def read_file_artifact(variable):
+    """
+    Read a file artifact from the bundle, or give its path without one,
+    when the file has changed since the bundle was built or when the
+    artifact does not match its checksum.
+
+    Parameters
+    ----------
+    variable : str
+        Environment variable holding the file name.
+
+    Returns
+    -------
+    bytes or str
+    """
+    filename = os.getenv(variable)
+    bundle = get_artifact_bundle()
+    if bundle is not None and filename in bundle and bundle.is_current(filename):
+        try:
+            return bundle.read_bytes(filename)
+        except ValueError:
+            pass
+    return get_path(filename)
 
 
 @st.cache_data
-def get_na_data():
+def get_correlated_variables():
     """
-    Get the missing values data.
+    Get the correlated variables.
 
     Returns
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("NA_STATS_HOUSING_RECORDS_FILENAME")))
+    return read_table_artifact("CORRELATED_VARIABLE_FILES")
 
 
 @st.cache_data
@@ -63,50 +148,171 @@ def get_training_variable_info():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("VARIABLE_FILES")))
+    return read_table_artifact("VARIABLE_FILES")
 
 
 @st.cache_data
+def get_columnar_training_data():
+    """
+    Get the training data, from its columnar cache.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    data, _ = load_training_data(
+        csv_path=get_path(os.getenv("HOUSING_RECORDS_FILENAME")),
+        cache_path=get_path(os.getenv("TRAINING_DATA_CACHE_FILENAME"))
+    )
+    return data
+
+
+@st.cache_resource
+def get_mapped_training_data():
+    """
+    Get the training data, mapped read-only from the file shared by the processes of the host.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    csv_path = get_path(os.getenv("HOUSING_RECORDS_FILENAME"))
+    cache_path = get_path(os.getenv("TRAINING_DATA_CACHE_FILENAME"))
+    metadata = read_cache_metadata(cache_path)
+    if not is_cache_valid(csv_path, metadata, cache_path):
+        _, metadata = build_cache(csv_path, cache_path)
+
+    return get_shared_training_data(
+        path=get_path(os.getenv("SHARED_TRAINING_DATA_FILENAME")),
+        data=lambda: load_training_data(csv_path, cache_path)[0],
+        source_checksum=metadata["checksum"]
+    )
+
+
 def get_training_data():
     """
     Get the training data.
 
+    With `shared_training_data`, the numeric columns are a read-only view of
+    a memory map shared across processes, instead of a copy per process.
+
     Returns
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("HOUSING_RECORDS_FILENAME")))
+    if shared_training_data:
+        return get_mapped_training_data()
+    return get_columnar_training_data()
 
 
-def view_training_data(data):
+@st.cache_resource
+def get_training_data_fingerprint():
     """
-    View the training data.
+    Get the fingerprint of the training data, the checksum of the csv file
+    it is loaded from, computed once rather than on every cache lookup.
+
+    Returns
+    -------
+    str
+    """
+    return get_file_checksum(get_path(os.getenv("HOUSING_RECORDS_FILENAME")))
 
-    Parameters
-    ----------
-    data : pandas.DataFrame
-        Training data.
+
+@st.cache_resource
+def get_distribution_summaries():
+    """
+    Get the precomputed distribution of every training data column.
 
     Returns
     -------
-    pandas.DataFrame
-        styled for display
+    dict
+        column to summary
+    """
+    summaries = read_file_artifact("DISTRIBUTION_SUMMARIES_FILENAME")
+    if isinstance(summaries, bytes):
+        return json.loads(summaries)
+    with open(summaries, encoding="utf-8") as summary_file:
+        return json.load(summary_file)
+
+
+@st.cache_resource
+def get_data_browser():
+    """
+    Get the browser of the training data, reading row windows from its
+    columnar cache, rebuilt first if stale.
+
+    Returns
+    -------
+    utils.data_browser.DataBrowser
+    """
+    csv_path = get_path(os.getenv("HOUSING_RECORDS_FILENAME"))
+    cache_path = get_path(os.getenv("TRAINING_DATA_CACHE_FILENAME"))
+    if not is_cache_valid(csv_path, read_cache_metadata(cache_path), cache_path):
+        build_cache(csv_path, cache_path)
+    return DataBrowser(cache_path)
+
+
+@st.cache_data
+def get_column_formats():
+    """
+    Get the display format of the training data columns that need one.
+
+    Returns
+    -------
+    dict
+        column to format string
     """
     variables = get_training_variable_info()
     categorical_features = variables[
         variables["featureType"] == "categorical"
         ]["featureName"].values
+    window = get_data_browser().read_window(0, 1)
 
     formatter = {}
 
-    for var in data.columns:
+    for var in window.columns:
         if var not in categorical_features:
             formatter[var] = "{:.0f}"
         else:
-            if data[var].dtype == "float64":
+            if window[var].dtype == "float64":
                 formatter[var] = "{:.0f}"
 
-    return data.style.format(formatter)
+    return formatter
+
+
+def view_training_data(data):
+    """
+    View the training data.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Training data.
+
+    Returns
+    -------
+    pandas.DataFrame
+        styled for display
+    """
+    formats = get_column_formats()
+    return data.style.format({var: formats[var] for var in data.columns if var in formats})
+
+
+def get_training_data_window(offset, limit, columns):
+    """
+    Get a window of the training data, styled for display.
+
+    Parameters
+    ----------
+    offset : int
+    limit : int
+    columns : list
+
+    Returns
+    -------
+    pandas.io.formats.style.Styler
+    """
+    return view_training_data(get_data_browser().read_window(offset, limit, columns))
 
 
 @st.cache_data
@@ -118,7 +324,7 @@ def get_prediction_data():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("PREDICTION_SUBSET_FILENAME")))
+    return read_table_artifact("PREDICTION_SUBSET_FILENAME")
 
 
 @st.cache_data
@@ -130,7 +336,7 @@ def get_prediction_features():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("PREDICTION_FEATURES_FILENAME")))
+    return read_table_artifact("PREDICTION_FEATURES_FILENAME")
 
 
 @st.cache_data
@@ -142,7 +348,7 @@ def get_optimisation_performance():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("OPTIMISATION_PERFORMANCE_FILENAME")))
+    return read_table_artifact("OPTIMISATION_PERFORMANCE_FILENAME")
 
 
 @st.cache_data
@@ -154,7 +360,7 @@ def get_optimisation_feature_importance():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("OPTIMISATION_FEATURES_IMPORTANCE_FILENAME")))
+    return read_table_artifact("OPTIMISATION_FEATURES_IMPORTANCE_FILENAME")
 
 
 @st.cache_data
@@ -166,7 +372,7 @@ def get_optimisation_parameters():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("OPT_PARAMETERS_FILENAME")))
+    return read_table_artifact("OPT_PARAMETERS_FILENAME")
 
 
 @st.cache_data
@@ -178,7 +384,7 @@ def get_model_performance():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("MODEL_PERFORMANCE_FILENAME")))
+    return read_table_artifact("MODEL_PERFORMANCE_FILENAME")
 
 
 @st.cache_data
@@ -190,7 +396,7 @@ def get_model_feature_importance():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("MODEL_FEATURES_IMPORTANCE_FILENAME")))
+    return read_table_artifact("MODEL_FEATURES_IMPORTANCE_FILENAME")
 
 
 @st.cache_data
@@ -202,31 +408,47 @@ def get_model_parameters():
     -------
     pandas.DataFrame
     """
-    return pd.read_csv(get_path(os.getenv("MODEL_PARAMETERS_FILENAME")))
+    return read_table_artifact("MODEL_PARAMETERS_FILENAME")
+
+
+@st.cache_data
+def get_model_fit_stats():
+    """
+    Get the size, fit time and prediction latency of the model.
+
+    Returns
+    -------
+    pandas.DataFrame or None
+        None when the model was not fitted by `utils.model_training`
+    """
+    try:
+        return read_table_artifact("MODEL_FIT_STATS_FILENAME")
+    except FileNotFoundError:
+        return None
 
 
 @st.cache_resource
 def get_learning_curve_path():
     """
-    Get the learning curve path.
+    Get the learning curve path, or the image itself when bundled.
 
     Returns
     -------
-    str
+    str or bytes
     """
-    return get_path(os.getenv("LEARNING_CURVE_FILENAME"))
+    return read_file_artifact("LEARNING_CURVE_FILENAME")
 
 
 @st.cache_resource
 def get_prediction_correlation():
     """
-    Get the prediction correlation.
+    Get the prediction correlation path, or the image itself when bundled.
 
     Returns
     -------
-    str
+    str or bytes
     """
-    return get_path(os.getenv("PREDICTION_CORRELATION_FILENAME"))
+    return read_file_artifact("PREDICTION_CORRELATION_FILENAME")
 
 
 @st.cache_resource
@@ -238,75 +460,434 @@ def get_estimator():
     -------
     sklearn.base.BaseEstimator
     """
-    return joblib.load(get_path(os.getenv("HOUSING_ESTIMATOR_NAME")))
+    estimator = read_file_artifact("HOUSING_ESTIMATOR_NAME")
+    return joblib.load(io.BytesIO(estimator) if isinstance(estimator, bytes) else estimator)
+
+
+@st.cache_resource
+def get_model_version():
+    """
+    Get the version of the estimator, the checksum of its file.
+
+    Returns
+    -------
+    str
+    """
+    estimator = read_file_artifact("HOUSING_ESTIMATOR_NAME")
+    if isinstance(estimator, bytes):
+        return hashlib.sha256(estimator).hexdigest()
+    return get_file_checksum(estimator)
+
+
+@st.cache_resource
+def get_compiled_estimator():
+    """
+    Get the estimator compiled to NumPy arrays, which predicts without xgboost.
+
+    Returns
+    -------
+    utils.tree_predictor.CompiledTreeEnsemble
+    """
+    compiled = read_file_artifact("COMPILED_ESTIMATOR_NAME")
+    return CompiledTreeEnsemble.load(
+        io.BytesIO(compiled) if isinstance(compiled, bytes) else compiled
+    )
+
+
+@st.cache_resource
+def get_ensemble_estimator():
+    """
+    Get the bootstrap ensemble, which predicts price ranges.
+
+    Returns
+    -------
+    utils.bootstrap_ensemble.BootstrapEnsemble
+    """
+    ensemble = read_file_artifact("ENSEMBLE_ESTIMATOR_NAME")
+    return BootstrapEnsemble.load(
+        io.BytesIO(ensemble) if isinstance(ensemble, bytes) else ensemble
+    )
+
+
+@st.cache_resource
+def get_prediction_feature_layout():
+    """
+    Get the column index maps of the prediction features.
+
+    Returns
+    -------
+    dict
+    """
+    return get_feature_layout(
+        feature_columns=get_prediction_features().columns,
+        correlated_variables=get_correlated_variables()
+    )
+
+
+def get_batch_prediction_features(houses):
+    """
+    Get the prediction features of a batch of houses.
+
+    Parameters
+    ----------
+    houses : pandas.DataFrame
+        N rows holding at least the correlated variables.
+
+    Returns
+    -------
+    numpy.ndarray
+        of shape (N, number of prediction features)
+    """
+    return build_prediction_features(houses, get_prediction_feature_layout())
+
+
+@st.cache_resource
+def get_prediction_cache():
+    """
+    Get the prediction cache shared across sessions.
+
+    Returns
+    -------
+    utils.cache_utils.LRUCache
+    """
+    return LRUCache(max_size=prediction_cache_size)
+
+
+@st.cache_resource
+def get_contribution_cache():
+    """
+    Get the cache of prediction contributions shared across sessions.
+
+    Returns
+    -------
+    utils.cache_utils.LRUCache
+    """
+    return LRUCache(max_size=prediction_cache_size)
+
+
+@st.cache_resource
+def get_sensitivity_cache():
+    """
+    Get the cache of price sensitivities shared across sessions.
+
+    Returns
+    -------
+    utils.cache_utils.LRUCache
+    """
+    return LRUCache(max_size=sensitivity_cache_size)
+
+
+@st.cache_resource
+def get_figure_cache():
+    """
+    Get the cache of rendered figures shared across sessions, persisted in
+    the folder named by FIGURE_CACHE_DIRNAME when it is set.
+
+    Returns
+    -------
+    utils.cache_utils.FigureCache
+    """
+    dirname = os.getenv("FIGURE_CACHE_DIRNAME")
+    return FigureCache(
+        max_bytes=figure_cache_max_bytes,
+        directory=get_path(dirname) if dirname else None,
+        max_disk_bytes=figure_cache_max_disk_bytes
+    )
+
+
+@st.cache_resource
+def get_render_executor():
+    """
+    Get the process pool rendering figures in parallel, if enabled and there
+    is more than one core to render on.
+
+    Returns
+    -------
+    concurrent.futures.ProcessPoolExecutor or None
+    """
+    if not parallel_rendering or (os.cpu_count() or 1) < 2:
+        return None
+    # spawned workers do not inherit the threads and locks of the server
+    return ProcessPoolExecutor(
+        max_workers=render_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@st.cache_resource
+def get_distribution_image(columns):
+    """
+    Get the plot of the distribution of training data columns, memoized per
+    column set.
+
+    Parameters
+    ----------
+    columns : tuple
+
+    Returns
+    -------
+    bytes
+    """
+    return get_data_distribution_image(
+        figure_cache=get_figure_cache(),
+        plot_columns=plot_columns,
+        variable_info=get_training_variable_info(),
+        data=get_training_data()[list(columns)],
+        summaries=get_distribution_summaries(),
+        data_fingerprint=get_training_data_fingerprint()
+    )
+
+
+@st.cache_resource
+def get_correlated_image(columns):
+    """
+    Get the plot of training data columns against the target, memoized per
+    column set.
+
+    Parameters
+    ----------
+    columns : tuple
+
+    Returns
+    -------
+    bytes
+    """
+    return get_correlated_features_image(
+        figure_cache=get_figure_cache(),
+        plot_columns=plot_columns,
+        chosen_variables=list(columns),
+        data=get_training_data(),
+        variable_info=get_training_variable_info(),
+        target_column=target_column,
+        executor=get_render_executor(),
+        data_fingerprint=get_training_data_fingerprint()
+    )
 
 
 @st.cache_data
-def get_prediction_feature_info(prediction_choices, feature_info):
+def get_column_statistics():
     """
-    Get the prediction feature information.
+    Get the describe-style statistics and missing values of every training
+    data column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        indexed by column
+    """
+    return read_table_artifact("COLUMN_STATISTICS_FILENAME").set_index("column")
+
+
+def get_data_description(columns):
+    """
+    Get the description of the numerical training data columns of a column set.
 
     Parameters
     ----------
-    prediction_choices : pandas.DataFrame
-    feature_info : pandas.DataFrame
+    columns : list
 
     Returns
     -------
     pandas.DataFrame
+        one column per training data column, as `describe` lays it out
     """
-    sample = get_prediction_features()
-    prediction_features = pd.DataFrame(np.zeros((1, sample.shape[1])), columns=sample.columns)
-    prediction_subset_df = pd.DataFrame(prediction_choices, index=[0])
+    statistics = get_column_statistics().reindex(columns).rename_axis("column")
+    statistics = statistics[statistics["mean"].notna()]
+    return statistics[["count", "mean", "std", "min", "25%", "50%", "75%", "max"]].T
 
-    # categorical features
-    categorical_feature_names = feature_info.columns[
-        feature_info.loc["featureType"] == "categorical"
-    ]
-    inherited_houses_categorical = prediction_subset_df[categorical_feature_names]
-    inherited_houses_categorical = inherited_houses_categorical.astype({
-        var: "object" for var in categorical_feature_names
-    })
-    assert inherited_houses_categorical.shape == (1, len(categorical_feature_names))
-
-    inherited_categorical = pd.get_dummies(inherited_houses_categorical)\
-        .groupby(level=0)\
-        .agg(["sum", "mean"])
-    inherited_categorical.columns = ["_".join(_) for _ in inherited_categorical.columns]
-    inherited_categorical.reset_index()
-    for col in inherited_categorical.columns:
-        prediction_features.loc[0, col] = inherited_categorical.loc[0, col]
-
-    # numerical features
-    numerical_feature_names = feature_info.columns[feature_info.loc["featureType"] == "numerical"]
-    inherited_houses_numerical = prediction_subset_df[numerical_feature_names]
-    inherited_houses_numerical = inherited_houses_numerical.astype({
-        var: "float" for var in numerical_feature_names
-    })
-    assert inherited_houses_numerical.shape == (1, len(numerical_feature_names))
-
-    inherited_numerical = inherited_houses_numerical\
-        .groupby(level=0)\
-        .agg(["count", "mean", "max", "min", "sum"])
-    inherited_numerical.columns = ["_".join(_) for _ in inherited_numerical.columns]
-    for col in inherited_numerical.columns:
-        prediction_features.loc[0, col] = inherited_numerical.loc[0, col]
-
-    # temporal features
-    temporal_feature_names = feature_info.columns[feature_info.loc["featureType"] == "temporal"]
-    inherit_houses_t = prediction_subset_df[temporal_feature_names]
-    assert inherit_houses_t.shape == (1, len(temporal_feature_names))
-
-    latest_year = int(feature_info.loc["featureValues", "YearBuilt"].split("-")[-1])
-
-    prediction_features["NumYearsSinceBuilt"] = latest_year - inherit_houses_t["YearBuilt"]
-    prediction_features["NumYearsSinceRemodelled"] = latest_year - inherit_houses_t["YearRemodAdd"]
 
-    estimator = get_estimator()
+def get_missing_values(columns):
+    """
+    Get the missing values of the training data columns of a column set.
 
-    prediction_features.loc[0, "SalePrice"] = estimator.predict(prediction_features)
+    Parameters
+    ----------
+    columns : list
+
+    Returns
+    -------
+    pandas.DataFrame
+        every column of the set, with those without missing values at 0%,
+        most missing first
+    """
+    statistics = get_column_statistics().reindex(columns).rename_axis("column")
+    return statistics.sort_values("percentage", ascending=False, kind="stable").reset_index()
+
+
+def get_predicted_price(prediction_choices):
+    """
+    Get the predicted price of a house, memoized on its correlated variables.
+
+    Parameters
+    ----------
+    prediction_choices : dict
+
+    Returns
+    -------
+    float
+    """
+    layout = get_prediction_feature_layout()
+    cache = get_prediction_cache()
+    key = get_house_key(prediction_choices, layout)
+
+    price = cache.get(key)
+    if price is None:
+        houses = pd.DataFrame([dict(zip(layout["feature_names"], key))])
+        price = float(get_estimator().predict(get_batch_prediction_features(houses))[0])
+        cache.put(key, price)
+
+    return price
+
+
+def get_price_intervals(houses):
+    """
+    Get the range of the predicted price of houses across the bootstrap ensemble.
+
+    Parameters
+    ----------
+    houses : pandas.DataFrame
+        holding at least the correlated variables
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per house, with the index of `houses`, and `interval_columns`
+    """
+    return pd.DataFrame(
+        get_ensemble_estimator().predict_quantiles(get_batch_prediction_features(houses)),
+        index=houses.index,
+        columns=interval_columns
+    )
+
+
+def get_price_contributions(houses):
+    """
+    Get the contributions of the correlated variables to the predicted price
+    of houses, memoized on each house and the model.
+
+    The houses not cached yet are explained together in one batch.
+
+    Parameters
+    ----------
+    houses : pandas.DataFrame
+        holding at least the correlated variables
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per house, with the index of `houses`
+    """
+    layout = get_prediction_feature_layout()
+    cache = get_contribution_cache()
+    model_version = get_model_version()
+    keys = [(model_version, get_house_key(house, layout)) for house in houses.to_dict("records")]
+
+    contributions = {}
+    for key in keys:
+        value = cache.get(key)
+        if value is not None:
+            contributions[key] = value
+
+    missing = list(dict.fromkeys(key for key in keys if key not in contributions))
+    if missing:
+        explained = explain_batch(
+            estimator=get_estimator(),
+            features=get_batch_prediction_features(
+                pd.DataFrame([house_key for _, house_key in missing],
+                             columns=layout["feature_names"])
+            ),
+            layout=layout
+        )
+        for key, (_, row) in zip(missing, explained.iterrows()):
+            contributions[key] = row
+            cache.put(key, row)
+
+    return pd.DataFrame([contributions[key] for key in keys], index=houses.index)
+
+
+def get_price_sensitivity(prediction_choices):
+    """
+    Get the price of a house with each correlated variable swept over its
+    range and the others fixed, memoized on the house and the model.
+
+    Parameters
+    ----------
+    prediction_choices : dict
+
+    Returns
+    -------
+    dict
+        variable to (values, prices)
+    """
+    layout = get_prediction_feature_layout()
+    cache = get_sensitivity_cache()
+    house_key = get_house_key(prediction_choices, layout)
+    key = (get_model_version(), house_key)
+
+    sweeps = cache.get(key)
+    if sweeps is None:
+        feature_configuration, _ = get_correlated_info()
+        sweeps = sweep_features(
+            estimator=get_estimator(),
+            layout=layout,
+            house=dict(zip(layout["feature_names"], house_key)),
+            feature_values={
+                var: get_feature_values(feature_configuration, var)
+                for var in layout["feature_names"]
+            }
+        )
+        cache.put(key, sweeps)
+
+    return sweeps
 
-    return prediction_features
+
+def get_sensitivity_image(prediction_choices, var):
+    """
+    Get the plot of the price of a house swept over one variable, rendered
+    once per house, variable and model.
+
+    Parameters
+    ----------
+    prediction_choices : dict
+    var : str
+
+    Returns
+    -------
+    bytes
+    """
+    house_key = get_house_key(prediction_choices, get_prediction_feature_layout())
+    _, correlated = get_correlated_info()
+    values, prices = get_price_sensitivity(prediction_choices)[var]
+    return get_price_sensitivity_image(
+        figure_cache=get_figure_cache(),
+        model_version=get_model_version(),
+        house_key=house_key,
+        var=var,
+        values=values,
+        prices=prices,
+        current_value=prediction_choices[var],
+        var_description=correlated.loc["featureDescription", var].strip(),
+        target_column=target_column
+    )
+
+
+@st.cache_data
+def get_renovation_plans():
+    """
+    Get the renovations of each inherited house with the highest predicted prices.
+
+    Returns
+    -------
+    list
+        of pandas.DataFrame, one per house of the prediction data
+    """
+    layout = get_prediction_feature_layout()
+    estimator = get_estimator()
+    feature_configuration, _ = get_correlated_info()
+
+    return [
+        optimize_renovation(estimator, layout, house.to_dict(), feature_configuration)
+        for _, house in get_prediction_data().iterrows()
+    ]
 
 
 @st.cache_data
@@ -1,13 +1,30 @@
 """Utility functions for insight generation"""
 
-# pylint: disable=R0914,C0103
+# pylint: disable=R0913,R0914,R0917,C0103
 
-import pandas as pd
+import hashlib
+import io
+import json
+import numpy as np
 import seaborn as sns
-from matplotlib import pyplot as plt
+from matplotlib import image as mpimg
+from matplotlib.colors import LogNorm
+from utils.cache_utils import get_data_fingerprint
+from utils.correlation_engine import get_target_correlations
+from utils.distribution_summary import build_distribution_summaries
+from utils.figure_factory import figure_factory
+from utils.st_parameters import (
+    figure_dpi, figure_image_format, scatter_bins, scatter_mode, scatter_row_threshold,
+    scatter_sample_size
+)
 
 
-def get_correlation(data, categorical_variables, dependent_variable, independent_variable):
+# to be increased with every change to the drawing code, so cached figures are drawn again
+figure_renderer_version = 1
+
+
+def get_correlation(data, categorical_variables, dependent_variable, independent_variable,
+                    correlations=None):
     """ Get the correlation between the dependent and independent variables.
 
     Parameters
@@ -16,6 +33,9 @@ def get_correlation(data, categorical_variables, dependent_variable, independent
     categorical_variables : list
     dependent_variable : str
     independent_variable : str
+    correlations : pandas.Series
+        correlations of all variables to the dependent variable, looked up
+        from the cache of the data if not given
 
     Returns
     -------
@@ -25,12 +45,10 @@ def get_correlation(data, categorical_variables, dependent_variable, independent
         corr_value = 0.0
         corr_description = "categorical:not applicable"
     else:
-        corr = pd.concat(
-            [data[dependent_variable], data[independent_variable]],
-            axis=1
-        ).corr()
-        corr_value = corr[independent_variable].iloc[0]
-        if corr.isnull().sum().sum() > 0:
+        if correlations is None:
+            correlations = get_target_correlations(data, dependent_variable)
+        corr_value = correlations.get(independent_variable, np.nan)
+        if np.isnan(corr_value):
             corr_description = "no correlation"
         elif independent_variable == dependent_variable:
             corr_description = "not applicable"
@@ -48,61 +66,313 @@ def get_correlation(data, categorical_variables, dependent_variable, independent
     return corr_value, corr_description
 
 
-def plot_correlated_features(plot_columns, chosen_variables, data, variable_info, target_column):
-    """Plot the correlated features.
+def get_correlated_panels(chosen_variables, data, variable_info, target_column,
+                          data_fingerprint=None):
+    """
+    Get what is drawn for each variable of the correlated features plot.
 
     Parameters
     ----------
-    plot_columns : list
     chosen_variables : list
     data : pandas.DataFrame
     variable_info : pandas.DataFrame
     target_column : str
+    data_fingerprint : str
+        identifies the content of the data, computed from it when not given
 
     Returns
     -------
-    fig : matplotlib.figure.Figure
+    list
+        of dict, one per variable
     """
     categorical_variables = variable_info[
         variable_info["featureType"] == "categorical"
     ]["featureName"].tolist()
+    correlations = get_target_correlations(data, target_column,
+                                           data_fingerprint=data_fingerprint)
 
-    plot_rows = int(len(chosen_variables) / 2)
-    plot_height = 2.5 * plot_rows
-    plot_width = 12
-
-    fig, axs = plt.subplots(plot_rows, plot_columns, figsize=(plot_width, plot_height))
-
-    for idx, var in enumerate(chosen_variables):
-        ax = axs[int(idx / 2)][idx % 2]
+    panels = []
+    for var in chosen_variables:
         corr_value, corr_description = get_correlation(
             data=data,
             categorical_variables=categorical_variables,
             dependent_variable=target_column,
-            independent_variable=var
+            independent_variable=var,
+            correlations=correlations
         )
-        var_description = variable_info[
-            variable_info["featureName"] == var
-        ]["featureDescription"].values[0]
-        X_train = data[var]
-        y_train = data[target_column]
-
-        if var in categorical_variables:
-            title = var_description
-            sns.boxplot(ax=ax, x=X_train, y=y_train)
-        else:
-            title = f"{var_description} \n {corr_description}: {corr_value:.2f}"
-            ax.scatter(X_train, y_train)
+        panels.append({
+            "variable": var,
+            "description": variable_info[
+                variable_info["featureName"] == var
+            ]["featureDescription"].values[0],
+            "categorical": var in categorical_variables,
+            "corr_value": corr_value,
+            "corr_description": corr_description,
+        })
+    return panels
 
-        ax.set_title(title)
-        ax.set_ylabel(target_column)
-        ax.set_xlabel(var)
 
-    plt.tight_layout()
+def get_density_grid(x, y, bins=scatter_bins):
+    """
+    Count the pairs of values falling in each cell of a 2-D grid.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+    y : numpy.ndarray
+    bins : int
+
+    Returns
+    -------
+    numpy.ndarray, numpy.ndarray, numpy.ndarray
+        counts of shape (bins, bins), and the x and y bin edges
+    """
+    finite = np.isfinite(x) & np.isfinite(y)
+    return np.histogram2d(x[finite], y[finite], bins=bins)
+
+
+def get_stratified_sample(x, sample_size=scatter_sample_size, strata=10, seed=0):
+    """
+    Sample rows in proportion to the number of rows in each quantile stratum of x.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+    sample_size : int
+    strata : int
+    seed : int
+
+    Returns
+    -------
+    numpy.ndarray
+        sorted indices of the sampled rows
+    """
+    rows = np.flatnonzero(np.isfinite(x))
+    if len(rows) <= sample_size:
+        return rows
+
+    edges = np.quantile(x[rows], np.linspace(0, 1, strata + 1)[1:-1])
+    stratum = np.searchsorted(edges, x[rows], side="right")
+    counts = np.bincount(stratum, minlength=strata)
+    quota = np.round(counts * sample_size / len(rows)).astype(np.int64)
+
+    # rank the rows of each stratum in random order and keep the first ones
+    order = np.lexsort((np.random.default_rng(seed).random(len(rows)), stratum))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(rows)) - starts[stratum[order]]
+    return np.sort(rows[order[rank < quota[stratum[order]]]])
+
+
+def draw_relationship(ax, x, y, mode=scatter_mode, row_threshold=scatter_row_threshold):
+    """
+    Draw the relationship of two numerical variables, as a scatter plot of
+    every row up to the row threshold and aggregated above it.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+    x : numpy.ndarray
+    y : numpy.ndarray
+    mode : str
+        "hexbin", "histogram2d" or "sample", used above the row threshold
+    row_threshold : int
+    """
+    if len(x) <= row_threshold:
+        ax.scatter(x, y)
+    elif mode == "hexbin":
+        finite = np.isfinite(x) & np.isfinite(y)
+        ax.hexbin(x[finite], y[finite], gridsize=scatter_bins, bins="log", mincnt=1, cmap="Blues")
+    elif mode == "histogram2d":
+        counts, x_edges, y_edges = get_density_grid(x, y)
+        ax.pcolormesh(
+            x_edges, y_edges, np.ma.masked_equal(counts, 0).T, norm=LogNorm(), cmap="Blues"
+        )
+    elif mode == "sample":
+        sample = get_stratified_sample(x)
+        ax.scatter(x[sample], y[sample], s=4)
+    else:
+        raise ValueError(f"unknown scatter mode: {mode}")
+
+
+def draw_correlated_panel(ax, panel, data, target_column):
+    """
+    Draw one variable of the correlated features plot.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+    panel : dict
+        from `get_correlated_panels`
+    data : pandas.DataFrame
+    target_column : str
+    """
+    var = panel["variable"]
+    X_train = data[var]
+    y_train = data[target_column]
+
+    if panel["categorical"]:
+        title = panel["description"]
+        sns.boxplot(ax=ax, x=X_train, y=y_train)
+    else:
+        title = f"{panel['description']} \n {panel['corr_description']}: {panel['corr_value']:.2f}"
+        draw_relationship(
+            ax, X_train.to_numpy(dtype=np.float64), y_train.to_numpy(dtype=np.float64)
+        )
+
+    ax.set_title(title)
+    ax.set_ylabel(target_column)
+    ax.set_xlabel(var)
+
+
+def plot_correlated_features(plot_columns, chosen_variables, data, variable_info, target_column,
+                             data_fingerprint=None):
+    """Plot the correlated features.
+
+    Parameters
+    ----------
+    plot_columns : list
+    chosen_variables : list
+    data : pandas.DataFrame
+    variable_info : pandas.DataFrame
+    target_column : str
+    data_fingerprint : str
+        identifies the content of the data, computed from it when not given
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+    """
+    panels = get_correlated_panels(chosen_variables, data, variable_info, target_column,
+                                   data_fingerprint)
+
+    plot_rows = int(len(chosen_variables) / 2)
+    plot_height = 2.5 * plot_rows
+    plot_width = 12
+
+    fig = figure_factory.create(figsize=(plot_width, plot_height))
+    axs = fig.subplots(plot_rows, plot_columns, squeeze=False)
+
+    for idx, panel in enumerate(panels):
+        draw_correlated_panel(axs[int(idx / 2)][idx % 2], panel, data, target_column)
+
+    fig.tight_layout()
     return fig
 
 
-def plot_data_distribution(plot_columns, variable_info, data):
+def render_correlated_panel(panel, data, target_column, figsize):
+    """
+    Render one variable of the correlated features plot to PNG bytes.
+
+    Runs in the worker processes of `plot_correlated_features_parallel`, so it
+    draws on a figure of its own with the Agg canvas.
+
+    Parameters
+    ----------
+    panel : dict
+        from `get_correlated_panels`
+    data : pandas.DataFrame
+        the variable and the target only
+    target_column : str
+    figsize : tuple
+
+    Returns
+    -------
+    bytes
+    """
+    fig = figure_factory.create(figsize=figsize)
+    draw_correlated_panel(fig.subplots(), panel, data, target_column)
+    fig.tight_layout()
+    return figure_factory.render(fig, format="png", dpi=figure_dpi)
+
+
+def stitch_images(images, plot_columns):
+    """
+    Stitch PNG images into one grid image.
+
+    Parameters
+    ----------
+    images : list
+        of bytes
+    plot_columns : int
+
+    Returns
+    -------
+    bytes
+        PNG image
+    """
+    arrays = [
+        (mpimg.imread(io.BytesIO(image), format="png") * 255).round().astype(np.uint8)
+        for image in images
+    ]
+    height = max(array.shape[0] for array in arrays)
+    width = max(array.shape[1] for array in arrays)
+    plot_rows = -(-len(arrays) // plot_columns)
+
+    grid = np.full((plot_rows * height, plot_columns * width, 4), 255, dtype=np.uint8)
+    for idx, array in enumerate(arrays):
+        top, left = (idx // plot_columns) * height, (idx % plot_columns) * width
+        grid[top:top + array.shape[0], left:left + array.shape[1], :array.shape[2]] = array
+
+    buffer = io.BytesIO()
+    mpimg.imsave(buffer, grid, format="png")
+    return buffer.getvalue()
+
+
+def plot_correlated_features_parallel(executor, plot_columns, chosen_variables, data,
+                                      variable_info, target_column, data_fingerprint=None):
+    """
+    Plot the correlated features, rendering each variable in a worker process.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.ProcessPoolExecutor
+    plot_columns : int
+    chosen_variables : list
+    data : pandas.DataFrame
+    variable_info : pandas.DataFrame
+    target_column : str
+    data_fingerprint : str
+        identifies the content of the data, computed from it when not given
+
+    Returns
+    -------
+    bytes
+        PNG image
+    """
+    panels = get_correlated_panels(chosen_variables, data, variable_info, target_column,
+                                   data_fingerprint)
+    figsize = (12 / plot_columns, 2.5)
+
+    images = executor.map(
+        render_correlated_panel,
+        panels,
+        [data[list(dict.fromkeys([panel["variable"], target_column]))] for panel in panels],
+        [target_column] * len(panels),
+        [figsize] * len(panels),
+    )
+    return stitch_images(list(images), plot_columns)
+
+
+def draw_distribution(ax, summary):
+    """
+    Draw the distribution of a column from its summary.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+    summary : dict
+        from `utils.distribution_summary.summarize_column`
+    """
+    if summary["kind"] == "categorical":
+        ax.bar(summary["labels"], summary["counts"])
+        ax.set_ylabel("count")
+    else:
+        edges = np.asarray(summary["edges"])
+        ax.bar(edges[:-1], summary["counts"], width=np.diff(edges), align="edge")
+        ax.set_ylabel("Count")
+
+
+def plot_data_distribution(plot_columns, variable_info, data, summaries=None):
     """
     Plot the data distribution.
 
@@ -111,35 +381,277 @@ def plot_data_distribution(plot_columns, variable_info, data):
     plot_columns : list
     variable_info : pandas.DataFrame
     data : pandas.DataFrame
+    summaries : dict
+        precomputed distribution of each column, summarized from the data if
+        not given
 
     Returns
     -------
     fig : matplotlib.figure.Figure
     """
-
-    categorical_variables = variable_info[
-        variable_info["featureType"] == "categorical"
-    ]["featureName"]
+    if summaries is None:
+        summaries = build_distribution_summaries(data, variable_info)
 
     plot_rows = int(len(data.columns) / plot_columns)
     plot_width = 12
     plot_height = 2.5 * plot_rows
-    fig, axs = plt.subplots(plot_rows, plot_columns, figsize=(plot_width, plot_height))
+    fig = figure_factory.create(figsize=(plot_width, plot_height))
+    axs = fig.subplots(plot_rows, plot_columns, squeeze=False)
 
     for idx, var in enumerate(data.columns):
 
         ax = axs[int(idx / plot_columns)][idx % plot_columns]
-
-        if var in categorical_variables:
-            sns.countplot(data=data, x=var, ax=ax)
-        else:
-            sns.histplot(data=data, x=var, ax=ax)
+        draw_distribution(ax, summaries[var])
 
         ax.set_title(
             f"{variable_info[variable_info['featureName'] == var]['featureDescription'].values[0]}"
         )
         ax.set_xlabel(var)
 
-    plt.tight_layout()
+    fig.tight_layout()
+
+    return fig
+
 
+def plot_price_sensitivity(values, prices, current_value, var, var_description, target_column):
+    """
+    Plot the price of a house over the values of one variable.
+
+    Parameters
+    ----------
+    values : list
+    prices : numpy.ndarray
+    current_value : object
+        value of the variable for the house, marked on the plot
+    var : str
+    var_description : str
+    target_column : str
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+    """
+    fig = figure_factory.create(figsize=(12, 3.5))
+    ax = fig.add_subplot()
+    labels = [str(value) for value in values]
+
+    if isinstance(values[0], str):
+        ax.plot(labels, prices, marker="o")
+        if str(current_value) in labels:
+            current = labels.index(str(current_value))
+            ax.plot(labels[current], prices[current], marker="o", color="red")
+    else:
+        ax.plot(values, prices)
+        current = int(np.argmin(np.abs(np.asarray(values) - float(current_value))))
+        ax.axvline(float(current_value), color="red", linestyle="--")
+        ax.plot(values[current], prices[current], marker="o", color="red")
+
+    ax.set_title(var_description)
+    ax.set_xlabel(var)
+    ax.set_ylabel(target_column)
+    fig.tight_layout()
     return fig
+
+
+def render_figure(fig, image_format=figure_image_format):
+    """
+    Render a figure to bytes and release it.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+    image_format : str
+        "png" or "svg"
+
+    Returns
+    -------
+    bytes
+    """
+    return figure_factory.render(fig, format=image_format, dpi=figure_dpi, bbox_inches="tight")
+
+
+def get_figure_key(plot_type, plot_columns, columns, data, variable_info,
+                   image_format=figure_image_format, settings=(), data_fingerprint=None):
+    """
+    Get the cache key of a figure.
+
+    The key holds the version of the drawing code and the render settings,
+    as the figures are persisted across restarts of the app.
+
+    Parameters
+    ----------
+    plot_type : str
+    plot_columns : int
+    columns : list
+        variables drawn in the figure
+    data : pandas.DataFrame
+    variable_info : pandas.DataFrame
+    image_format : str
+    settings : tuple
+        other parameters the figure depends on
+    data_fingerprint : str
+        identifies the content of the whole data, e.g. the checksum of the
+        file it was loaded from, so a cache hit does not hash the data.
+        The columns drawn are fingerprinted when not given.
+
+    Returns
+    -------
+    tuple
+    """
+    return (
+        figure_renderer_version,
+        plot_type,
+        data_fingerprint or get_data_fingerprint(data[columns]),
+        get_data_fingerprint(variable_info),
+        tuple(columns),
+        plot_columns,
+        figure_dpi,
+        *settings,
+        image_format,
+    )
+
+
+def get_correlated_features_image(figure_cache, plot_columns, chosen_variables, data,
+                                  variable_info, target_column,
+                                  image_format=figure_image_format, executor=None,
+                                  data_fingerprint=None):
+    """
+    Get the plot of the correlated features, rendered once per data and variables.
+
+    Parameters
+    ----------
+    figure_cache : utils.cache_utils.FigureCache
+    plot_columns : int
+    chosen_variables : list
+    data : pandas.DataFrame
+    variable_info : pandas.DataFrame
+    target_column : str
+    image_format : str
+        ignored with an executor, which always renders PNG
+    executor : concurrent.futures.ProcessPoolExecutor or None
+        renders the variables in parallel when given
+    data_fingerprint : str
+        identifies the content of the data, computed from it when not given
+
+    Returns
+    -------
+    bytes
+    """
+    columns = list(dict.fromkeys([*chosen_variables, target_column]))
+    # how the relationships of large data are aggregated
+    scatter_settings = (scatter_mode, scatter_row_threshold, scatter_bins, scatter_sample_size)
+
+    if executor is not None:
+        key = get_figure_key(
+            "correlated_panels", plot_columns, columns, data, variable_info, "png",
+            scatter_settings, data_fingerprint
+        )
+        return figure_cache.get_or_render(key, lambda: plot_correlated_features_parallel(
+            executor=executor,
+            plot_columns=plot_columns,
+            chosen_variables=chosen_variables,
+            data=data,
+            variable_info=variable_info,
+            target_column=target_column,
+            data_fingerprint=data_fingerprint
+        ))
+
+    key = get_figure_key(
+        "correlated_features", plot_columns, columns, data, variable_info, image_format,
+        scatter_settings, data_fingerprint
+    )
+    return figure_cache.get_or_render(key, lambda: render_figure(
+        plot_correlated_features(
+            plot_columns=plot_columns,
+            chosen_variables=chosen_variables,
+            data=data,
+            variable_info=variable_info,
+            target_column=target_column,
+            data_fingerprint=data_fingerprint
+        ),
+        image_format
+    ))
+
+
+def get_data_distribution_image(figure_cache, plot_columns, variable_info, data,
+                                image_format=figure_image_format, summaries=None,
+                                data_fingerprint=None):
+    """
+    Get the plot of the data distribution, rendered once per data and variables.
+
+    Parameters
+    ----------
+    figure_cache : utils.cache_utils.FigureCache
+    plot_columns : int
+    variable_info : pandas.DataFrame
+    data : pandas.DataFrame
+    image_format : str
+    summaries : dict
+        precomputed distribution of each column
+    data_fingerprint : str
+        identifies the content of the data, computed from it when not given
+
+    Returns
+    -------
+    bytes
+    """
+    # the summaries are precomputed apart from the data, so they are keyed on their content
+    summaries_checksum = None if summaries is None else hashlib.sha1(
+        json.dumps(summaries, sort_keys=True).encode()
+    ).hexdigest()
+    key = get_figure_key(
+        "data_distribution", plot_columns, list(data.columns), data, variable_info, image_format,
+        (summaries_checksum,), data_fingerprint
+    )
+    return figure_cache.get_or_render(key, lambda: render_figure(
+        plot_data_distribution(
+            plot_columns=plot_columns,
+            variable_info=variable_info,
+            data=data,
+            summaries=summaries
+        ),
+        image_format
+    ))
+
+
+def get_price_sensitivity_image(figure_cache, model_version, house_key, var, values, prices,
+                                current_value, var_description, target_column,
+                                image_format=figure_image_format):
+    """
+    Get the plot of the price sensitivity of a house, rendered once per
+    house, variable and model.
+
+    Parameters
+    ----------
+    figure_cache : utils.cache_utils.FigureCache
+    model_version : str
+        identifies the estimator the prices are predicted with
+    house_key : tuple
+        from `utils.feature_utils.get_house_key`
+    var : str
+    values : list
+    prices : numpy.ndarray
+    current_value : object
+    var_description : str
+    target_column : str
+    image_format : str
+
+    Returns
+    -------
+    bytes
+    """
+    key = (
+        figure_renderer_version, "price_sensitivity", model_version, house_key, var,
+        figure_dpi, image_format,
+    )
+    return figure_cache.get_or_render(key, lambda: render_figure(
+        plot_price_sensitivity(
+            values=values,
+            prices=prices,
+            current_value=current_value,
+            var=var,
+            var_description=var_description,
+            target_column=target_column
+        ),
+        image_format
+    ))
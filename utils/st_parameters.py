@@ -6,3 +6,51 @@ target_column = "SalePrice"
 separator = 6
 plot_columns = 2
 page_icon = "📈"
+scoring_chunk_size = 50000
+server_max_batch_size = 256
+server_max_wait_ms = 5
+server_latency_window = 10000
+prediction_cache_size = 4096
+warmup_poll_seconds = 0.5
+shared_training_data = False
+correlation_cache_size = 32
+figure_cache_max_bytes = 64 * 1024 * 1024
+figure_cache_max_disk_bytes = 256 * 1024 * 1024
+figure_image_format = "png"
+figure_dpi = 200
+parallel_rendering = True
+render_workers = None
+scatter_row_threshold = 100000
+scatter_mode = "hexbin"
+scatter_bins = 100
+scatter_sample_size = 20000
+statistics_reservoir_size = 100000
+snapshot_page_sizes = [5, 10, 25, 50, 100]
+sensitivity_points = 200
+sensitivity_cache_size = 512
+renovation_features = ["KitchenQual", "OverallCond", "OverallQual", "YearRemodAdd"]
+renovation_grid_limit = 50000
+renovation_top_k = 5
+ensemble_members = 10
+interval_quantiles = [10, 50, 90]
+training_random_state = 1234
+training_test_size = 0.2
+training_cv_size = 0.5
+search_parameters = {
+    "n_estimators": list(range(500, 2000, 50)),
+    "learning_rate": [0.05, 0.06, 0.07],
+    "max_depth": [3, 5, 7],
+    "min_child_weight": [1, 1.5, 2],
+}
+search_iterations = 10
+search_splits = 5
+search_method = "random"
+search_candidates = 27
+search_eta = 3
+search_early_stopping_rounds = 50
+fit_tree_method = None
+fit_max_bin = 256
+fit_n_jobs = None
+fit_early_stopping_rounds = None
+fit_validation_size = 0.1
+fit_latency_batch_sizes = [1, 10000]
@@ -0,0 +1,123 @@
+"""Preload the model and the data artifacts when the app starts."""
+
+from threading import Thread
+from time import perf_counter, sleep
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from utils import st_data_utils
+from utils.st_parameters import warmup_poll_seconds
+
+
+preloaded_artifacts = [
+    "get_correlated_variables",
+    "get_column_statistics",
+    "get_training_variable_info",
+    "get_training_data",
+    "get_prediction_data",
+    "get_optimisation_performance",
+    "get_optimisation_feature_importance",
+    "get_optimisation_parameters",
+    "get_model_performance",
+    "get_model_feature_importance",
+    "get_model_parameters",
+    "get_correlated_info",
+]
+
+
+def warm_up(state):
+    """
+    Load the estimator and the feature layout, run a dummy prediction and
+    load the data artifacts.
+
+    The app is ready as soon as it can predict. The data artifacts are then
+    loaded on a best-effort basis, as every page loads them again when
+    needed. When the estimator or the layout fails to load, the warm-up is
+    started again by the next run of a page.
+
+    Parameters
+    ----------
+    state : dict
+        readiness state, updated as the warm-up progresses
+    """
+    start = perf_counter()
+    try:
+        state["step"] = "loading the estimator"
+        estimator = st_data_utils.get_estimator()
+
+        state["step"] = "loading the feature layout"
+        st_data_utils.get_prediction_feature_layout()
+
+        state["step"] = "running a first prediction"
+        estimator.predict(st_data_utils.get_prediction_features().iloc[[0]])
+    except Exception as error:  # pylint: disable=W0718
+        state["error"] = str(error)
+        state["seconds"] = perf_counter() - start
+        start_warmup.clear()
+        return
+
+    state["ready"] = True
+
+    for getter in preloaded_artifacts:
+        state["step"] = f"loading {getter[len('get_'):].replace('_', ' ')}"
+        try:
+            getattr(st_data_utils, getter)()
+        except Exception as error:  # pylint: disable=W0718
+            state["failed"][getter] = str(error)
+
+    state["step"] = "ready"
+    state["seconds"] = perf_counter() - start
+
+
+@st.cache_resource
+def start_warmup():
+    """
+    Start the warm-up on a background thread, once per server process.
+
+    Returns
+    -------
+    dict
+        readiness state with the keys ready, step, error, failed and seconds
+    """
+    state = {"ready": False, "step": "starting", "error": None, "failed": {}, "seconds": None}
+    thread = Thread(target=warm_up, args=(state,), name="warmup", daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+    return state
+
+
+def show_warmup_status(state):
+    """
+    Show the warm-up status unless the app is ready.
+
+    Parameters
+    ----------
+    state : dict
+        Output of `start_warmup`.
+
+    Returns
+    -------
+    bool
+        whether the app is ready
+    """
+    if state["error"] is not None:
+        st.error(f"Loading the model failed: {state['error']}")
+        st.button("Retry")
+    elif not state["ready"]:
+        st.info(f"Warming up: {state['step']}. Predictions are available shortly.")
+    return state["ready"]
+
+
+def rerun_until_ready(state):
+    """
+    Run the page again shortly while the warm-up is in progress.
+
+    Call it at the end of a page, so the page is complete before it waits.
+
+    Parameters
+    ----------
+    state : dict
+        Output of `start_warmup`.
+    """
+    if not state["ready"] and state["error"] is None:
+        sleep(warmup_poll_seconds)
+        st.rerun()
@@ -0,0 +1,235 @@
+"""Columnar, dtype-optimized cache of the training data.
+
+Usage:
+
+    python -m utils.training_data_cache
+"""
+
+# pylint: disable=C0103
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import dotenv
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+metadata_key = b"heritage_housing"
+# small row groups let a window of rows be read without the rest of the file
+row_group_size = 64 * 1024
+
+
+def get_file_checksum(path, block_size=1 << 20):
+    """
+    Get the sha256 checksum of a file.
+
+    Parameters
+    ----------
+    path : str
+    block_size : int
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_memory_usage(data):
+    """
+    Get the memory used by a data frame, including the objects it holds.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+
+    Returns
+    -------
+    int
+        bytes
+    """
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+def optimize_dtypes(data):
+    """
+    Store text columns as categories and downcast integer columns.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    optimized = data.copy()
+    for column in optimized.columns:
+        if optimized[column].dtype == object:
+            optimized[column] = optimized[column].astype("category")
+        elif pd.api.types.is_integer_dtype(optimized[column]):
+            optimized[column] = pd.to_numeric(optimized[column], downcast="integer")
+    return optimized
+
+
+def read_cache_metadata(cache_path):
+    """
+    Read the metadata stored with the cache.
+
+    Parameters
+    ----------
+    cache_path : str
+
+    Returns
+    -------
+    dict or None
+    """
+    if not os.path.exists(cache_path):
+        return None
+    metadata = pq.read_schema(cache_path).metadata or {}
+    if metadata_key not in metadata:
+        return None
+    return json.loads(metadata[metadata_key])
+
+
+def write_cache(table, metadata, cache_path):
+    """
+    Write the columnar cache with its metadata, replacing the previous one at once.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+    metadata : dict
+    cache_path : str
+    """
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}), metadata_key: json.dumps(metadata).encode()
+    })
+    handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)))
+    with os.fdopen(handle, "wb") as cache:
+        pq.write_table(table, cache, row_group_size=row_group_size)
+    os.replace(temporary_path, cache_path)
+
+
+def is_cache_valid(csv_path, metadata, cache_path=None):
+    """
+    Check if the cache was built from the current content of the csv file.
+
+    The checksum is only recomputed when the size or the modification time
+    of the csv file has changed. When the content is the same, e.g. after
+    the file has been touched or copied, the size and modification time in
+    the metadata of the cache are updated, so the checksum is not computed
+    again on the next check.
+
+    Parameters
+    ----------
+    csv_path : str
+    metadata : dict or None
+    cache_path : str
+        of the cache with the metadata, left as it is when not given
+
+    Returns
+    -------
+    bool
+    """
+    if metadata is None:
+        return False
+    source = os.stat(csv_path)
+    if (source.st_size, source.st_mtime_ns) == (metadata["size"], metadata["mtime_ns"]):
+        return True
+    if get_file_checksum(csv_path) != metadata["checksum"]:
+        return False
+    if cache_path is not None:
+        metadata.update(size=source.st_size, mtime_ns=source.st_mtime_ns)
+        write_cache(pq.read_table(cache_path), metadata, cache_path)
+    return True
+
+
+def build_cache(csv_path, cache_path):
+    """
+    Parse the csv file and write the optimized columnar cache.
+
+    Parameters
+    ----------
+    csv_path : str
+    cache_path : str
+
+    Returns
+    -------
+    pandas.DataFrame, dict
+        the optimized data and the cache metadata
+    """
+    raw = pd.read_csv(csv_path)
+    data = optimize_dtypes(raw)
+    source = os.stat(csv_path)
+    metadata = {
+        "checksum": get_file_checksum(csv_path),
+        "size": source.st_size,
+        "mtime_ns": source.st_mtime_ns,
+        "rows": len(data),
+        "memory_before": get_memory_usage(raw),
+        "memory_after": get_memory_usage(data),
+    }
+
+    write_cache(pa.Table.from_pandas(data, preserve_index=False), metadata, cache_path)
+
+    return data, metadata
+
+
+def load_training_data(csv_path, cache_path):
+    """
+    Load the training data from the columnar cache, rebuilding it when stale.
+
+    Parameters
+    ----------
+    csv_path : str
+    cache_path : str
+
+    Returns
+    -------
+    pandas.DataFrame, dict
+        the optimized data and the cache metadata
+    """
+    metadata = read_cache_metadata(cache_path)
+    if not is_cache_valid(csv_path, metadata, cache_path):
+        return build_cache(csv_path, cache_path)
+    return pd.read_parquet(cache_path), metadata
+
+
+def main(argv=None):
+    """
+    Build the cache if needed and report the memory it saves.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    dotenv.load_dotenv()
+    data_path = os.getenv("STREAMLIT_DATA_PATH")
+
+    parser = argparse.ArgumentParser(description="Cache the training data in columnar form.")
+    parser.add_argument("--csv-path", default=os.path.join(
+        data_path, os.getenv("HOUSING_RECORDS_FILENAME")
+    ))
+    parser.add_argument("--cache-path", default=os.path.join(
+        data_path, os.getenv("TRAINING_DATA_CACHE_FILENAME")
+    ))
+    args = parser.parse_args(argv)
+
+    data, metadata = load_training_data(args.csv_path, args.cache_path)
+    print(f"{len(data):,} rows cached in {args.cache_path}")
+    print(f"memory before: {metadata['memory_before']:,} bytes")
+    print(f"memory after: {metadata['memory_after']:,} bytes "
+          f"({metadata['memory_after'] / metadata['memory_before']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
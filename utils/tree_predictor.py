@@ -0,0 +1,359 @@
+"""Pure NumPy inference for the trees of an XGBoost regressor.
+
+Usage:
+
+    python -m utils.tree_predictor export <estimator.joblib> <compiled.npz>
+    python -m utils.tree_predictor benchmark <estimator.joblib> <compiled.npz> <houses.csv> \
+        <correlated_variables.csv>
+"""
+
+# pylint: disable=R0902,R0914
+
+import argparse
+import json
+from time import perf_counter
+import numpy as np
+
+
+def flatten_booster(booster):
+    """
+    Flatten the trees of an XGBoost booster into contiguous arrays.
+
+    Every tree is laid out as a complete binary tree of the ensemble depth,
+    so the children of internal node `i` are `2 * i + 1` (left) and
+    `2 * i + 2` (right) and need not be stored. A leaf above the full depth
+    becomes a chain of splits that always go left, ending in its value.
+
+    Parameters
+    ----------
+    booster : xgboost.Booster
+
+    Returns
+    -------
+    dict
+        of numpy.ndarray
+    """
+    model = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "reg:squarederror":
+        raise ValueError(f"objective {objective} is not supported")
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+
+    # depth of every node, parents always precede their children
+    depths = []
+    for tree in trees:
+        depth = np.zeros(len(tree["left_children"]), dtype=np.int64)
+        for node, (left, right) in enumerate(zip(tree["left_children"], tree["right_children"])):
+            if left != -1:
+                depth[left] = depth[right] = depth[node] + 1
+        depths.append(depth)
+    max_depth = max(int(depth.max()) for depth in depths)
+
+    num_internal = 2 ** max_depth - 1
+    feature = np.zeros((len(trees), num_internal), dtype=np.int32)
+    threshold = np.full((len(trees), num_internal), np.inf, dtype=np.float32)
+    default_left = np.ones((len(trees), num_internal), dtype=bool)
+    value = np.zeros((len(trees), num_internal + 1), dtype=np.float32)
+
+    for idx, (tree, depth) in enumerate(zip(trees, depths)):
+        positions = {0: 0}
+        for node, left in enumerate(tree["left_children"]):
+            position = positions[node]
+            if left == -1:
+                # leaves keep their weight in split_conditions
+                leaf = position
+                for _ in range(max_depth - depth[node]):
+                    leaf = 2 * leaf + 1
+                value[idx, leaf - num_internal] = tree["split_conditions"][node]
+            else:
+                feature[idx, position] = tree["split_indices"][node]
+                threshold[idx, position] = tree["split_conditions"][node]
+                default_left[idx, position] = bool(tree["default_left"][node])
+                positions[left] = 2 * position + 1
+                positions[tree["right_children"][node]] = 2 * position + 2
+
+    return {
+        "feature": feature,
+        "threshold": threshold,
+        "default_left": default_left,
+        "value": value,
+        "max_depth": np.asarray(max_depth),
+        "base_score": np.asarray(float(learner["learner_model_param"]["base_score"])),
+        "feature_names": np.asarray(learner.get("feature_names", []), dtype=str),
+    }
+
+
+def pad_trees(arrays, max_depth):
+    """
+    Lay flattened trees out at a larger depth.
+
+    The new levels hold splits that always go left, so every leaf `i` moves
+    to `i * 2 ** (max_depth - depth)` and the predictions do not change.
+
+    Parameters
+    ----------
+    arrays : dict
+        Output of `flatten_booster`.
+    max_depth : int
+        at least the depth of the trees
+
+    Returns
+    -------
+    dict
+        of numpy.ndarray
+    """
+    depth = int(arrays["max_depth"])
+    if max_depth == depth:
+        return arrays
+
+    num_trees, num_internal = arrays["feature"].shape
+    padded_internal = 2 ** max_depth - 1
+    feature = np.zeros((num_trees, padded_internal), dtype=np.int32)
+    threshold = np.full((num_trees, padded_internal), np.inf, dtype=np.float32)
+    default_left = np.ones((num_trees, padded_internal), dtype=bool)
+    value = np.zeros((num_trees, padded_internal + 1), dtype=np.float32)
+
+    feature[:, :num_internal] = arrays["feature"]
+    threshold[:, :num_internal] = arrays["threshold"]
+    default_left[:, :num_internal] = arrays["default_left"]
+    value[:, ::2 ** (max_depth - depth)] = arrays["value"]
+
+    return {
+        **arrays,
+        "feature": feature,
+        "threshold": threshold,
+        "default_left": default_left,
+        "value": value,
+        "max_depth": np.asarray(max_depth),
+    }
+
+
+class CompiledTreeEnsemble:
+    """
+    Predict with flattened trees, without the xgboost runtime.
+
+    Parameters
+    ----------
+    arrays : dict
+        Output of `flatten_booster`.
+    """
+
+    def __init__(self, arrays, chunk_size=512):
+        self.num_trees, num_internal = arrays["feature"].shape
+        self.max_depth = int(arrays["max_depth"])
+        self.base_score = float(arrays["base_score"])
+        self.feature_names = list(arrays["feature_names"])
+        self.chunk_size = chunk_size
+
+        # one contiguous row of nodes per tree
+        self.feature = arrays["feature"].ravel()
+        self.threshold = arrays["threshold"].ravel()
+        self.default_left = arrays["default_left"].ravel()
+        self.value = arrays["value"].ravel()
+        self.internal_offset = np.arange(self.num_trees, dtype=np.int64) * num_internal
+        self.leaf_offset = np.arange(self.num_trees, dtype=np.int64) * (num_internal + 1)
+        self.num_internal = num_internal
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load flattened trees saved by `export_estimator`.
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        CompiledTreeEnsemble
+        """
+        with np.load(path) as arrays:
+            return cls(dict(arrays))
+
+    def predict_leaves(self, features):
+        """
+        Walk all trees for a batch, one level at a time.
+
+        Parameters
+        ----------
+        features : numpy.ndarray
+            of shape (N, number of features)
+
+        Returns
+        -------
+        numpy.ndarray
+            index into `value` of the leaf of every row in every tree,
+            of shape (N, number of trees)
+        """
+        features = np.asarray(features, dtype=np.float32)
+        has_missing = np.isnan(features).any()
+        flat_features = features.ravel()
+        row_offset = (np.arange(features.shape[0]) * features.shape[1])[:, np.newaxis]
+        positions = np.zeros((features.shape[0], self.num_trees), dtype=np.int64)
+
+        for _ in range(self.max_depth):
+            nodes = positions + self.internal_offset
+            values = flat_features[row_offset + self.feature[nodes]]
+            go_right = ~(values < self.threshold[nodes])
+            if has_missing:
+                go_right &= ~(np.isnan(values) & self.default_left[nodes])
+            positions = 2 * positions + 1 + go_right
+
+        return positions - self.num_internal + self.leaf_offset
+
+    def predict(self, features):
+        """
+        Predict the target of a batch.
+
+        Parameters
+        ----------
+        features : numpy.ndarray or pandas.DataFrame
+            of shape (N, number of features)
+
+        Returns
+        -------
+        numpy.ndarray
+            of shape (N,)
+        """
+        features = np.asarray(features, dtype=np.float32)
+        predictions = np.empty(features.shape[0], dtype=np.float32)
+
+        for start in range(0, features.shape[0], self.chunk_size):
+            leaf_values = self.value[self.predict_leaves(features[start:start + self.chunk_size])]
+
+            # add the trees one after another in float32 from the base score, as xgboost does
+            base_scores = np.full((leaf_values.shape[0], 1), self.base_score, dtype=np.float32)
+            predictions[start:start + self.chunk_size] = np.cumsum(
+                np.hstack([base_scores, leaf_values]), axis=1, dtype=np.float32
+            )[:, -1]
+
+        return predictions
+
+
+def export_estimator(estimator, path):
+    """
+    Export the trees of an XGBoost regressor to a compressed npz file.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    path : str
+
+    Returns
+    -------
+    CompiledTreeEnsemble
+    """
+    arrays = flatten_booster(estimator.get_booster())
+    np.savez_compressed(path, **arrays)
+    return CompiledTreeEnsemble(arrays)
+
+
+def time_predict(predict, features, repeats):
+    """
+    Get the best time of a predict call.
+
+    Parameters
+    ----------
+    predict : callable
+    features : numpy.ndarray
+    repeats : int
+
+    Returns
+    -------
+    float
+        seconds
+    """
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        predict(features)
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def benchmark(estimator, compiled, features, batch_sizes=(1, 10000), repeats=5):
+    """
+    Compare the predictions and the latency of xgboost and the compiled trees.
+
+    Parameters
+    ----------
+    estimator : xgboost.XGBRegressor
+    compiled : CompiledTreeEnsemble
+    features : numpy.ndarray
+        rows that are resampled to build each batch
+    batch_sizes : tuple
+    repeats : int
+
+    Returns
+    -------
+    list
+        of dict, one per batch size
+    """
+    rng = np.random.default_rng(0)
+    results = []
+
+    for batch_size in batch_sizes:
+        batch = features[rng.integers(0, len(features), batch_size)]
+        expected = estimator.predict(batch)
+        actual = compiled.predict(batch)
+        results.append({
+            "batch_size": batch_size,
+            "max_abs_diff": float(np.max(np.abs(expected - actual))),
+            "xgboost_ms": time_predict(estimator.predict, batch, repeats) * 1000,
+            "compiled_ms": time_predict(compiled.predict, batch, repeats) * 1000,
+        })
+
+    return results
+
+
+def main(argv=None):
+    """
+    Run the export or benchmark command.
+
+    Parameters
+    ----------
+    argv : list
+    """
+    parser = argparse.ArgumentParser(description="Compile the trees of the XGBoost estimator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="flatten the trees to an npz file")
+    export_parser.add_argument("estimator_path")
+    export_parser.add_argument("compiled_path")
+
+    benchmark_parser = commands.add_parser("benchmark", help="compare against xgboost")
+    benchmark_parser.add_argument("estimator_path")
+    benchmark_parser.add_argument("compiled_path")
+    benchmark_parser.add_argument("houses_path", help="csv file of houses to resample from")
+    benchmark_parser.add_argument("correlated_path", help="csv file of correlated variables")
+    benchmark_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10000])
+
+    args = parser.parse_args(argv)
+
+    # xgboost is only needed here, not to predict with the compiled trees
+    # pylint: disable=C0415
+    import joblib
+    import pandas as pd
+    from utils.feature_utils import build_prediction_features, get_feature_layout
+
+    estimator = joblib.load(args.estimator_path)
+
+    if args.command == "export":
+        compiled = export_estimator(estimator, args.compiled_path)
+        print(f"Exported {compiled.num_trees} trees of depth {compiled.max_depth} "
+              f"to {args.compiled_path}")
+    else:
+        compiled = CompiledTreeEnsemble.load(args.compiled_path)
+        layout = get_feature_layout(
+            feature_columns=compiled.feature_names,
+            correlated_variables=pd.read_csv(args.correlated_path)
+        )
+        features = build_prediction_features(pd.read_csv(args.houses_path), layout)
+        print(pd.DataFrame(benchmark(estimator, compiled, features, args.batch_sizes))
+              .to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()